@@ -0,0 +1,173 @@
+"""
+Analytics - Pre-aggregated sales rollups over saved quotes
+
+Every saved quote is folded into one rollup row keyed by
+(tenant, month, product, profile, color) in the same transaction that
+stores it, and status changes (won/lost) adjust that row. Dashboard queries
+only ever read the rollup table, whose size depends on the number of
+distinct tenant/month/product/profile/color combinations, not on the number
+of quotes.
+
+Stored in SQLite (the stdlib embedded engine) with money in integer cents.
+"""
+import sqlite3
+from typing import Optional
+
+from money import from_cents
+
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quote_rollups (
+    tenant TEXT NOT NULL,
+    month TEXT NOT NULL,
+    siding_product TEXT NOT NULL,
+    siding_profile TEXT NOT NULL,
+    siding_color TEXT NOT NULL,
+    quote_count INTEGER NOT NULL DEFAULT 0,
+    won_count INTEGER NOT NULL DEFAULT 0,
+    lost_count INTEGER NOT NULL DEFAULT 0,
+    squares_sum REAL NOT NULL DEFAULT 0,
+    siding_cents INTEGER NOT NULL DEFAULT 0,
+    soffit_fascia_cents INTEGER NOT NULL DEFAULT 0,
+    gutters_cents INTEGER NOT NULL DEFAULT 0,
+    wraps_cents INTEGER NOT NULL DEFAULT 0,
+    grand_cents INTEGER NOT NULL DEFAULT 0,
+    won_grand_cents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant, month, siding_product, siding_profile, siding_color)
+)
+"""
+
+# API dimension name -> rollup column
+DIMENSIONS = {
+    "tenant": "tenant",
+    "month": "month",
+    "product": "siding_product",
+    "profile": "siding_profile",
+    "color": "siding_color",
+}
+
+QUOTE_STATUSES = ("open", "won", "lost")
+
+
+def create_rollup_table(conn: sqlite3.Connection):
+    """Create the rollup table if it doesn't exist"""
+    conn.execute(ROLLUP_SCHEMA)
+
+
+def add_quote_to_rollup(conn: sqlite3.Connection, key: tuple, squares: float, cents: dict):
+    """
+    Fold one newly saved (open) quote into its rollup row.
+
+    Args:
+        conn: Open connection, inside the caller's transaction
+        key: (tenant, month, product, profile, color)
+        squares: Siding squares priced on the quote
+        cents: Category totals in cents (siding, soffit_fascia, gutters, wraps, grand)
+    """
+    conn.execute(
+        """
+        INSERT INTO quote_rollups (
+            tenant, month, siding_product, siding_profile, siding_color, quote_count, squares_sum,
+            siding_cents, soffit_fascia_cents, gutters_cents, wraps_cents, grand_cents
+        ) VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (tenant, month, siding_product, siding_profile, siding_color) DO UPDATE SET
+            quote_count = quote_count + 1,
+            squares_sum = squares_sum + excluded.squares_sum,
+            siding_cents = siding_cents + excluded.siding_cents,
+            soffit_fascia_cents = soffit_fascia_cents + excluded.soffit_fascia_cents,
+            gutters_cents = gutters_cents + excluded.gutters_cents,
+            wraps_cents = wraps_cents + excluded.wraps_cents,
+            grand_cents = grand_cents + excluded.grand_cents
+        """,
+        (*key, squares, cents["siding"], cents["soffit_fascia"], cents["gutters"], cents["wraps"], cents["grand"]),
+    )
+
+
+def move_quote_status(conn: sqlite3.Connection, key: tuple, grand_cents: int, old_status: str, new_status: str):
+    """Adjust won/lost counters when a quote's status changes"""
+    if old_status == new_status:
+        return
+    won_delta = (new_status == "won") - (old_status == "won")
+    lost_delta = (new_status == "lost") - (old_status == "lost")
+    conn.execute(
+        """
+        UPDATE quote_rollups SET
+            won_count = won_count + ?,
+            lost_count = lost_count + ?,
+            won_grand_cents = won_grand_cents + ?
+        WHERE tenant = ? AND month = ? AND siding_product = ? AND siding_profile = ? AND siding_color = ?
+        """,
+        (won_delta, lost_delta, won_delta * grand_cents, *key),
+    )
+
+
+def query_rollups(
+    conn: sqlite3.Connection,
+    group_by: list,
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None,
+    filters: Optional[dict] = None,
+) -> list:
+    """
+    Aggregate rollup rows for a dashboard.
+
+    Args:
+        conn: Open connection
+        group_by: Dimension names from DIMENSIONS (may be empty for one total row)
+        start_month / end_month: Inclusive "YYYY-MM" bounds
+        filters: Dimension name -> exact value
+
+    Returns:
+        List of dicts with the group values, counts, dollar sums, close rate
+        and average ticket
+    """
+    unknown = [d for d in list(group_by) + list(filters or {}) if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}; expected {', '.join(DIMENSIONS)}")
+
+    columns = [DIMENSIONS[d] for d in group_by]
+    where, params = [], []
+    if start_month:
+        where.append("month >= ?")
+        params.append(start_month)
+    if end_month:
+        where.append("month <= ?")
+        params.append(end_month)
+    for dimension, value in (filters or {}).items():
+        where.append(f"{DIMENSIONS[dimension]} = ?")
+        params.append(value)
+
+    sql = "SELECT " + ", ".join(columns + [
+        "SUM(quote_count)", "SUM(won_count)", "SUM(lost_count)", "SUM(squares_sum)",
+        "SUM(siding_cents)", "SUM(soffit_fascia_cents)", "SUM(gutters_cents)",
+        "SUM(wraps_cents)", "SUM(grand_cents)", "SUM(won_grand_cents)",
+    ]) + " FROM quote_rollups"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if columns:
+        sql += " GROUP BY " + ", ".join(columns) + " ORDER BY " + ", ".join(columns)
+
+    rows = []
+    for row in conn.execute(sql, params):
+        group = dict(zip(group_by, row[:len(columns)]))
+        (quotes, won, lost, squares, siding, soffit, gutters, wraps, grand, won_grand) = (
+            value or 0 for value in row[len(columns):]
+        )
+        if not quotes:
+            continue
+        rows.append({
+            **group,
+            "quote_count": quotes,
+            "won_count": won,
+            "lost_count": lost,
+            "close_rate": round(won / quotes, 4),
+            "squares": round(squares, 2),
+            "siding_package_total": from_cents(siding),
+            "soffit_fascia_package_total": from_cents(soffit),
+            "gutters_total": from_cents(gutters),
+            "wraps_total": from_cents(wraps),
+            "grand_total": from_cents(grand),
+            "average_ticket": from_cents(grand // quotes),
+            "average_won_ticket": from_cents(won_grand // won) if won else 0.0,
+        })
+    return rows
@@ -0,0 +1,305 @@
+"""
+Audit Log - Append-only record of parses and quotes for disputes
+
+Every parse and quote is recorded with who asked (tenant, client address),
+what they got (grand total, price table version, the full input) and which
+PDF it came from (SHA-256, same as X-PDF-Id). Nothing is written on the
+request path: record() appends to an in-memory buffer and a background
+thread writes buffered events to SQLite in batches, one transaction per
+batch.
+
+The buffer is bounded. When the writer falls behind and the buffer is full,
+new events are dropped and counted rather than slowing requests down; the
+counters are in /api/admin/audit. A batch that fails to write is retried a
+few times and then dropped, its events counted in dropped; an event whose
+details can't be serialized is dropped on its own and counted in
+unserializable (and dropped).
+
+Settings (environment):
+    SIDING_BUDDY_AUDIT          "0" to turn the audit log off
+    SIDING_BUDDY_AUDIT_DB       database path (backend/data/audit.db)
+    SIDING_BUDDY_AUDIT_BUFFER   most events buffered before dropping (10000)
+    SIDING_BUDDY_AUDIT_BATCH    most events written per transaction (500)
+    SIDING_BUDDY_AUDIT_FLUSH_S  seconds between writes when idle (1.0)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel
+
+from money import to_cents, from_cents
+
+DEFAULT_AUDIT_DB_PATH = os.path.join(os.path.dirname(__file__), "data", "audit.db")
+AUDIT_BUFFER = int(os.getenv("SIDING_BUDDY_AUDIT_BUFFER", "10000"))
+AUDIT_BATCH = int(os.getenv("SIDING_BUDDY_AUDIT_BATCH", "500"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("SIDING_BUDDY_AUDIT_FLUSH_S", "1.0"))
+# Attempts per batch (a locked database or full disk may clear up), and the
+# pause before the second attempt (doubled each time)
+WRITE_ATTEMPTS = 3
+WRITE_RETRY_SECONDS = 0.1
+
+AUDIT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    at TEXT NOT NULL,
+    event TEXT NOT NULL,
+    tenant TEXT,
+    client TEXT,
+    pdf_sha256 TEXT,
+    price_version TEXT,
+    grand_cents INTEGER,
+    detail_json TEXT NOT NULL
+)
+"""
+AUDIT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS audit_events_pdf ON audit_events (pdf_sha256)",
+    "CREATE INDEX IF NOT EXISTS audit_events_tenant_at ON audit_events (tenant, at)",
+)
+
+
+def audit_enabled() -> bool:
+    return os.getenv("SIDING_BUDDY_AUDIT", "1").lower() not in ("0", "false", "no")
+
+
+def _detail_json(detail: dict) -> str:
+    """Serialize event details (pydantic models are dumped here, on the writer thread)"""
+    return json.dumps(
+        {key: value.model_dump(mode="json") if isinstance(value, BaseModel) else value for key, value in detail.items()},
+        separators=(",", ":"),
+    )
+
+
+class AuditLog:
+    """Bounded in-memory buffer drained to SQLite by a background thread"""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_AUDIT_DB_PATH,
+        buffer_size: int = AUDIT_BUFFER,
+        batch_size: int = AUDIT_BATCH,
+        flush_seconds: float = AUDIT_FLUSH_SECONDS,
+    ):
+        self.db_path = db_path
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.unserializable = 0
+        self.high_water = 0
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(AUDIT_SCHEMA)
+            for statement in AUDIT_INDEXES:
+                self._conn.execute(statement)
+        self._conn_lock = threading.Lock()
+
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    def record(
+        self,
+        event: str,
+        tenant: Optional[str] = None,
+        client: Optional[str] = None,
+        pdf_sha256: Optional[str] = None,
+        price_version: Optional[str] = None,
+        grand_total: Optional[float] = None,
+        **detail,
+    ) -> bool:
+        """
+        Queue one event; never blocks on I/O.
+
+        Args:
+            event: "parse", "quote", "save_quote", "quick_quote", ...
+            detail: Anything else worth keeping (pydantic models are
+                    serialized later, by the writer)
+
+        Returns:
+            False if the buffer was full and the event was dropped
+        """
+        entry = (
+            datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            event, tenant, client, pdf_sha256, price_version,
+            to_cents(grand_total) if grand_total is not None else None,
+            detail,
+        )
+        with self._lock:
+            if self._closed or len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                return False
+            self._buffer.append(entry)
+            self.recorded += 1
+            pending = len(self._buffer)
+            if pending > self.high_water:
+                self.high_water = pending
+        if pending >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def _take_batch(self) -> list:
+        with self._lock:
+            count = min(len(self._buffer), self.batch_size)
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _rows(self, batch: list) -> list:
+        """Database rows for a batch, leaving out events that fail to serialize"""
+        rows, failed = [], 0
+        for entry in batch:
+            try:
+                rows.append((*entry[:7], _detail_json(entry[7])))
+            except Exception:
+                # Anything a detail value raises here would kill the writer thread
+                failed += 1
+        if failed:
+            with self._lock:
+                self.unserializable += failed
+                self.dropped += failed
+        return rows
+
+    def _write(self, batch: list):
+        rows = self._rows(batch)
+        if not rows:
+            return
+        for attempt in range(WRITE_ATTEMPTS):
+            if attempt:
+                time.sleep(WRITE_RETRY_SECONDS * 2 ** (attempt - 1))
+            try:
+                with self._conn_lock, self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO audit_events (at, event, tenant, client, pdf_sha256, price_version, grand_cents, detail_json)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            except sqlite3.Error:
+                self.write_errors += 1
+                continue
+            self.written += len(rows)
+            self.batches += 1
+            return
+        with self._lock:
+            self.dropped += len(rows)
+
+    def flush(self):
+        """Write everything buffered so far (called by the writer and on close)"""
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._write(batch)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+            if self._closed:
+                return
+
+    def close(self, timeout: float = 5.0):
+        """Stop accepting events and drain the buffer"""
+        with self._lock:
+            self._closed = True
+        self._wake.set()
+        self._writer.join(timeout)
+
+    def events(
+        self,
+        pdf_sha256: Optional[str] = None,
+        tenant: Optional[str] = None,
+        event: Optional[str] = None,
+        limit: int = 100,
+    ) -> list:
+        """Most recent written events, newest first, optionally filtered"""
+        filters = [
+            (column, value) for column, value in (("pdf_sha256", pdf_sha256), ("tenant", tenant), ("event", event))
+            if value is not None
+        ]
+        where = " AND ".join(f"{column} = ?" for column, _ in filters)
+        sql = (
+            "SELECT id, at, event, tenant, client, pdf_sha256, price_version, grand_cents, detail_json"
+            " FROM audit_events" + (f" WHERE {where}" if where else "") + " ORDER BY id DESC LIMIT ?"
+        )
+        with self._conn_lock:
+            rows = self._conn.execute(sql, [value for _, value in filters] + [limit]).fetchall()
+        return [
+            {
+                "id": row[0], "at": row[1], "event": row[2], "tenant": row[3], "client": row[4],
+                "pdf_sha256": row[5], "price_version": row[6],
+                "grand_total": from_cents(row[7]) if row[7] is not None else None,
+                "detail": json.loads(row[8]),
+            }
+            for row in rows
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._buffer)
+        return {
+            "enabled": True,
+            "recorded": self.recorded,
+            "written": self.written,
+            "pending": pending,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "unserializable": self.unserializable,
+            "high_water": self.high_water,
+            "buffer_size": self.buffer_size,
+        }
+
+
+class _DisabledAuditLog:
+    """Stand-in when SIDING_BUDDY_AUDIT=0"""
+
+    def record(self, event: str, **fields) -> bool:
+        return False
+
+    def flush(self):
+        pass
+
+    def close(self, timeout: float = 5.0):
+        pass
+
+    def events(self, **filters) -> list:
+        return []
+
+    def stats(self) -> dict:
+        return {"enabled": False}
+
+
+_audit_log = None
+_audit_log_lock = threading.Lock()
+
+
+def get_audit_log():
+    """Process-wide audit log, opened (and its writer started) on first use"""
+    global _audit_log
+    if _audit_log is not None:
+        return _audit_log
+    with _audit_log_lock:
+        if _audit_log is None:
+            if audit_enabled():
+                _audit_log = AuditLog(os.getenv("SIDING_BUDDY_AUDIT_DB", DEFAULT_AUDIT_DB_PATH))
+            else:
+                _audit_log = _DisabledAuditLog()
+    return _audit_log
@@ -0,0 +1,323 @@
+"""
+Benchmark - integer-cents pricing vs. the original float arithmetic
+
+Checks that every catalog price produces the same line totals in cents as the
+old round(quantity * price, 2) float math, compares whole quotes from the
+old float calculator (float_quote) and calculate_quote, then times both
+paths.
+
+Quantities with up to two decimals (Hover squares, LF) price identically.
+Quantities with more decimals (a typed 63.799 sq) are now rounded exactly,
+half-even, where the float product sometimes landed a cent low or high
+(63.799 sq x $525: 33494.47 before, 33494.48 now), so such a quote's grand
+total can move by a cent per affected line. That drift is the fix, not a
+regression; the quote comparison reports how often it happens.
+
+Usage:
+    python bench_money.py [iterations]
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+from typing import Optional
+
+from money import to_cents, line_total_cents, from_cents
+from quote_calculator import (
+    SIDING_PRODUCTS, SOFFIT_FASCIA, CORNERS, LABOR, WRAPS,
+    ACCESSORIES, GUTTERS, OTHER, DEFAULT_PRICE_TABLE, DEFAULT_SIDING_PRICE,
+    LineItem, PriceTable, QuoteInput, QuoteResult, calculate_quote, resolve_squares,
+)
+
+CENT = Decimal("0.01")
+
+
+def _catalog_prices() -> list:
+    """Every unit price in the catalog, including the combined rehang price"""
+    prices = [p["price"] for p in SIDING_PRODUCTS.values()]
+    for table in (SOFFIT_FASCIA, CORNERS, LABOR, WRAPS, ACCESSORIES, GUTTERS, OTHER):
+        prices.extend(table.values())
+    prices.append(GUTTERS["take_down"] + GUTTERS["put_back_up"])
+    return sorted(set(prices))
+
+
+def _quantities() -> list:
+    """Quantities the app actually sees: counts, Hover squares, LF to 0.1 and 0.01"""
+    quantities = list(range(0, 101))
+    fractions = (0.25, 0.33, 0.5, 0.67, 0.75)
+    quantities += [whole + frac for whole in range(0, 100) for frac in fractions]
+    quantities += [round(tenths / 10, 1) for tenths in range(0, 5001)]
+    quantities += [round(hundredths / 100, 2) for hundredths in range(0, 20001, 7)]
+    return quantities
+
+
+def check_identical() -> int:
+    """Return the number of (price, quantity) pairs checked; raise on mismatch"""
+    checked = 0
+    for price in _catalog_prices():
+        price_cents = to_cents(price)
+        for quantity in _quantities():
+            old_total = round(quantity * price, 2)
+            new_total = from_cents(line_total_cents(quantity, price_cents))
+            if old_total != new_total:
+                raise AssertionError(f"{quantity} x {price}: float {old_total!r} != cents {new_total!r}")
+            checked += 1
+    return checked
+
+
+# ============================================================================
+# ORIGINAL FLOAT CALCULATOR
+# ============================================================================
+
+def float_quote(input_data: QuoteInput, prices: Optional[PriceTable] = None) -> QuoteResult:
+    """
+    The original float calculate_quote, kept as the reference for the cents path.
+
+    Same line items as calculate_quote, priced the old way: each line total
+    is round(quantity * price, 2), category totals are plain float sums and
+    the grand total is rounded once at the end. Reads its prices from a
+    PriceTable so it can price any tenant's catalog.
+    """
+    prices = prices or DEFAULT_PRICE_TABLE
+    squares = resolve_squares(input_data)
+    wrap_suffix = "metal" if input_data.wraps_are_metal else "wood"
+    wrap_label = "Metal" if input_data.wraps_are_metal else "Wood"
+    over_16 = input_data.soffit_width_over_16
+
+    inside_count = input_data.inside_corners
+    if inside_count == 0 and input_data.measurements:
+        inside_count = input_data.measurements.inside_corners_count or 0
+    outside_count = input_data.outside_corners
+    if outside_count == 0 and input_data.measurements:
+        outside_count = input_data.measurements.outside_corners_count or 0
+
+    siding_price = prices.siding_prices.get(input_data.siding_product, DEFAULT_SIDING_PRICE)
+    cleanup_full = input_data.cleanup_type == "full"
+
+    # (total field, category, description, quantity, unit, price, priced?)
+    lines = [
+        ("siding_package_total", "Siding", prices.siding_names.get(input_data.siding_product, "Siding"),
+         squares, "sq", siding_price, squares > 0),
+        ("siding_package_total", "Siding", "Fan Fold Insulation", squares, "sq", prices.labor["fan_fold"],
+         input_data.include_fan_fold and squares > 0),
+        ("siding_package_total", "Siding", "Remove/Dispose Old Siding", squares, "sq", prices.labor["remove_dispose"],
+         input_data.include_remove_dispose and squares > 0),
+        ("siding_package_total", "Siding", "Fullback Insulation", squares, "sq", prices.labor["fullback_insulation"],
+         input_data.include_fullback and squares > 0),
+        ("siding_package_total", "Siding", "Inside Corners", inside_count, "ea", prices.corners["inside"], inside_count > 0),
+        ("siding_package_total", "Siding", "Outside Corners", outside_count, "ea", prices.corners["outside"], outside_count > 0),
+        ("siding_package_total", "Siding", "Dormers/Flashing", input_data.dormers_count, "ea",
+         prices.labor["dormers_flashing"], input_data.dormers_count > 0),
+        ("soffit_fascia_package_total", "Soffit/Fascia", f"Soffit ({'over' if over_16 else 'under'} 16\")",
+         input_data.soffit_lf, "LF", prices.soffit_fascia["soffit_over_16" if over_16 else "soffit_under_16"],
+         input_data.soffit_lf > 0),
+        ("soffit_fascia_package_total", "Soffit/Fascia", "Fascia/Frieze", input_data.fascia_frieze_lf, "LF",
+         prices.soffit_fascia["fascia_frieze"], input_data.fascia_frieze_lf > 0),
+        ("soffit_fascia_package_total", "Soffit/Fascia", "Porch Beam", input_data.porch_beam_lf, "LF",
+         prices.soffit_fascia["porch_beam"], input_data.porch_beam_lf > 0),
+        ("soffit_fascia_package_total", "Soffit/Fascia", "Porch Ceiling", input_data.porch_ceiling_count, "ea",
+         prices.soffit_fascia["porch_ceiling"], input_data.porch_ceiling_count > 0),
+        ("soffit_fascia_package_total", "Soffit/Fascia", "Bird Box", input_data.bird_box_count, "ea",
+         prices.soffit_fascia["bird_box"], input_data.bird_box_count > 0),
+        ("soffit_fascia_package_total", "Soffit/Fascia", "Extra Bend/Crown", input_data.extra_bend_lf, "LF",
+         prices.soffit_fascia["extra_bend_crown"], input_data.extra_bend_lf > 0),
+        ("soffit_fascia_package_total", "Soffit/Fascia", "Remove Soffit/Fascia", input_data.remove_soffit_lf, "LF",
+         prices.soffit_fascia["remove_soffit"], input_data.remove_soffit_lf > 0),
+        ("gutters_total", "Gutters", "New Gutters", input_data.new_gutter_lf, "LF",
+         prices.gutters["new_gutters"], input_data.new_gutter_lf > 0),
+        ("gutters_total", "Gutters", "Remove/Rehang Gutters", input_data.rehang_gutter_lf, "LF",
+         prices.gutters["rehang"], input_data.rehang_gutter_lf > 0),
+        ("wraps_total", "Wraps", f"Window Wrap ({wrap_label})", input_data.window_wrap_count, "ea",
+         prices.wraps[f"window_{wrap_suffix}"], input_data.window_wrap_count > 0),
+        ("wraps_total", "Wraps", f"Door Wrap ({wrap_label})", input_data.door_wrap_count, "ea",
+         prices.wraps[f"door_{wrap_suffix}"], input_data.door_wrap_count > 0),
+        ("wraps_total", "Wraps", f"Transom Wrap ({wrap_label})", input_data.transom_wrap_count, "ea",
+         prices.wraps[f"transom_{wrap_suffix}"], input_data.transom_wrap_count > 0),
+        ("wraps_total", "Wraps", "Garage Door Wrap", input_data.garage_door_wrap_count, "ea",
+         prices.wraps["garage_door"], input_data.garage_door_wrap_count > 0),
+        ("other_total", "Accessories", "Vent", input_data.vent_count, "ea",
+         prices.accessories["vent"], input_data.vent_count > 0),
+        ("other_total", "Accessories", "Light Panel", input_data.light_panel_count, "ea",
+         prices.accessories["light_panel"], input_data.light_panel_count > 0),
+        ("other_total", "Accessories", "Receptacle", input_data.receptacle_count, "ea",
+         prices.accessories["receptacle"], input_data.receptacle_count > 0),
+        ("other_total", "Accessories", "Faucet/Bib", input_data.faucet_count, "ea",
+         prices.accessories["faucet_bib"], input_data.faucet_count > 0),
+        ("other_total", "Accessories", "Dryer Vent", input_data.dryer_vent_count, "ea",
+         prices.accessories["dryer_vent"], input_data.dryer_vent_count > 0),
+        ("other_total", "Accessories", "Shutters", input_data.shutter_pairs, "pair",
+         prices.accessories["shutters"], input_data.shutter_pairs > 0),
+        ("other_total", "Other", "Rotten Wood Repair", input_data.rotten_wood_lf, "LF",
+         prices.other["rotten_wood"], input_data.rotten_wood_lf > 0),
+        ("other_total", "Other", "OSB Sheeting", input_data.osb_sheets, "sheet",
+         prices.other["osb_sheet"], input_data.osb_sheets > 0),
+        ("other_total", "Other", "House Wrap", input_data.house_wrap_rolls, "roll",
+         prices.other["house_wrap"], input_data.house_wrap_rolls > 0),
+        ("other_total", "Other", "Fur Out", input_data.fur_out_count, "ea",
+         prices.other["fur_out"], input_data.fur_out_count > 0),
+        ("other_total", "Other", f"Cleanup ({'Full' if cleanup_full else 'Standard'})", 1, "ea",
+         prices.other["cleanup_full" if cleanup_full else "cleanup_standard"], True),
+    ]
+
+    result = QuoteResult(
+        siding_product_name=prices.siding_names.get(input_data.siding_product, "Unknown"),
+        siding_profile=input_data.siding_profile,
+        siding_color=input_data.siding_color,
+        g8_color=input_data.g8_color,
+    )
+    if input_data.measurements:
+        result.property_address = input_data.measurements.property_address
+        result.property_id = input_data.measurements.property_id
+
+    totals = dict.fromkeys(
+        ("siding_package_total", "soffit_fascia_package_total", "gutters_total", "wraps_total", "other_total"), 0,
+    )
+    line_items = []
+    for total_field, category, description, quantity, unit, price, priced in lines:
+        if priced:
+            line = LineItem(
+                category=category, description=description, quantity=quantity, unit=unit,
+                unit_price=price.price, total=round(quantity * price.price, 2),
+            )
+            line_items.append(line)
+            totals[total_field] += line.total
+    if input_data.extra_labor > 0:
+        line_items.append(LineItem(
+            category="Other", description="Additional Labor/Fuel", quantity=1, unit="$",
+            unit_price=input_data.extra_labor, total=input_data.extra_labor,
+        ))
+        totals["other_total"] += input_data.extra_labor
+
+    for total_field, total in totals.items():
+        setattr(result, total_field, total)
+    result.line_items = line_items
+    result.grand_total = round(sum(totals.values()), 2)
+    result.deposit_50 = round(result.grand_total / 2, 2)
+    result.balance_50 = round(result.grand_total - result.deposit_50, 2)
+    return result
+
+
+def compare_quotes(old: QuoteResult, new: QuoteResult) -> Optional[str]:
+    """
+    Why two quotes of the same input differ beyond the intended drift, or None.
+
+    Line items must match, and each line total must be identical unless its
+    exact product quantity x unit price has more than two decimals; then the
+    two may differ by one cent (the float product rounding the wrong way).
+    Grand totals must differ by exactly the sum of those per-line cents.
+    """
+    if len(old.line_items) != len(new.line_items):
+        return f"{len(old.line_items)} float lines != {len(new.line_items)} cents lines"
+    drift_cents = 0
+    for old_line, new_line in zip(old.line_items, new.line_items):
+        if (old_line.description, old_line.quantity, old_line.unit_price) != \
+                (new_line.description, new_line.quantity, new_line.unit_price):
+            return f"line {old_line.description!r} differs"
+        diff = round((new_line.total - old_line.total) * 100)
+        exact = Decimal(repr(old_line.quantity)) * Decimal(repr(old_line.unit_price))
+        if diff and (abs(diff) > 1 or exact == exact.quantize(CENT)):
+            return f"{old_line.description}: float {old_line.total!r} != cents {new_line.total!r}"
+        drift_cents += diff
+    if to_cents(new.grand_total) - to_cents(old.grand_total) != drift_cents:
+        return f"grand total float {old.grand_total!r} != cents {new.grand_total!r} ({drift_cents:+d} cent drift)"
+    if not drift_cents and (old.deposit_50, old.balance_50) != (new.deposit_50, new.balance_50):
+        return f"deposit/balance float {old.deposit_50!r}/{old.balance_50!r} != cents {new.deposit_50!r}/{new.balance_50!r}"
+    return None
+
+
+def _sample_inputs(count: int, seed: int = 0) -> list:
+    """Typical jobs with squares and LF to 0.01, and some typed to 0.001"""
+    rnd = random.Random(seed)
+
+    def measure(low, high):
+        return round(rnd.uniform(low, high), rnd.choice((0, 1, 2, 2, 3)))
+
+    return [
+        QuoteInput(
+            siding_product=rnd.choice(list(SIDING_PRODUCTS)),
+            siding_squares=measure(5, 80), inside_corners=rnd.randint(0, 12), outside_corners=rnd.randint(0, 20),
+            soffit_lf=measure(0, 300), soffit_width_over_16=rnd.random() < 0.5,
+            fascia_frieze_lf=measure(0, 300), porch_beam_lf=measure(0, 60),
+            new_gutter_lf=measure(0, 250), rehang_gutter_lf=measure(0, 100), rotten_wood_lf=measure(0, 40),
+            window_wrap_count=rnd.randint(0, 20), door_wrap_count=rnd.randint(0, 4), vent_count=rnd.randint(0, 4),
+            wraps_are_metal=rnd.random() < 0.5, cleanup_type=rnd.choice(("standard", "full")),
+            extra_labor=rnd.choice((0, 150, 99.99)),
+        )
+        for _ in range(count)
+    ]
+
+
+def check_quotes(count: int = 20000) -> tuple:
+    """
+    Compare float_quote and calculate_quote on sample jobs.
+
+    Returns (quotes checked, quotes whose grand total moved, largest move in
+    cents); raises on anything beyond the intended one-cent-per-line drift.
+    """
+    moved, largest = 0, 0
+    for quote_input in _sample_inputs(count):
+        old, new = float_quote(quote_input), calculate_quote(quote_input)
+        problem = compare_quotes(old, new)
+        if problem:
+            raise AssertionError(f"{problem}; input {quote_input.model_dump_json()}")
+        drift = abs(to_cents(new.grand_total) - to_cents(old.grand_total))
+        moved += drift > 0
+        largest = max(largest, drift)
+    return count, moved, largest
+
+
+def bench_lines(iterations: int) -> tuple:
+    """Time float vs. cents line arithmetic over the catalog x quantity grid"""
+    pairs = [(q, p) for p in _catalog_prices() for q in _quantities()[::25]]
+    cents_pairs = [(q, to_cents(p)) for q, p in pairs]
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        total = 0.0
+        for quantity, price in pairs:
+            total += round(quantity * price, 2)
+    float_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        total_cents = 0
+        for quantity, price_cents in cents_pairs:
+            total_cents += line_total_cents(quantity, price_cents)
+    cents_time = time.perf_counter() - start
+
+    return len(pairs) * iterations, float_time, cents_time
+
+
+def bench_quote(iterations: int) -> tuple:
+    """Time full float_quote and calculate_quote runs on a typical job"""
+    quote_input = QuoteInput(
+        siding_squares=24.5, inside_corners=4, outside_corners=9,
+        soffit_lf=180.3, fascia_frieze_lf=212.5, porch_beam_lf=37.7,
+        new_gutter_lf=154.2, window_wrap_count=14, door_wrap_count=2,
+        vent_count=2, dryer_vent_count=1, shutter_pairs=3, extra_labor=150,
+    )
+    timings = []
+    for calculate in (float_quote, calculate_quote):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            calculate(quote_input)
+        timings.append(time.perf_counter() - start)
+    return tuple(timings)
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    checked = check_identical()
+    print(f"identical line totals: {checked:,} price x quantity pairs")
+
+    ops, float_time, cents_time = bench_lines(iterations)
+    print(f"float lines:  {ops / float_time:>12,.0f} lines/s")
+    print(f"cents lines:  {ops / cents_time:>12,.0f} lines/s")
+
+    quotes, moved, largest = check_quotes()
+    print(f"quotes: {quotes:,} compared, {moved:,} grand totals moved (at most {largest} cent(s)) by exact rounding")
+
+    float_time, cents_time = bench_quote(iterations * 100)
+    print(f"float quotes: {iterations * 100 / float_time:>12,.0f} quotes/s")
+    print(f"cents quotes: {iterations * 100 / cents_time:>12,.0f} quotes/s")
@@ -0,0 +1,297 @@
+"""
+Bulk Quote - Price a CSV/JSONL file of QuoteInput rows from the command line
+
+Rows are read lazily, priced in chunks across a process pool and written out
+in input order as soon as each chunk is done. Only a bounded number of
+chunks is in flight at once, so memory stays flat for million-row files.
+
+Input rows use QuoteInput field names. In CSV, empty cells take the default
+and measurement fields go in "measurements.<field>" columns; JSONL rows are
+QuoteInput objects. Any other columns (lead id, rep, ...) are copied to the
+output unchanged; one named like a result column (row, status, error or a
+total) is written as "input.<name>" so it can't overwrite the result.
+
+Output has one row per input row: the pass-through columns, status/error,
+and the category and grand totals. CSV output takes its pass-through columns
+from the CSV input's header (for JSONL input, from the first row).
+--line-items writes every priced line item to a second file keyed by row
+number. Exits 1 if any row failed validation, failed to price or wasn't a
+JSON object (those rows are written with status "error").
+
+Usage:
+    python bulk_quote.py leads.csv -o quotes.csv [--line-items lines.csv]
+                         [--tenant macon] [--workers N] [--chunk 1000]
+    cat leads.jsonl | python bulk_quote.py - --input-format jsonl -o - --output-format jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from pydantic import ValidationError
+
+from quote_calculator import QuoteInput, calculate_quote
+from tenants import DEFAULT_TENANT, UnknownTenantError, price_tables
+
+TOTAL_FIELDS = [
+    "siding_product_name", "siding_package_total", "soffit_fascia_package_total",
+    "gutters_total", "wraps_total", "other_total", "grand_total", "deposit_50", "balance_50",
+]
+LINE_ITEM_FIELDS = ["row", "category", "description", "quantity", "unit", "unit_price", "total"]
+INPUT_FIELDS = set(QuoteInput.model_fields)
+RESULT_FIELDS = {"row", "status", "error", *TOTAL_FIELDS}
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def _format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def _csv_row(row: dict) -> dict:
+    """CSV cells -> QuoteInput-shaped dict (empty cells dropped, measurements nested)"""
+    data, measurements = {}, {}
+    for column, value in row.items():
+        if column is None or value is None or value == "":
+            continue
+        if column.startswith("measurements."):
+            measurements[column[len("measurements."):]] = value
+        else:
+            data[column] = value
+    if measurements:
+        data["measurements"] = measurements
+    return data
+
+
+class BadRow:
+    """An input line that couldn't be read as a row (priced as an error row)"""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+def passthrough_name(column: str) -> str:
+    """Output name of a pass-through column ("input.<name>" if it collides with a result column)"""
+    return f"input.{column}" if column in RESULT_FIELDS else column
+
+
+def passthrough_columns(fieldnames: list) -> list:
+    """Output names of the CSV header columns that aren't QuoteInput fields"""
+    return [
+        passthrough_name(name) for name in fieldnames
+        if name not in INPUT_FIELDS and not name.startswith("measurements.")
+    ]
+
+
+def read_rows(stream, fmt: str) -> tuple[Optional[list], Iterator]:
+    """
+    Input rows, read lazily.
+
+    Returns:
+        (pass-through columns from the CSV header, or None for JSONL;
+         iterator of row dicts, or BadRow for lines that aren't JSON objects)
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        return passthrough_columns(reader.fieldnames or []), (_csv_row(row) for row in reader)
+    return None, _jsonl_rows(stream)
+
+
+def _jsonl_rows(stream) -> Iterator:
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield BadRow(f"invalid JSON: {e}")
+            continue
+        yield row if isinstance(row, dict) else BadRow(f"row must be a JSON object, not {type(row).__name__}")
+
+
+def chunked(rows: Iterator, size: int, first_row: int = 1) -> Iterator[tuple[int, list]]:
+    """Group rows into (first row number, rows) chunks"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield first_row, chunk
+            first_row += size
+            chunk = []
+    if chunk:
+        yield first_row, chunk
+
+
+# ============================================================================
+# PRICING (worker processes)
+# ============================================================================
+
+_prices = None
+
+
+def _init_worker(tenant: str):
+    global _prices
+    _prices = price_tables.get(tenant)
+
+
+def price_chunk(task: tuple) -> tuple[list, list]:
+    """
+    Price one chunk of rows.
+
+    Returns:
+        (result records, line item records)
+    """
+    first_row, rows, with_lines = task
+    results, lines = [], []
+    for row_number, row in enumerate(rows, first_row):
+        if isinstance(row, BadRow):
+            results.append({"row": row_number, "status": "error", "error": row.error})
+            continue
+        passthrough = {passthrough_name(key): value for key, value in row.items() if key not in INPUT_FIELDS}
+        try:
+            quote = calculate_quote(QuoteInput.model_validate(row), _prices)
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results.append({"row": row_number, **passthrough, "status": "error", "error": message})
+            continue
+        except Exception as e:
+            # One bad row must not abort the run
+            results.append({"row": row_number, **passthrough, "status": "error", "error": f"{type(e).__name__}: {e}"})
+            continue
+        results.append({
+            "row": row_number, **passthrough, "status": "ok", "error": "",
+            **{field: getattr(quote, field) for field in TOTAL_FIELDS},
+        })
+        if with_lines:
+            lines.extend(
+                {"row": row_number, **line.model_dump()} for line in quote.line_items
+            )
+    return results, lines
+
+
+def price_rows(chunks: Iterator[tuple[int, list]], workers: int, tenant: str, with_lines: bool) -> Iterator[tuple[list, list]]:
+    """
+    Price chunks across a process pool, yielding results in input order.
+
+    At most 2 x workers chunks are queued or running at a time, so reading
+    the input never runs ahead of pricing.
+    """
+    window = max(2, 2 * workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tenant,)) as pool:
+        pending = deque()
+        for first_row, rows in chunks:
+            pending.append(pool.submit(price_chunk, (first_row, rows, with_lines)))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+class RecordWriter:
+    """CSV or JSONL writer; CSV columns are fixed by the first record"""
+
+    def __init__(self, stream, fmt: str, columns: Optional[list] = None):
+        self.stream = stream
+        self.fmt = fmt
+        self.columns = columns
+        self._csv = None
+
+    def write(self, record: dict):
+        if self.fmt == "jsonl":
+            self.stream.write(json.dumps(record) + "\n")
+            return
+        if self._csv is None:
+            self.columns = self.columns or list(record)
+            self._csv = csv.DictWriter(self.stream, fieldnames=self.columns, extrasaction="ignore")
+            self._csv.writeheader()
+        self._csv.writerow(record)
+
+
+def _result_columns(passthrough: list) -> list:
+    return ["row", *passthrough, "status", "error", *TOTAL_FIELDS]
+
+
+def _record_passthrough(record: dict) -> list:
+    return [key for key in record if key not in RESULT_FIELDS]
+
+
+def _open(path: str, mode: str):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Price a CSV/JSONL file of quote inputs")
+    parser.add_argument("input", help="input file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout")
+    parser.add_argument("--line-items", help="also write flattened line items to this file")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"))
+    parser.add_argument("--output-format", choices=("csv", "jsonl"))
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help="price with this tenant's catalog")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=1000, help="rows per chunk")
+    args = parser.parse_args(argv)
+
+    # Fail on an unknown tenant before starting workers
+    try:
+        price_tables.get(args.tenant)
+    except UnknownTenantError:
+        parser.error(f"unknown tenant '{args.tenant}'")
+
+    input_format = _format(args.input, args.input_format)
+    output_format = _format(args.output, args.output_format)
+
+    rows = errors = 0
+    start = last_report = time.perf_counter()
+    with _open(args.input, "r") as source, _open(args.output, "w") as sink:
+        results_writer = RecordWriter(sink, output_format)
+        lines_file = _open(args.line_items, "w") if args.line_items else None
+        lines_writer = RecordWriter(lines_file, _format(args.line_items, None), LINE_ITEM_FIELDS) if lines_file else None
+        try:
+            passthrough, input_rows = read_rows(source, input_format)
+            if passthrough is not None:
+                results_writer.columns = _result_columns(passthrough)
+            chunks = chunked(input_rows, args.chunk)
+            for results, lines in price_rows(chunks, args.workers, args.tenant, lines_writer is not None):
+                for record in results:
+                    if results_writer.columns is None and output_format == "csv":
+                        results_writer.columns = _result_columns(_record_passthrough(record))
+                    results_writer.write(record)
+                    errors += record["status"] == "error"
+                for line in lines:
+                    lines_writer.write(line)
+                rows += len(results)
+
+                now = time.perf_counter()
+                if now - last_report >= 5:
+                    print(f"{rows:,} rows  {rows / (now - start):,.0f} rows/s  {errors:,} errors", file=sys.stderr)
+                    last_report = now
+        finally:
+            if lines_file is not None:
+                lines_file.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"priced {rows:,} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s), "
+        f"{errors:,} errors",
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Fuzz - differential check of alternate pricing engines against calculate_quote
+
+Generates random but valid QuoteInputs (PDF measurements with fractional and
+missing squares, corner fallbacks, every waste_percent branch, wood/metal
+wraps, both cleanup types, unknown products, extra labor) and random price
+tables, then checks each alternate engine against calculate_quote:
+
+    live     LiveQuoteSession after a series of random field diffs
+             (identical line items, totals and header)
+    reprice  QuantityBook stored vectors re-priced under a random table
+             (identical grand totals)
+    catalog  A tenant-style table recompiled from PriceTable.catalog()
+             (identical quotes)
+    float    The original float calculator (bench_money.float_quote) under
+             a random table: identical line items, and identical totals
+             except the intended drift fix - a line whose exact total has
+             more than two decimals may differ by one cent, and the grand
+             total by exactly the sum of those cents (see
+             bench_money.compare_quotes)
+
+Work is split into seeded chunks run across all cores; a chunk's seed plus
+the failing index reproduces any mismatch. Exits 1 if anything differs.
+
+Usage:
+    python fuzz_pricing.py [-n CASES] [--engines live,reprice,catalog] [--workers N] [--seed S]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from bench_money import compare_quotes, float_quote
+from hover_parser import HoverMeasurements
+from live_quote import LiveQuoteSession
+from money import to_cents
+from quote_calculator import (
+    QuoteInput, CATALOG_SECTIONS, DEFAULT_PRICE_TABLE, calculate_quote, compile_price_table,
+)
+from repricing import QuantityBook, quantity_vector
+from tenants import merge_catalog
+
+FUZZ_TENANT = "fuzz"
+
+# Fields LiveQuoteSession diffs may touch (everything but the token)
+LIVE_FIELDS = [name for name in QuoteInput.model_fields if name != "measurements_token"]
+
+
+# ============================================================================
+# GENERATORS
+# ============================================================================
+
+def _squares(rnd: random.Random):
+    """Hover squares: whole, quarters, thirds, 2-decimal, some 3-decimal or missing"""
+    whole = rnd.randint(0, 80)
+    kind = rnd.random()
+    if kind < 0.1:
+        return None
+    if kind < 0.5:
+        return whole + rnd.choice((0, 0.25, 0.5, 0.75))
+    if kind < 0.75:
+        return whole + rnd.choice((1, 2)) / 3
+    if kind < 0.9:
+        return round(whole + rnd.random(), 2)
+    return round(whole + rnd.random(), 3)
+
+
+def _lf(rnd: random.Random) -> float:
+    """Linear feet: often zero, otherwise whole, tenths, hundredths or thousandths"""
+    if rnd.random() < 0.4:
+        return 0
+    return round(rnd.uniform(0, 500), rnd.choice((0, 1, 2, 3)))
+
+
+def _count(rnd: random.Random) -> int:
+    return 0 if rnd.random() < 0.5 else rnd.randint(1, 25)
+
+
+def random_measurements(rnd: random.Random) -> HoverMeasurements:
+    return HoverMeasurements(
+        property_address=rnd.choice((None, "319 Walden Station Drive, Macon, GA")),
+        property_id=rnd.choice((None, str(rnd.randint(100000, 999999)))),
+        siding_squares_0_waste=_squares(rnd),
+        siding_squares_10_waste=_squares(rnd),
+        siding_squares_18_waste=_squares(rnd),
+        inside_corners_count=rnd.choice((None, rnd.randint(0, 20))),
+        outside_corners_count=rnd.choice((None, rnd.randint(0, 20))),
+    )
+
+
+def random_quote_input(rnd: random.Random) -> QuoteInput:
+    """A random valid QuoteInput exercising every pricing branch"""
+    products = list(DEFAULT_PRICE_TABLE.siding_prices) + ["discontinued_product"]
+    return QuoteInput(
+        measurements=random_measurements(rnd) if rnd.random() < 0.8 else None,
+        siding_product=rnd.choice(products),
+        siding_profile=rnd.choice(("D-4", "D-5", "Dutch Lap")),
+        siding_color=rnd.choice(("Harbor Gray", "Sandstone", "Pebble")),
+        waste_percent=rnd.choice((10, 14, 16, 18, rnd.randint(0, 25))),
+        g8_color=rnd.choice(("Charcoal", "White")),
+        siding_squares=_squares(rnd) if rnd.random() < 0.3 else None,
+        inside_corners=_count(rnd),
+        outside_corners=_count(rnd),
+        soffit_lf=_lf(rnd),
+        soffit_width_over_16=rnd.random() < 0.5,
+        fascia_frieze_lf=_lf(rnd),
+        porch_beam_lf=_lf(rnd),
+        porch_ceiling_count=_count(rnd),
+        bird_box_count=_count(rnd),
+        extra_bend_lf=_lf(rnd),
+        remove_soffit_lf=_lf(rnd),
+        include_fan_fold=rnd.random() < 0.7,
+        include_remove_dispose=rnd.random() < 0.7,
+        include_fullback=rnd.random() < 0.3,
+        dormers_count=_count(rnd),
+        window_buildup_count=_count(rnd),
+        wraps_are_metal=rnd.random() < 0.5,
+        window_wrap_count=_count(rnd),
+        door_wrap_count=_count(rnd),
+        transom_wrap_count=_count(rnd),
+        garage_door_wrap_count=_count(rnd),
+        vent_count=_count(rnd),
+        light_panel_count=_count(rnd),
+        receptacle_count=_count(rnd),
+        faucet_count=_count(rnd),
+        dryer_vent_count=_count(rnd),
+        shutter_pairs=_count(rnd),
+        new_gutter_lf=_lf(rnd),
+        rehang_gutter_lf=_lf(rnd),
+        rotten_wood_lf=_lf(rnd),
+        osb_sheets=_count(rnd),
+        house_wrap_rolls=_count(rnd),
+        fur_out_count=_count(rnd),
+        cleanup_type=rnd.choice(("standard", "full", "dumpster")),
+        extra_labor=rnd.choice((0, 0, 150, 99.99, round(rnd.uniform(0, 2000), 2))),
+    )
+
+
+def random_price_table(rnd: random.Random):
+    """Default catalog with a random third of prices changed (whole dollars or cents)"""
+    def new_price(price):
+        if rnd.random() < 0.5:
+            return rnd.randint(1, 2 * int(price) + 2)
+        return round(rnd.uniform(0.5, 2 * price + 2), 2)
+
+    # catalog() leaves out derived prices (gutter rehang), which can't be overridden
+    catalog = DEFAULT_PRICE_TABLE.catalog()
+    overrides = {
+        "siding_products": {
+            key: {"price": new_price(product["price"])}
+            for key, product in catalog["siding_products"].items() if rnd.random() < 0.33
+        },
+    }
+    for section in CATALOG_SECTIONS:
+        overrides[section] = {
+            key: new_price(price) for key, price in catalog[section].items() if rnd.random() < 0.33
+        }
+    return compile_price_table(merge_catalog(catalog, overrides), FUZZ_TENANT)
+
+
+# ============================================================================
+# ENGINES
+# ============================================================================
+# Each engine checks a batch of inputs and returns a list of
+# (index, detail) mismatches.
+
+def check_live(inputs: list, rnd: random.Random) -> list:
+    prices = random_price_table(rnd)
+    mismatches = []
+    for index, base in enumerate(inputs):
+        session = LiveQuoteSession(base, prices)
+        expected_input = base
+        for _ in range(rnd.randint(1, 3)):
+            target = random_quote_input(rnd)
+            changes = {name: getattr(target, name) for name in rnd.sample(LIVE_FIELDS, rnd.randint(1, 6))}
+            session.apply(changes)
+            expected_input = expected_input.model_copy(update=changes)
+        expected = calculate_quote(expected_input, prices)
+        if session.quote() != expected:
+            mismatches.append((index, f"live quote differs, input after diffs: {expected_input.model_dump_json()}"))
+    return mismatches
+
+
+def check_reprice(inputs: list, rnd: random.Random) -> list:
+    book = QuantityBook()
+    for index, quote_input in enumerate(inputs):
+        result = calculate_quote(quote_input)
+        book.add(index, FUZZ_TENANT, "open", to_cents(result.grand_total), quantity_vector(result),
+                 quote_input.model_dump_json())
+
+    prices = random_price_table(rnd)
+    report = book.reprice(prices, ("open",), limit=len(inputs))
+    repriced = {change["id"]: change["grand_total_after"] for change in report["changes"]}
+
+    mismatches = []
+    for index, quote_input in enumerate(inputs):
+        expected = calculate_quote(quote_input, prices).grand_total
+        got = repriced.get(index, calculate_quote(quote_input).grand_total)
+        if got != expected:
+            mismatches.append((index, f"reprice {got!r} != {expected!r}"))
+    return mismatches
+
+
+def check_catalog(inputs: list, rnd: random.Random) -> list:
+    reference = random_price_table(rnd)
+    recompiled = compile_price_table(merge_catalog(DEFAULT_PRICE_TABLE.catalog(), reference.catalog()), FUZZ_TENANT)
+    if recompiled != reference:
+        return [(0, "recompiled catalog differs from the original table")]
+    return [
+        (index, "catalog quote differs")
+        for index, quote_input in enumerate(inputs)
+        if calculate_quote(quote_input, recompiled) != calculate_quote(quote_input, reference)
+    ]
+
+
+def check_float(inputs: list, rnd: random.Random) -> list:
+    prices = random_price_table(rnd)
+    mismatches = []
+    for index, quote_input in enumerate(inputs):
+        problem = compare_quotes(float_quote(quote_input, prices), calculate_quote(quote_input, prices))
+        if problem:
+            mismatches.append((index, f"{problem}, input: {quote_input.model_dump_json()}"))
+    return mismatches
+
+
+ENGINES = {
+    "live": check_live,
+    "reprice": check_reprice,
+    "catalog": check_catalog,
+    "float": check_float,
+}
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+def run_chunk(task: tuple) -> dict:
+    """Generate one seeded chunk of inputs and check every engine against it"""
+    seed, chunk, size, engines = task
+    chunk_seed = f"{seed}:{chunk}"
+    rnd = random.Random(chunk_seed)
+    inputs = [random_quote_input(rnd) for _ in range(size)]
+
+    timings, failures = {}, []
+    for name in engines:
+        start = time.perf_counter()
+        for index, detail in ENGINES[name](inputs, random.Random(f"{chunk_seed}:{name}")):
+            failures.append({"engine": name, "chunk_seed": chunk_seed, "index": index, "detail": detail})
+        timings[name] = time.perf_counter() - start
+    return {"cases": size, "timings": timings, "failures": failures}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--cases", type=int, default=1_000_000, help="random inputs per engine")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma-separated engines")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=2000, help="inputs per chunk")
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--max-failures", type=int, default=10, help="mismatches to print")
+    args = parser.parse_args(argv)
+
+    engines = [name.strip() for name in args.engines.split(",") if name.strip()]
+    unknown = [name for name in engines if name not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engine(s) {', '.join(unknown)}; expected {', '.join(ENGINES)}")
+
+    chunks = (args.cases + args.chunk - 1) // args.chunk
+    tasks = [
+        (args.seed, chunk, min(args.chunk, args.cases - chunk * args.chunk), engines)
+        for chunk in range(chunks)
+    ]
+    print(f"fuzzing {args.cases:,} inputs x {len(engines)} engine(s) on {args.workers} worker(s)")
+
+    cases, failures = 0, []
+    engine_time = dict.fromkeys(engines, 0.0)
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for done, result in enumerate(pool.imap_unordered(run_chunk, tasks), 1):
+            cases += result["cases"]
+            failures.extend(result["failures"])
+            for name, seconds in result["timings"].items():
+                engine_time[name] += seconds
+            if done % max(1, chunks // 10) == 0 or done == chunks:
+                elapsed = time.perf_counter() - start
+                print(f"  {cases:>12,} inputs  {cases / elapsed:>10,.0f} inputs/s  {len(failures)} mismatch(es)")
+    elapsed = time.perf_counter() - start
+
+    print(f"done in {elapsed:.1f}s")
+    for name in engines:
+        # Engine time is summed across workers, so this is per-core throughput
+        print(f"  {name:<8} {cases / engine_time[name]:>10,.0f} checks/s per core")
+
+    for failure in failures[:args.max_failures]:
+        print(f"MISMATCH {failure['engine']} chunk {failure['chunk_seed']} #{failure['index']}: {failure['detail']}")
+    if failures:
+        print(f"{len(failures)} mismatch(es)")
+        return 1
+    print("all engines match calculate_quote")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
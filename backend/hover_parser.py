@@ -3,11 +3,90 @@ Hover PDF Parser - Extracts measurements from Hover "Complete Measurements" PDF
 """
 import re
 import math
+import threading
 import pdfplumber
-from typing import Optional
+import pypdfium2 as pdfium
+from pdfplumber.utils import cluster_objects
+from typing import Any, Iterable, Iterator, Optional
 from pydantic import BaseModel
 
 
+# PDFium is not thread-safe: every pdfium call in the process (fast parses,
+# pdf_guard checks, thumbnails) is made holding this lock
+PDFIUM_LOCK = threading.Lock()
+
+
+# ============================================================================
+# PARSER PATTERNS (compiled once at import)
+# ============================================================================
+
+_SQUARES_VALUE = r'(\d+[½¼¾⅓⅔]?)'
+
+LENGTH_RE = re.compile(r"(\d+)'?\s*(\d+)?\"?")
+SQFT_RE = re.compile(r'([\d,]+)\s*(?:ft²|sq)')
+SQUARES_RE = re.compile(r'(\d+)([½¼¾⅓⅔])?')
+
+# Address with city/state/zip on page 2 header format: "319 Walden Station Drive, Macon, GA"
+ADDRESS_RE = re.compile(
+    r'(\d+\s+[\w\s]+(?:Drive|Dr|Street|St|Road|Rd|Avenue|Ave|Lane|Ln|Way|Circle|Cir|Court|Ct|Boulevard|Blvd),\s*[\w\s]+,\s*[A-Z]{2})',
+    re.IGNORECASE
+)
+ADDRESS_LINE_RE = re.compile(r'^\d+\s+\w+.*(?:Drive|Dr|Street|St|Road|Rd|Avenue|Ave|Lane|Ln|Way)', re.IGNORECASE)
+CUSTOMER_NAME_RE = re.compile(r'MODEL ID:\s*\d+\s*\n([A-Z][A-Z\s]+)\n')
+PROPERTY_ID_RE = re.compile(r'PROPERTY\s*ID[:\s]*(\d+)', re.IGNORECASE)
+
+# SIDING WASTE TOTALS, "Openings < 33ft²" section
+SQUARES_SECTION_RE = re.compile(
+    r'\+\s*Openings\s*<\s*33ft².*?Zero\s*Waste\s*[\d,]+\s*ft²\s*' + _SQUARES_VALUE +
+    r'.*?\+10%\s*[\d,]+\s*ft²\s*' + _SQUARES_VALUE +
+    r'.*?\+18%\s*[\d,]+\s*ft²\s*' + _SQUARES_VALUE,
+    re.DOTALL | re.IGNORECASE
+)
+ZERO_WASTE_RE = re.compile(r'Zero\s*Waste\s*[\d,]+\s*ft²\s*' + _SQUARES_VALUE)
+TEN_WASTE_RE = re.compile(r'\+10%\s*[\d,]+\s*ft²\s*' + _SQUARES_VALUE)
+EIGHTEEN_WASTE_RE = re.compile(r'\+18%\s*[\d,]+\s*ft²\s*' + _SQUARES_VALUE)
+
+INSIDE_QTY_RE = re.compile(r'Inside\s*Qty\s*(\d+)', re.IGNORECASE)
+OUTSIDE_QTY_RE = re.compile(r'Outside\s*Qty\s*(\d+)', re.IGNORECASE)
+
+# Soffit Breakdown rows: "5 eave 76\" 13' 11\" 88 ft²" (depth, area)
+SOFFIT_BREAKDOWN_RE = re.compile(r'\d+\s+(?:eave|rake)\s+(\d+)"\s+[\d\'\s"]+\s+(\d+)\s*ft²', re.IGNORECASE)
+
+# Areas rows as plain text lines: "Facades 2054 ft²", "Openings 312 ft²"
+FACADES_ROW_RE = re.compile(r'^\s*Facades\s+([\d,]+\s*ft²)', re.IGNORECASE | re.MULTILINE)
+OPENINGS_ROW_RE = re.compile(r'^\s*Openings\s+([\d,]+\s*ft²)', re.IGNORECASE | re.MULTILINE)
+
+# Roofline rows as plain text lines: "Level Frieze Board 128' 5\" 160 ft²"
+ROOFLINE_ROW_RE = re.compile(
+    r'^\s*(Eaves|Rakes|Level|Sloped)\s+(Fascia|Frieze)\D*?(\d+\'\s*(?:\d+")?)([^\n]*)$',
+    re.IGNORECASE | re.MULTILINE
+)
+ROW_SQFT_RE = re.compile(r'[\d,]+\s*ft²')
+
+
+# ============================================================================
+# PARSE ENGINES
+# ============================================================================
+
+# "full" runs pdfplumber layout analysis and reads the known tables from
+# the regions under their section headers (see SECTIONS).
+# "fast" reads the raw text layer with pdfium and recovers everything from
+# text patterns, falling back to "full" if a required field is missing.
+PARSE_ENGINES = ("full", "fast")
+
+# Bump whenever a parser change can alter results (a new field, a fixed
+# pattern). Archived PDFs parsed by an older version are re-parsed in the
+# background (see pdf_archive.py).
+PARSER_VERSION = 1
+
+FAST_REQUIRED_FIELDS = (
+    "siding_squares_10_waste",
+    "siding_squares_18_waste",
+    "inside_corners_count",
+    "outside_corners_count",
+)
+
+
 class HoverMeasurements(BaseModel):
     """Extracted measurements from Hover PDF"""
     # Property info
@@ -59,7 +138,7 @@ def _parse_length(length_str: str) -> Optional[float]:
     if not length_str or length_str == '-':
         return None
     # Match patterns like "134' 1\"" or "103' 8\""
-    match = re.search(r"(\d+)'?\s*(\d+)?\"?", length_str.replace("'", "'").replace('"', '"'))
+    match = LENGTH_RE.search(length_str.replace("'", "'").replace('"', '"'))
     if match:
         feet = int(match.group(1))
         inches = int(match.group(2)) if match.group(2) else 0
@@ -71,7 +150,7 @@ def _parse_sqft(sqft_str: str) -> Optional[float]:
     """Parse square footage string like '1703 ft²' to float"""
     if not sqft_str or sqft_str == '-':
         return None
-    match = re.search(r'([\d,]+)\s*(?:ft²|sq)', sqft_str)
+    match = SQFT_RE.search(sqft_str)
     if match:
         return float(match.group(1).replace(',', ''))
     return None
@@ -88,7 +167,7 @@ def _parse_squares(squares_str: str) -> Optional[float]:
     fraction_map = {'½': 0.5, '¼': 0.25, '¾': 0.75, '⅓': 0.33, '⅔': 0.67}
 
     # Try to extract the number
-    match = re.search(r'(\d+)([½¼¾⅓⅔])?', squares_str)
+    match = SQUARES_RE.search(squares_str)
     if match:
         whole = int(match.group(1))
         frac = fraction_map.get(match.group(2), 0) if match.group(2) else 0
@@ -96,136 +175,604 @@ def _parse_squares(squares_str: str) -> Optional[float]:
     return None
 
 
-def parse_hover_pdf(pdf_path: str) -> HoverMeasurements:
+class ParseReport(BaseModel):
+    """Which engine produced a parse and which fields it filled"""
+    requested_engine: str
+    engine: str
+    fell_back: bool = False
+    page_count: Optional[int] = None
+    pages_read: Optional[int] = None
+    fields_requested: Optional[list[str]] = None
+    fields_filled: list[str] = []
+    missing_required: list[str] = []
+
+
+def _filled_fields(measurements: HoverMeasurements) -> list[str]:
+    """Names of the measurement fields that have a value"""
+    return [name for name, value in measurements.model_dump().items() if value is not None]
+
+
+# ============================================================================
+# FIELD SELECTION
+# ============================================================================
+# A parse can be limited to some measurement fields (fields=). Each field is
+# filled by known section tables (full engine) and text steps (both engines);
+# only those run, and no more pages are read once every requested field is
+# settled.
+
+# Steps of _parse_text_values, plus the fast engine's table rows
+TEXT_STEPS = ("rows", "address", "customer_name", "property_id", "squares", "corners", "porch")
+
+_SQUARES_SOURCES = (("siding waste totals",), ("squares",))
+_AREAS_SOURCES = (("areas",), ("rows",))
+_ROOFLINE_SOURCES = (("roofline",), ("rows",))
+_PORCH_SOURCES = (("soffit breakdown",), ("porch",))
+_NO_SOURCES = ((), ())
+
+# Field -> (sections (see SECTIONS), text steps) that fill it
+FIELD_SOURCES = {
+    "property_address": ((), ("address",)),
+    "property_id": ((), ("property_id",)),
+    "customer_name": ((), ("customer_name",)),
+    "siding_squares_0_waste": _SQUARES_SOURCES,
+    "siding_squares_10_waste": _SQUARES_SOURCES,
+    "siding_squares_18_waste": _SQUARES_SOURCES,
+    "facades_area_sqft": _AREAS_SOURCES,
+    "openings_sqft": _AREAS_SOURCES,
+    "inside_corners_count": (("corners",), ("corners",)),
+    "inside_corners_length": _NO_SOURCES,
+    "outside_corners_count": (("corners",), ("corners",)),
+    "outside_corners_length": _NO_SOURCES,
+    "level_starter_length": _NO_SOURCES,
+    "sloped_starter_length": _NO_SOURCES,
+    "vertical_starter_length": _NO_SOURCES,
+    "soffit_total_sqft": _ROOFLINE_SOURCES,
+    "eaves_fascia_length": _ROOFLINE_SOURCES,
+    "level_frieze_length": _ROOFLINE_SOURCES,
+    "rakes_fascia_length": _ROOFLINE_SOURCES,
+    "sloped_frieze_length": _ROOFLINE_SOURCES,
+    "porch_ceiling_sqft": _PORCH_SOURCES,
+    "porch_beam_lf": _PORCH_SOURCES,
+    "gutter_total_length": _ROOFLINE_SOURCES,
+}
+
+# Sums over every matching row in the document, so never settled early
+ACCUMULATED_FIELDS = {"soffit_total_sqft", "porch_ceiling_sqft", "porch_beam_lf"}
+
+# Filled by a fallback pattern until the preferred one appears in the text
+PREFERRED_PATTERNS = {
+    "property_address": ADDRESS_RE,
+    "siding_squares_0_waste": SQUARES_SECTION_RE,
+    "siding_squares_10_waste": SQUARES_SECTION_RE,
+    "siding_squares_18_waste": SQUARES_SECTION_RE,
+}
+
+
+class ParsePlan:
+    """Sections and text steps a parse runs, and when it can stop reading pages"""
+
+    def __init__(self, fields: Optional[Iterable[str]] = None):
+        """
+        Args:
+            fields: HoverMeasurements field names, or None for every field
+
+        Raises:
+            ValueError: An unknown field name
+        """
+        if fields is None:
+            self.fields = None
+            self.sections = None
+            self.text_steps = TEXT_STEPS
+            self.required = FAST_REQUIRED_FIELDS
+            return
+        self.fields = list(dict.fromkeys(fields))
+        unknown = [name for name in self.fields if name not in FIELD_SOURCES]
+        if unknown:
+            raise ValueError(f"Unknown measurement field(s): {', '.join(unknown)}")
+        self.sections = {section for name in self.fields for section in FIELD_SOURCES[name][0]}
+        steps = {step for name in self.fields for step in FIELD_SOURCES[name][1]}
+        self.text_steps = tuple(step for step in TEXT_STEPS if step in steps)
+        self.required = tuple(name for name in FAST_REQUIRED_FIELDS if name in self.fields)
+
+    def settled(self, measurements: HoverMeasurements, text: str) -> bool:
+        """True when no later page can change a requested field (never for a full parse)"""
+        if self.fields is None:
+            return False
+        for name in self.fields:
+            if FIELD_SOURCES[name] == _NO_SOURCES:
+                continue
+            if name in ACCUMULATED_FIELDS or getattr(measurements, name) is None:
+                return False
+            pattern = PREFERRED_PATTERNS.get(name)
+            if pattern is not None and not pattern.search(text):
+                return False
+        return True
+
+    def select(self, measurements: HoverMeasurements) -> HoverMeasurements:
+        """Only the requested fields (side effects of shared steps are dropped)"""
+        if self.fields is None:
+            return measurements
+        return HoverMeasurements(**{name: getattr(measurements, name) for name in self.fields})
+
+
+def parse_hover_pdf(pdf_path: str, engine: str = "full", fields: Optional[Iterable[str]] = None) -> HoverMeasurements:
     """
     Parse a Hover Complete Measurements PDF and extract key values.
 
     Args:
         pdf_path: Path to the Hover PDF file
+        engine: "full" (pdfplumber tables + text) or "fast" (text layer only)
+        fields: Only extract these HoverMeasurements fields (default: all);
+                the others are left None
 
     Returns:
         HoverMeasurements object with extracted values
     """
+    measurements, _ = parse_hover_pdf_report(pdf_path, engine, fields)
+    return measurements
+
+
+def parse_hover_pdf_report(
+    pdf_path: str, engine: str = "full", fields: Optional[Iterable[str]] = None
+) -> tuple[HoverMeasurements, ParseReport]:
+    """
+    Parse a Hover PDF with the selected engine and report what was found.
+
+    Returns:
+        (HoverMeasurements, ParseReport)
+
+    Raises:
+        ValueError: Unknown engine or field name
+    """
+    if engine not in PARSE_ENGINES:
+        raise ValueError(f"Unknown parse engine '{engine}', expected one of {', '.join(PARSE_ENGINES)}")
+    plan = ParsePlan(fields)
+
+    if engine == "fast":
+        measurements, page_count, pages_read = _parse_fast(pdf_path, plan)
+        missing = [name for name in plan.required if getattr(measurements, name) is None]
+        if not missing:
+            return measurements, ParseReport(
+                requested_engine="fast",
+                engine="fast",
+                page_count=page_count,
+                pages_read=pages_read,
+                fields_requested=plan.fields,
+                fields_filled=_filled_fields(measurements),
+            )
+        measurements, page_count, pages_read = _parse_full(pdf_path, plan)
+        return measurements, ParseReport(
+            requested_engine="fast",
+            engine="full",
+            fell_back=True,
+            page_count=page_count,
+            pages_read=pages_read,
+            fields_requested=plan.fields,
+            fields_filled=_filled_fields(measurements),
+            missing_required=missing,
+        )
+
+    measurements, page_count, pages_read = _parse_full(pdf_path, plan)
+    return measurements, ParseReport(
+        requested_engine="full",
+        engine="full",
+        page_count=page_count,
+        pages_read=pages_read,
+        fields_requested=plan.fields,
+        fields_filled=_filled_fields(measurements),
+    )
+
+
+def _fast_pages(pdf_path: str) -> Iterator[tuple[int, str]]:
+    """Yield (page_count, text of the pages read so far) after each page"""
+    # The lock is taken per page, not held while the caller has the text
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(pdf_path)
+        page_count = len(pdf)
+    try:
+        page_texts = []
+        for index in range(page_count):
+            with PDFIUM_LOCK:
+                page = pdf[index]
+                textpage = page.get_textpage()
+                page_texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+            yield page_count, "\n".join(page_texts) + "\n"
+    finally:
+        with PDFIUM_LOCK:
+            pdf.close()
+
+
+def _fast_measurements(text: str, steps: tuple = TEXT_STEPS) -> HoverMeasurements:
+    """Everything the fast engine can recover from the given text"""
+    measurements = HoverMeasurements()
+    if "rows" in steps:
+        _parse_text_rows(text, measurements)
+    _parse_text_values(text, measurements, steps)
+    return measurements
+
+
+def _parse_fast(pdf_path: str, plan: ParsePlan) -> tuple[HoverMeasurements, int, int]:
+    """
+    Text-only parse using pdfium's text layer (no layout or table analysis).
+
+    Returns:
+        (measurements, page_count, pages read)
+    """
+    page_count, pages_read, full_text = 0, 0, "\n"
+    for pages_read, (page_count, full_text) in enumerate(_fast_pages(pdf_path), 1):
+        if plan.fields is not None and plan.settled(_fast_measurements(full_text, plan.text_steps), full_text):
+            break
+    return plan.select(_fast_measurements(full_text, plan.text_steps)), page_count, pages_read
+
+
+def _full_pages(pdf_path: str, sections: Optional[set] = None) -> Iterator[tuple[int, HoverMeasurements, str]]:
+    """
+    Yield (page_count, measurements, text so far) after each page.
+
+    The same measurements object is yielded every time, with the tables of
+    the pages read so far applied; text patterns are left to the caller.
+    Only the given sections' tables are read (default: all).
+    """
     measurements = HoverMeasurements()
 
     with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
         full_text = ""
         for page in pdf.pages:
             text = page.extract_text() or ""
             full_text += text + "\n"
 
-            # Also extract tables for structured data
-            tables = page.extract_tables()
-            for table in tables:
-                _process_table(table, measurements, text)
+            # Structured values from the known sections' tables
+            if sections is None or sections:
+                _extract_sections(page, measurements, sections)
 
-        # Parse text for values not in tables
-        _parse_text_values(full_text, measurements)
+            yield page_count, measurements, full_text
 
-    return measurements
 
+def _with_text_values(measurements: HoverMeasurements, text: str, steps: tuple) -> HoverMeasurements:
+    """Copy of the table values with text patterns applied to the text so far"""
+    provisional = measurements.model_copy()
+    _parse_text_values(text, provisional, steps)
+    return provisional
 
-def _process_table(table: list, measurements: HoverMeasurements, page_text: str = ""):
-    """Process a table extracted from the PDF"""
-    if not table or len(table) < 2:
-        return
 
-    # Convert table to string for easier searching
-    table_str = " ".join(" ".join(str(cell or "") for cell in row) for row in table).lower()
+def _parse_full(pdf_path: str, plan: ParsePlan) -> tuple[HoverMeasurements, int, int]:
+    """
+    pdfplumber parse: tables on every page, then text patterns.
 
-    # Check for Areas table (Facades, Openings)
-    if 'facades' in table_str and 'ft²' in table_str:
-        for row in table:
-            if not row:
-                continue
-            row_text = str(row[0] or "").lower()
-            if 'facades' in row_text:
-                measurements.facades_area_sqft = _parse_sqft(str(row[1] or ""))
-            elif 'openings' in row_text:
-                measurements.openings_sqft = _parse_sqft(str(row[1] or ""))
-
-    # Check for Corners table
-    if 'inside' in table_str and 'outside' in table_str and 'qty' in table_str:
-        for row in table:
-            if not row:
-                continue
-            row_text = str(row[0] or "").lower()
-            if 'inside' in row_text and 'qty' in row_text:
-                # Try to find the count
-                for cell in row[1:]:
-                    cell_str = str(cell or "")
-                    if cell_str.isdigit():
-                        measurements.inside_corners_count = int(cell_str)
-                        break
-            elif 'outside' in row_text and 'qty' in row_text:
-                for cell in row[1:]:
-                    cell_str = str(cell or "")
-                    if cell_str.isdigit():
-                        measurements.outside_corners_count = int(cell_str)
-                        break
-
-    # Check for Roofline/Fascia table
-    if 'eaves' in table_str or 'fascia' in table_str or 'frieze' in table_str:
-        for row in table:
-            if not row:
-                continue
-            row_text = str(row[0] or "").lower()
-            if 'eaves' in row_text and 'fascia' in row_text:
-                measurements.eaves_fascia_length = _parse_length(str(row[1] or ""))
-                # Eaves fascia = gutter length
-                measurements.gutter_total_length = measurements.eaves_fascia_length
-            elif 'level' in row_text and 'frieze' in row_text:
-                measurements.level_frieze_length = _parse_length(str(row[1] or ""))
-                # Add soffit area from this row if present
-                for cell in row:
-                    sqft = _parse_sqft(str(cell or ""))
-                    if sqft and sqft > 50:  # Likely soffit area
-                        measurements.soffit_total_sqft = (measurements.soffit_total_sqft or 0) + sqft
-            elif 'rakes' in row_text and 'fascia' in row_text:
-                measurements.rakes_fascia_length = _parse_length(str(row[1] or ""))
-            elif 'sloped' in row_text and 'frieze' in row_text:
-                measurements.sloped_frieze_length = _parse_length(str(row[1] or ""))
-                # Add soffit area from this row if present
-                for cell in row:
-                    sqft = _parse_sqft(str(cell or ""))
-                    if sqft and sqft > 50:
-                        measurements.soffit_total_sqft = (measurements.soffit_total_sqft or 0) + sqft
-
-    # Check for Soffit Summary/Breakdown table - look for large depth entries (porch ceiling)
-    # Soffit entries with depth > 48" are likely porch ceilings, not regular eave soffits
-    # Regular eave soffits are typically 12-24" deep
-    if 'soffit' in table_str:
-        for row in table:
-            if not row:
-                continue
-            row_text = ' '.join(str(cell or '') for cell in row).lower()
-            # Look for depth values indicating porch ceiling (> 48")
-            # Check each cell for large depth measurements
-            for i, cell in enumerate(row):
-                cell_str = str(cell or '').strip()
-                # Look for inch measurements like "76\"" or "72\"" or values > 48
-                depth_match = re.search(r'(\d+)"', cell_str)
-                if depth_match:
-                    depth_inches = int(depth_match.group(1))
-                    if depth_inches > 48:  # Porch ceiling threshold
-                        # Find the area value in this row (usually last cell with ft²)
-                        for area_cell in reversed(row):
-                            sqft = _parse_sqft(str(area_cell or ''))
-                            if sqft and sqft > 0:
-                                measurements.porch_ceiling_sqft = (measurements.porch_ceiling_sqft or 0) + sqft
-                                break
-                        break  # Only count once per row
-
-
-def _parse_text_values(text: str, measurements: HoverMeasurements):
-    """Parse values from the full text content"""
+    Returns:
+        (measurements, page_count, pages read)
+    """
+    page_count, pages_read, measurements, full_text = 0, 0, HoverMeasurements(), ""
+    for pages_read, (page_count, measurements, full_text) in enumerate(_full_pages(pdf_path, plan.sections), 1):
+        if plan.fields is not None and plan.settled(_with_text_values(measurements, full_text, plan.text_steps), full_text):
+            break
+
+    # Parse text for values not in tables
+    _parse_text_values(full_text, measurements, plan.text_steps)
+    return plan.select(measurements), page_count, pages_read
+
+
+def _provisional_pages(pdf_path: str, engine: str, plan: ParsePlan) -> Iterator[tuple[int, int, HoverMeasurements, str]]:
+    """Yield (page number, page_count, requested values known so far, text so far) after each page"""
+    if engine == "fast":
+        for page_number, (page_count, text) in enumerate(_fast_pages(pdf_path), 1):
+            yield page_number, page_count, plan.select(_fast_measurements(text, plan.text_steps)), text
+    else:
+        for page_number, (page_count, measurements, text) in enumerate(_full_pages(pdf_path, plan.sections), 1):
+            yield page_number, page_count, plan.select(_with_text_values(measurements, text, plan.text_steps)), text
+
+
+def stream_hover_pdf(
+    pdf_path: str, engine: str = "full", fields: Optional[Iterable[str]] = None
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    Parse a Hover PDF page by page, yielding fields as soon as they are known.
+
+    Text patterns are re-run on the text read so far after every page, so a
+    value can be revised by a later page (e.g. porch ceiling areas that span
+    pages). The final "complete" event is exactly parse_hover_pdf_report's
+    result. If the fast engine falls back, the document is streamed again
+    with the full engine and only values that differ are re-sent. With
+    fields, only those are sent and pages stop once they are settled.
+
+    Yields:
+        ("fields", {"engine", "page", "page_count", "fields": {name: value}})
+        once per page, with the new or changed fields (possibly none), then
+        ("complete", {"measurements": HoverMeasurements, "report": ParseReport})
+    """
+    if engine not in PARSE_ENGINES:
+        raise ValueError(f"Unknown parse engine '{engine}', expected one of {', '.join(PARSE_ENGINES)}")
+    plan = ParsePlan(fields)
+
+    sent: dict[str, Any] = {}
+
+    def page_events(page_engine: str):
+        # Generator result: (measurements after the last page read, page_count, pages read)
+        measurements, page_count, pages_read = None, 0, 0
+        for pages_read, page_count, measurements, text in _provisional_pages(pdf_path, page_engine, plan):
+            changed = {
+                name: value for name, value in measurements.model_dump().items()
+                if value is not None and sent.get(name) != value
+            }
+            sent.update(changed)
+            yield "fields", {"engine": page_engine, "page": pages_read, "page_count": page_count, "fields": changed}
+            if plan.settled(measurements, text):
+                break
+        if measurements is None:
+            measurements = plan.select(_fast_measurements("\n", plan.text_steps)) if page_engine == "fast" else _parse_full(pdf_path, plan)[0]
+        return measurements, page_count, pages_read
+
+    if engine == "fast":
+        measurements, page_count, pages_read = yield from page_events("fast")
+        missing = [name for name in plan.required if getattr(measurements, name) is None]
+        if not missing:
+            report = ParseReport(requested_engine="fast", engine="fast", page_count=page_count)
+        else:
+            measurements, page_count, pages_read = yield from page_events("full")
+            report = ParseReport(
+                requested_engine="fast", engine="full", fell_back=True,
+                page_count=page_count, missing_required=missing,
+            )
+    else:
+        measurements, page_count, pages_read = yield from page_events("full")
+        report = ParseReport(requested_engine="full", engine="full", page_count=page_count)
+
+    report.pages_read = pages_read
+    report.fields_requested = plan.fields
+    report.fields_filled = _filled_fields(measurements)
+    yield "complete", {"measurements": measurements, "report": report}
+
+
+# ============================================================================
+# SECTION TABLES
+# ============================================================================
+# Each known table sits under a section header. Headers are found by word
+# position, so two headers side by side on one line (Areas | Corners) are
+# both found. A header's region runs down to the next header in its column
+# and right to the next header beside it; each table is read from its own
+# region and identified by the header it was found under instead of by
+# guessing from its contents.
+#
+# Ruled tables (Areas, Corners, Roofline) are found from just the ruling
+# lines inside their region, so line/intersection detection never sees the
+# rest of the page (elevation drawings are thousands of edges). Unruled
+# lists (Soffit Breakdown, waste totals) are one row per text line, built
+# from the words inside the region.
+
+# Words whose tops differ by less than this are on the same text line
+LINE_TOLERANCE = 3
+
+
+def _in_bbox(obj: dict, bbox: tuple, tolerance: float = 1) -> bool:
+    x0, top, x1, bottom = bbox
+    return (
+        obj["x0"] >= x0 - tolerance and obj["x1"] <= x1 + tolerance
+        and obj["top"] >= top - tolerance and obj["bottom"] <= bottom + tolerance
+    )
+
+
+def _ruled_table_settings(edges: list) -> dict:
+    """Table settings that detect cells from the given ruling lines only"""
+    return {
+        "vertical_strategy": "explicit",
+        "horizontal_strategy": "explicit",
+        "explicit_vertical_lines": [edge for edge in edges if edge["orientation"] == "v"],
+        "explicit_horizontal_lines": [edge for edge in edges if edge["orientation"] == "h"],
+    }
+
+
+def _cell(row: list, index: int) -> str:
+    return str(row[index] or "") if index < len(row) else ""
+
+
+def _process_areas(rows: list, measurements: HoverMeasurements):
+    for row in rows:
+        label = _cell(row, 0).lower()
+        if 'facades' in label:
+            measurements.facades_area_sqft = _parse_sqft(_cell(row, 1))
+        elif 'openings' in label:
+            measurements.openings_sqft = _parse_sqft(_cell(row, 1))
+
+
+def _process_corners(rows: list, measurements: HoverMeasurements):
+    for row in rows:
+        label = _cell(row, 0).lower()
+        count = next((int(cell) for cell in map(str, row[1:]) if cell.isdigit()), None)
+        if count is None:
+            continue
+        if 'inside' in label:
+            measurements.inside_corners_count = count
+        elif 'outside' in label:
+            measurements.outside_corners_count = count
+
+
+def _process_roofline(rows: list, measurements: HoverMeasurements):
+    for row in rows:
+        label = _cell(row, 0).lower()
+        if 'eaves' in label and 'fascia' in label:
+            measurements.eaves_fascia_length = _parse_length(_cell(row, 1))
+            # Eaves fascia = gutter length
+            measurements.gutter_total_length = measurements.eaves_fascia_length
+        elif 'rakes' in label and 'fascia' in label:
+            measurements.rakes_fascia_length = _parse_length(_cell(row, 1))
+        elif 'frieze' in label and ('level' in label or 'sloped' in label):
+            if 'level' in label:
+                measurements.level_frieze_length = _parse_length(_cell(row, 1))
+            else:
+                measurements.sloped_frieze_length = _parse_length(_cell(row, 1))
+            # Frieze rows carry the soffit area beside the length
+            for cell in row[2:]:
+                sqft = _parse_sqft(str(cell or ""))
+                if sqft and sqft > 50:
+                    measurements.soffit_total_sqft = (measurements.soffit_total_sqft or 0) + sqft
+
+
+def _process_soffit(rows: list, measurements: HoverMeasurements):
+    # Soffits deeper than 48" are porch ceilings, not eave soffits (12-24")
+    for row in rows:
+        for depth_str, area_str in SOFFIT_BREAKDOWN_RE.findall(_cell(row, 0)):
+            if int(depth_str) > 48:
+                measurements.porch_ceiling_sqft = (measurements.porch_ceiling_sqft or 0) + int(area_str)
+
+
+def _process_siding_waste(rows: list, measurements: HoverMeasurements):
+    text = "\n".join(_cell(row, 0) for row in rows)
+    squares_section = SQUARES_SECTION_RE.search(text)
+    if squares_section:
+        measurements.siding_squares_0_waste = _parse_squares(squares_section.group(1))
+        measurements.siding_squares_10_waste = _parse_squares(squares_section.group(2))
+        measurements.siding_squares_18_waste = _parse_squares(squares_section.group(3))
 
+
+# Section header (as printed, matched case-insensitively) -> (ruled table?, processor)
+SECTIONS = {
+    "areas": (True, _process_areas),
+    "corners": (True, _process_corners),
+    "roofline": (True, _process_roofline),
+    "soffit breakdown": (False, _process_soffit),
+    "siding waste totals": (False, _process_siding_waste),
+}
+
+
+SECTION_WORDS = {name: name.split() for name in SECTIONS}
+
+
+def _word_lines(page) -> list:
+    """The page's words grouped into text lines, each left to right"""
+    return [sorted(line, key=lambda word: word["x0"]) for line in cluster_objects(page.extract_words(), "top", LINE_TOLERANCE)]
+
+
+def _line_headers(line: list) -> list:
+    """
+    Section headers making up a whole text line (one, or several side by
+    side), as {"name", "x0", "x1", "top", "bottom"}; [] for any other line.
+    """
+    texts = [word["text"].lower() for word in line]
+    headers, index = [], 0
+    while index < len(line):
+        for name, words in SECTION_WORDS.items():
+            end = index + len(words)
+            if texts[index:end] == words:
+                header_words = line[index:end]
+                headers.append({
+                    "name": name, "x0": header_words[0]["x0"], "x1": header_words[-1]["x1"],
+                    "top": min(word["top"] for word in header_words),
+                    "bottom": max(word["bottom"] for word in header_words),
+                })
+                index = end
+                break
+        else:
+            return []
+    return headers
+
+
+def _extract_sections(page, measurements: HoverMeasurements, sections: Optional[set] = None):
+    """Read the known section tables on a page (default: all) into measurements"""
+    lines = _word_lines(page)
+    headers = [header for line in lines for header in _line_headers(line)]
+    regions = []
+    for header in headers:
+        # A region runs right to the next header beside it (another column)
+        # and down to the next header below it in its own column. Every
+        # header bounds its neighbours' regions, wanted or not.
+        x1 = min(
+            (other["x0"] for other in headers if other["x0"] >= header["x1"] and other["bottom"] > header["top"]),
+            default=page.width,
+        )
+        bottom = min(
+            (other["top"] for other in headers
+             if other["top"] >= header["bottom"] and other["x0"] < x1 and other["x1"] > header["x0"]),
+            default=page.height,
+        )
+        if sections is None or header["name"] in sections:
+            regions.append(((max(0, header["x0"] - 1), header["bottom"], x1, bottom), *SECTIONS[header["name"]]))
+
+    for bbox, ruled, process in regions:
+        if not ruled:
+            rows = []
+            for line in lines:
+                words = [word["text"] for word in line if _in_bbox(word, bbox, 0)]
+                if words:
+                    rows.append([" ".join(words)])
+            if rows:
+                process(rows, measurements)
+
+    ruled_regions = [(bbox, process) for bbox, ruled, process in regions if ruled]
+    if not ruled_regions:
+        return
+    # One table pass over the ruling lines of all ruled regions; each table
+    # belongs to the region it was found in
+    edges = [edge for edge in page.edges if any(_in_bbox(edge, bbox) for bbox, _ in ruled_regions)]
+    if not edges:
+        return
+    for table in page.find_tables(_ruled_table_settings(edges)):
+        for bbox, process in ruled_regions:
+            if _in_bbox(dict(zip(("x0", "top", "x1", "bottom"), table.bbox)), bbox):
+                rows = [row for row in table.extract() if row and any(row)]
+                if rows:
+                    process(rows, measurements)
+                break
+
+
+def _parse_text_rows(text: str, measurements: HoverMeasurements):
+    """Recover the Areas and Roofline table rows from plain text lines"""
+    facades_match = FACADES_ROW_RE.search(text)
+    if facades_match:
+        measurements.facades_area_sqft = _parse_sqft(facades_match.group(1))
+
+    openings_match = OPENINGS_ROW_RE.search(text)
+    if openings_match:
+        measurements.openings_sqft = _parse_sqft(openings_match.group(1))
+
+    for kind, part, length_str, rest in ROOFLINE_ROW_RE.findall(text):
+        kind, part = kind.lower(), part.lower()
+        length = _parse_length(length_str)
+        if kind == 'eaves' and part == 'fascia':
+            measurements.eaves_fascia_length = length
+            # Eaves fascia = gutter length
+            measurements.gutter_total_length = length
+        elif kind == 'rakes' and part == 'fascia':
+            measurements.rakes_fascia_length = length
+        elif part == 'frieze' and kind in ('level', 'sloped'):
+            if kind == 'level':
+                measurements.level_frieze_length = length
+            else:
+                measurements.sloped_frieze_length = length
+            # Same soffit area rule as the table path
+            for sqft_str in ROW_SQFT_RE.findall(rest):
+                sqft = _parse_sqft(sqft_str)
+                if sqft and sqft > 50:
+                    measurements.soffit_total_sqft = (measurements.soffit_total_sqft or 0) + sqft
+
+
+def _parse_text_values(text: str, measurements: HoverMeasurements, steps: tuple = TEXT_STEPS):
+    """Parse values from the full text content (only the given TEXT_STEPS)"""
+    if "address" in steps:
+        _parse_address(text, measurements)
+    if "customer_name" in steps:
+        # Customer name - look for all caps name before date
+        name_match = CUSTOMER_NAME_RE.search(text)
+        if name_match:
+            measurements.customer_name = name_match.group(1).strip().title()
+    if "property_id" in steps:
+        id_match = PROPERTY_ID_RE.search(text)
+        if id_match:
+            measurements.property_id = id_match.group(1)
+    if "squares" in steps:
+        _parse_squares_text(text, measurements)
+    if "corners" in steps:
+        _parse_corners_text(text, measurements)
+    if "porch" in steps:
+        _parse_porch_text(text, measurements)
+
+
+def _parse_address(text: str, measurements: HoverMeasurements):
     # Find address with city/state/zip on page 2 header format: "319 Walden Station Drive, Macon, GA"
     # This is the cleaner format that appears on summary pages
-    address_match = re.search(
-        r'(\d+\s+[\w\s]+(?:Drive|Dr|Street|St|Road|Rd|Avenue|Ave|Lane|Ln|Way|Circle|Cir|Court|Ct|Boulevard|Blvd),\s*[\w\s]+,\s*[A-Z]{2})',
-        text, re.IGNORECASE
-    )
+    address_match = ADDRESS_RE.search(text)
     if address_match:
         measurements.property_address = address_match.group(1).strip()
     else:
@@ -233,28 +780,17 @@ def _parse_text_values(text: str, measurements: HoverMeasurements):
         lines = text.strip().split('\n')
         for line in lines[:3]:
             line = line.strip()
-            if re.search(r'^\d+\s+\w+.*(?:Drive|Dr|Street|St|Road|Rd|Avenue|Ave|Lane|Ln|Way)', line, re.IGNORECASE):
+            if ADDRESS_LINE_RE.search(line):
                 if 'Complete' not in line:
                     measurements.property_address = line
                     break
 
-    # Customer name - look for all caps name before date
-    name_match = re.search(r'MODEL ID:\s*\d+\s*\n([A-Z][A-Z\s]+)\n', text)
-    if name_match:
-        measurements.customer_name = name_match.group(1).strip().title()
-
-    # Property ID
-    id_match = re.search(r'PROPERTY\s*ID[:\s]*(\d+)', text, re.IGNORECASE)
-    if id_match:
-        measurements.property_id = id_match.group(1)
 
+def _parse_squares_text(text: str, measurements: HoverMeasurements):
     # Siding squares from SIDING WASTE TOTALS section
     # Look for the "Openings < 33ft²" section which is the standard
     # Pattern: Zero Waste ... 20¾   +10% ... 22¾   +18% ... 24½
-    squares_section = re.search(
-        r'\+\s*Openings\s*<\s*33ft².*?Zero\s*Waste\s*[\d,]+\s*ft²\s*(\d+[½¼¾⅓⅔]?).*?\+10%\s*[\d,]+\s*ft²\s*(\d+[½¼¾⅓⅔]?).*?\+18%\s*[\d,]+\s*ft²\s*(\d+[½¼¾⅓⅔]?)',
-        text, re.DOTALL | re.IGNORECASE
-    )
+    squares_section = SQUARES_SECTION_RE.search(text)
     if squares_section:
         measurements.siding_squares_0_waste = _parse_squares(squares_section.group(1))
         measurements.siding_squares_10_waste = _parse_squares(squares_section.group(2))
@@ -262,9 +798,9 @@ def _parse_text_values(text: str, measurements: HoverMeasurements):
     else:
         # Try simpler pattern - look for squares values
         # Format in text: "Zero Waste 2054 ft² 20¾"
-        zero_match = re.search(r'Zero\s*Waste\s*[\d,]+\s*ft²\s*(\d+[½¼¾⅓⅔]?)', text)
-        ten_match = re.search(r'\+10%\s*[\d,]+\s*ft²\s*(\d+[½¼¾⅓⅔]?)', text)
-        eighteen_match = re.search(r'\+18%\s*[\d,]+\s*ft²\s*(\d+[½¼¾⅓⅔]?)', text)
+        zero_match = ZERO_WASTE_RE.search(text)
+        ten_match = TEN_WASTE_RE.search(text)
+        eighteen_match = EIGHTEEN_WASTE_RE.search(text)
 
         if zero_match:
             measurements.siding_squares_0_waste = _parse_squares(zero_match.group(1))
@@ -273,23 +809,24 @@ def _parse_text_values(text: str, measurements: HoverMeasurements):
         if eighteen_match:
             measurements.siding_squares_18_waste = _parse_squares(eighteen_match.group(1))
 
+
+def _parse_corners_text(text: str, measurements: HoverMeasurements):
     # Inside corners count from text
-    inside_match = re.search(r'Inside\s*Qty\s*(\d+)', text, re.IGNORECASE)
+    inside_match = INSIDE_QTY_RE.search(text)
     if inside_match and not measurements.inside_corners_count:
         measurements.inside_corners_count = int(inside_match.group(1))
 
     # Outside corners count from text
-    outside_match = re.search(r'Outside\s*Qty\s*(\d+)', text, re.IGNORECASE)
+    outside_match = OUTSIDE_QTY_RE.search(text)
     if outside_match and not measurements.outside_corners_count:
         measurements.outside_corners_count = int(outside_match.group(1))
 
+
+def _parse_porch_text(text: str, measurements: HoverMeasurements):
     # Porch ceiling from Soffit Breakdown - look for entries with large depth (> 48")
     # Pattern in text: "5 eave 76\" 13' 11\" 88 ft²" where 76" is depth
     # Entries with depth > 48" are likely porch ceilings
-    soffit_breakdown_pattern = re.findall(
-        r'\d+\s+(?:eave|rake)\s+(\d+)"\s+[\d\'\s"]+\s+(\d+)\s*ft²',
-        text, re.IGNORECASE
-    )
+    soffit_breakdown_pattern = SOFFIT_BREAKDOWN_RE.findall(text)
     if soffit_breakdown_pattern and not measurements.porch_ceiling_sqft:
         total_sqft = 0
         for depth_str, area_str in soffit_breakdown_pattern:
@@ -310,28 +847,3 @@ def _parse_text_values(text: str, measurements: HoverMeasurements):
         # Most porches are rectangular, so use a factor of ~3.5 for typical proportions
         estimated_perimeter = 4 * math.sqrt(measurements.porch_ceiling_sqft)
         measurements.porch_beam_lf = round(estimated_perimeter, 1)
-
-
-def _parse_float(value) -> Optional[float]:
-    """Safely parse a float from various formats"""
-    if value is None:
-        return None
-    try:
-        # Remove commas and whitespace
-        cleaned = str(value).replace(",", "").strip()
-        return float(cleaned)
-    except (ValueError, TypeError):
-        return None
-
-
-def _extract_sqft_from_row(row: list) -> Optional[float]:
-    """Extract square footage value from a table row"""
-    for cell in row:
-        if cell is None:
-            continue
-        cell_str = str(cell)
-        # Look for numbers that could be sq ft
-        match = re.search(r'([\d,]+(?:\.\d+)?)', cell_str)
-        if match:
-            return _parse_float(match.group(1))
-    return None
@@ -0,0 +1,106 @@
+"""
+Live Quote - Server-side quote session with incremental re-pricing
+
+A session holds one QuoteInput and the priced packages for each category.
+Clients send only the fields that changed; the session validates just those
+fields, re-prices only the categories that read them (CATEGORY_FIELDS) and
+reports the categories whose line items actually changed.
+"""
+from typing import Any, Dict, Optional
+
+from quote_calculator import (
+    QuoteInput, QuoteResult, PriceTable, CATEGORY_PACKAGES, CATEGORY_FIELDS,
+    DEFAULT_PRICE_TABLE, price_category, assemble_quote,
+)
+
+# Fields that only affect the quote header (names, colors, property info)
+HEADER_FIELDS = {"siding_product", "siding_profile", "siding_color", "g8_color", "measurements"}
+
+_validator = QuoteInput.__pydantic_validator__
+
+
+class LiveQuoteSession:
+    """Incrementally re-priced quote for a single client connection"""
+
+    def __init__(self, input_data: QuoteInput, prices: Optional[PriceTable] = None):
+        self.input = input_data
+        self.prices = prices or DEFAULT_PRICE_TABLE
+        self.packages = {category: price_category(category, input_data, self.prices) for category in CATEGORY_PACKAGES}
+        self.result = assemble_quote(self.input, self.packages, self.prices)
+
+    def apply(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a field diff and re-price the affected categories.
+
+        Args:
+            changes: QuoteInput field name -> new value
+
+        Returns:
+            Dict with the changed categories' line items and totals, the
+            quote totals, and the header fields if any of them changed
+
+        Raises:
+            ValueError: unknown field, a value that fails validation, or a
+                        measurements_token without the measurements it
+                        refers to (the caller resolves tokens)
+        """
+        unknown = set(changes) - set(QuoteInput.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if changes.get("measurements_token") and "measurements" not in changes:
+            raise ValueError("measurements_token must be resolved to measurements before it is applied")
+
+        # Validate only the changed fields against a copy, so a bad value
+        # leaves the session untouched
+        new_input = self.input.model_copy()
+        for field, value in changes.items():
+            _validator.validate_assignment(new_input, field, value)
+
+        affected = [
+            category for category, fields in CATEGORY_FIELDS.items()
+            if fields.intersection(changes)
+        ]
+
+        changed = {}
+        for category in affected:
+            package = price_category(category, new_input, self.prices)
+            old_lines, old_cents = self.packages[category]
+            if package[1] != old_cents or package[0] != old_lines:
+                changed[category] = package
+            self.packages[category] = package
+
+        self.input = new_input
+        self.result = assemble_quote(new_input, self.packages, self.prices)
+
+        update = {
+            "categories": {
+                category: {
+                    "line_items": [line.model_dump() for line in lines],
+                    "total": getattr(self.result, CATEGORY_PACKAGES[category][1]),
+                }
+                for category, (lines, _) in changed.items()
+            },
+            "totals": self.totals(),
+        }
+        if HEADER_FIELDS.intersection(changes):
+            update["header"] = self.header()
+        return update
+
+    def totals(self) -> Dict[str, float]:
+        """Category and grand totals of the current quote"""
+        totals = {total_field: getattr(self.result, total_field) for _, total_field in CATEGORY_PACKAGES.values()}
+        totals["grand_total"] = self.result.grand_total
+        totals["deposit_50"] = self.result.deposit_50
+        totals["balance_50"] = self.result.balance_50
+        return totals
+
+    def header(self) -> Dict[str, Any]:
+        """Selection and property fields of the current quote"""
+        return self.result.model_dump(include={
+            "property_address", "property_id", "siding_product_name",
+            "siding_profile", "siding_color", "g8_color",
+        })
+
+    def quote(self) -> QuoteResult:
+        """Full current quote"""
+        return self.result
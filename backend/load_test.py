@@ -0,0 +1,424 @@
+"""
+Load Test - Ramp concurrent traffic against the API and report where it saturates
+
+Starts the app under uvicorn on a free local port (or drives --url), then
+runs a weighted mix of /api/parse-pdf, /api/quick-quote, /api/calculate and
+/api/products traffic at each concurrency level in turn. Every simulated
+rep is a thread with its own keep-alive connection that sends its next
+request as soon as the last one returns.
+
+For each step and endpoint the report has throughput, p50/p95/p99 latency
+and the error rate. An endpoint saturates at the first step where its p95
+is over its SLO or more than --max-error-rate of its requests fail. Its
+throughput is not a signal: every rep picks from the same mix, so a slow
+endpoint holding reps caps the others' throughput too. The app as a whole
+("total" in the saturation report) saturates where total throughput grows
+by less than --min-gain over the previous step, or its error rate is over
+--max-error-rate. The ramp stops once the total and every endpoint have
+saturated. The JSON report goes to -o
+(stdout by default); a summary table goes to stderr.
+
+Uploads are the bundled sample PDFs with a unique trailing comment per
+request, so every upload is a new PDF id and is really parsed. Pass
+--repeat-pdfs to measure the stored-result path instead. Calculate bodies
+use the sample's measurements with randomized options.
+
+A locally started app keeps its databases, archive and caches in a
+temporary directory. Exits 1 when --require-concurrency is given and an
+endpoint or the total saturates at or below it.
+
+Usage:
+    python load_test.py [-o report.json] [--workers 2] [--concurrency 1,2,4,8,16,32]
+                        [--step-seconds 10] [--mix parse-pdf=1,quick-quote=1,calculate=6,products=2]
+                        [--slo parse-pdf=3000,calculate=200] [--require-concurrency 8]
+    python load_test.py --url http://127.0.0.1:8002 --concurrency 4,8
+"""
+import argparse
+import glob
+import http.client
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import urlsplit
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+
+ENDPOINTS = ("parse-pdf", "quick-quote", "calculate", "products")
+DEFAULT_MIX = {"parse-pdf": 1, "quick-quote": 1, "calculate": 6, "products": 2}
+
+# p95 latency objectives in milliseconds
+DEFAULT_SLO_MS = {"parse-pdf": 3000, "quick-quote": 3000, "calculate": 200, "products": 100}
+
+# Data locations of a locally started app (see each module's settings)
+DATA_ENV = {
+    "SIDING_BUDDY_DB": "siding_buddy.db",
+    "SIDING_BUDDY_AUDIT_DB": "audit.db",
+    "SIDING_BUDDY_ARCHIVE_DIR": "pdf_archive",
+    "SIDING_BUDDY_RENDER_CACHE_DIR": "render_cache",
+    "SIDING_BUDDY_SEARCH_SNAPSHOT": "search_index.json",
+    "SIDING_BUDDY_SHARED_CACHE_PATH": "shared_cache",
+}
+
+
+# ============================================================================
+# TRAFFIC
+# ============================================================================
+
+def _multipart(filename: str, content: bytes) -> tuple[bytes, str]:
+    """One-file multipart/form-data body and its content type"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class Traffic:
+    """Builds requests for each endpoint: (method, path, body, headers)"""
+
+    def __init__(self, pdfs: list, measurements: dict, repeat_pdfs: bool):
+        self.pdfs = pdfs
+        self.measurements = measurements
+        self.repeat_pdfs = repeat_pdfs
+
+    def _upload(self, rnd: random.Random, path: str) -> tuple:
+        name, content = rnd.choice(self.pdfs)
+        if not self.repeat_pdfs:
+            # Bytes after %%EOF are ignored by readers but change the PDF id
+            content += f"\n%load-test {uuid.uuid4().hex}\n".encode()
+        body, content_type = _multipart(name, content)
+        return "POST", path, body, {"Content-Type": content_type}
+
+    def request(self, endpoint: str, rnd: random.Random) -> tuple:
+        if endpoint == "parse-pdf":
+            return self._upload(rnd, "/api/parse-pdf")
+        if endpoint == "quick-quote":
+            return self._upload(rnd, f"/api/quick-quote?waste_percent={rnd.choice((14, 16, 18))}")
+        if endpoint == "calculate":
+            body = {
+                "measurements": self.measurements,
+                "waste_percent": rnd.choice((14, 16, 18)),
+                "soffit_lf": round(rnd.uniform(0, 300), 1),
+                "new_gutter_lf": round(rnd.uniform(0, 200), 1),
+                "vent_count": rnd.randint(0, 6),
+                "window_wrap_count": rnd.randint(0, 20),
+                "wraps_are_metal": rnd.random() < 0.5,
+            }
+            return "POST", "/api/calculate", json.dumps(body).encode(), {"Content-Type": "application/json"}
+        return "GET", "/api/products", None, {}
+
+
+class Rep(threading.Thread):
+    """One simulated user sending back-to-back requests until the step ends"""
+
+    def __init__(self, url: str, traffic: Traffic, mix: dict, seed: int, stop_at: float, timeout: float):
+        super().__init__(daemon=True)
+        self.target = urlsplit(url)
+        self.traffic = traffic
+        self.endpoints = list(mix)
+        self.weights = list(mix.values())
+        self.rnd = random.Random(seed)
+        self.stop_at = stop_at
+        self.timeout = timeout
+        self.results: list = []   # (endpoint, seconds, error or None)
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def _send(self, method: str, path: str, body: Optional[bytes], headers: dict) -> Optional[str]:
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.target.hostname, self.target.port or 80, timeout=self.timeout)
+        try:
+            self._conn.request(method, path, body=body, headers=headers)
+            response = self._conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self._conn.close()
+            self._conn = None
+            return type(e).__name__
+        return None if 200 <= response.status < 300 else str(response.status)
+
+    def run(self):
+        while time.monotonic() < self.stop_at:
+            endpoint = self.rnd.choices(self.endpoints, self.weights)[0]
+            request = self.traffic.request(endpoint, self.rnd)
+            start = time.perf_counter()
+            error = self._send(*request)
+            self.results.append((endpoint, time.perf_counter() - start, error))
+        if self._conn is not None:
+            self._conn.close()
+
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def percentile(sorted_values: list, share: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(share * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(results: list, seconds: float) -> dict:
+    """Throughput, latency percentiles (ms) and errors of (seconds, error) results"""
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    errors: dict = {}
+    for _, error in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    failed = sum(errors.values())
+    return {
+        "requests": len(results),
+        "throughput_rps": round(len(results) / seconds, 2) if seconds else 0.0,
+        "p50_ms": _rounded(percentile(latencies, 0.50)),
+        "p95_ms": _rounded(percentile(latencies, 0.95)),
+        "p99_ms": _rounded(percentile(latencies, 0.99)),
+        "error_rate": round(failed / len(results), 4) if results else 0.0,
+        "errors": errors,
+    }
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def saturation_reason(
+    stats: dict, slo_ms: Optional[float], max_error_rate: float,
+    previous: Optional[dict] = None, min_gain: float = 0.0,
+) -> Optional[str]:
+    """
+    Why an endpoint (or the total) is saturated at this step, or None if it is not.
+
+    Throughput gain over previous is only checked when previous is given,
+    which ramp() does for the total alone.
+    """
+    if not stats["requests"]:
+        return None
+    if stats["error_rate"] > max_error_rate:
+        return f"error rate {stats['error_rate']:.1%} over {max_error_rate:.1%}"
+    if slo_ms is not None and stats["p95_ms"] > slo_ms:
+        return f"p95 {stats['p95_ms']:.0f}ms over the {slo_ms:g}ms SLO"
+    if previous and previous["requests"] and stats["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain):
+        return f"throughput {stats['throughput_rps']:g} rps, up less than {min_gain:.0%} from {previous['throughput_rps']:g}"
+    return None
+
+
+# ============================================================================
+# RUNNING
+# ============================================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(workers: int, data_dir: str, timeout: float = 60) -> tuple[subprocess.Popen, str]:
+    """Start main:app under uvicorn with its data in data_dir; wait until it answers"""
+    port = _free_port()
+    env = {**os.environ, **{name: os.path.join(data_dir, path) for name, path in DATA_ENV.items()}}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"app did not answer on {url} within {timeout:g}s")
+
+
+def sample_measurements(url: str, pdf: tuple) -> dict:
+    """Parse one sample PDF to get realistic calculate bodies"""
+    target = urlsplit(url)
+    body, content_type = _multipart(*pdf)
+    conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=120)
+    conn.request("POST", "/api/parse-pdf", body=body, headers={"Content-Type": content_type})
+    response = conn.getresponse()
+    data = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"sample parse failed: {response.status} {data[:200]!r}")
+    return json.loads(data)
+
+
+def run_step(url: str, traffic: Traffic, mix: dict, concurrency: int, seconds: float, timeout: float, seed: int) -> tuple[dict, float]:
+    """
+    Run one concurrency level.
+
+    Returns:
+        ({endpoint: [(seconds, error)]}, elapsed seconds)
+    """
+    start = time.monotonic()
+    reps = [Rep(url, traffic, mix, seed + index, start + seconds, timeout) for index in range(concurrency)]
+    for rep in reps:
+        rep.start()
+    for rep in reps:
+        rep.join()
+    elapsed = time.monotonic() - start
+    by_endpoint: dict = {endpoint: [] for endpoint in mix}
+    for rep in reps:
+        for endpoint, latency, error in rep.results:
+            by_endpoint[endpoint].append((latency, error))
+    return by_endpoint, elapsed
+
+
+def ramp(args, url: str, traffic: Traffic) -> dict:
+    """Run every concurrency step (until everything saturates) and build the report"""
+    steps, saturation = [], {"total": None, **{endpoint: None for endpoint in args.mix}}
+    previous: dict = {}
+    for concurrency in args.concurrency:
+        by_endpoint, elapsed = run_step(url, traffic, args.mix, concurrency, args.step_seconds, args.timeout, args.seed)
+        step = {
+            "concurrency": concurrency,
+            "seconds": round(elapsed, 2),
+            "total": summarize([result for results in by_endpoint.values() for result in results], elapsed),
+            "endpoints": {endpoint: summarize(results, elapsed) for endpoint, results in by_endpoint.items()},
+        }
+        steps.append(step)
+        _print_step(step)
+
+        current = {"total": step["total"], **step["endpoints"]}
+        for name, stats in current.items():
+            if saturation[name] is not None:
+                continue
+            if name == "total":
+                reason = saturation_reason(stats, None, args.max_error_rate, previous.get(name), args.min_gain)
+            else:
+                reason = saturation_reason(stats, args.slo.get(name), args.max_error_rate)
+            if reason:
+                saturation[name] = {
+                    "concurrency": concurrency,
+                    "reason": reason,
+                    "max_sustained_concurrency": previous.get(name, {}).get("concurrency"),
+                    "max_sustained_rps": previous.get(name, {}).get("throughput_rps"),
+                }
+        previous = {name: {**stats, "concurrency": concurrency} for name, stats in current.items()}
+        if all(saturation.values()):
+            break
+
+    return {
+        "target": url,
+        "started_at": args.started_at,
+        "settings": {
+            "mix": args.mix,
+            "slo_p95_ms": args.slo,
+            "concurrency": args.concurrency,
+            "step_seconds": args.step_seconds,
+            "max_error_rate": args.max_error_rate,
+            "min_gain": args.min_gain,
+            "repeat_pdfs": args.repeat_pdfs,
+            "workers": None if args.url else args.workers,
+        },
+        "steps": steps,
+        "saturation": saturation,
+    }
+
+
+def _print_step(step: dict):
+    print(f"concurrency {step['concurrency']}  ({step['total']['throughput_rps']:g} rps total)", file=sys.stderr)
+    for endpoint, stats in step["endpoints"].items():
+        if stats["requests"]:
+            print(
+                f"  {endpoint:12} {stats['throughput_rps']:8.1f} rps  p50 {stats['p50_ms']:8.1f}  "
+                f"p95 {stats['p95_ms']:8.1f}  p99 {stats['p99_ms']:8.1f} ms  errors {stats['error_rate']:.1%}",
+                file=sys.stderr,
+            )
+
+
+def _weights(text: str, defaults: dict, cast) -> dict:
+    """Parse endpoint=value pairs over the defaults (unknown endpoints are an error)"""
+    values = dict(defaults)
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        name, _, value = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}', expected one of {', '.join(ENDPOINTS)}")
+        values[name] = cast(value)
+    return values
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ramp API load and report latency SLOs and saturation")
+    parser.add_argument("--url", help="drive a running app instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local app")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32",
+                        type=lambda text: sorted({int(level) for level in text.split(",")}))
+    parser.add_argument("--step-seconds", type=float, default=10)
+    parser.add_argument("--mix", default="", type=lambda text: {
+        name: weight for name, weight in _weights(text, DEFAULT_MIX, float).items() if weight > 0
+    }, help="endpoint=weight,... (default parse-pdf=1,quick-quote=1,calculate=6,products=2)")
+    parser.add_argument("--slo", default="", type=lambda text: _weights(text, DEFAULT_SLO_MS, float),
+                        help="endpoint=p95 ms,... over the defaults")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--min-gain", type=float, default=0.10, help="least throughput gain per step")
+    parser.add_argument("--repeat-pdfs", action="store_true", help="upload identical bytes (stored-result path)")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--require-concurrency", type=int,
+                        help="exit 1 if an endpoint or the total saturates at or below this concurrency")
+    parser.add_argument("-o", "--output", default="-", help="JSON report file, or - for stdout")
+    args = parser.parse_args(argv)
+    args.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    if not args.mix:
+        parser.error("--mix leaves no endpoints")
+
+    pdfs = [(os.path.basename(path), open(path, "rb").read()) for path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "*.pdf")))]
+    if not pdfs:
+        parser.error(f"no sample PDFs in {SAMPLES_DIR}")
+
+    process = None
+    with tempfile.TemporaryDirectory(prefix="load-test-") as data_dir:
+        try:
+            if args.url:
+                url = args.url.rstrip("/")
+            else:
+                process, url = start_app(args.workers, data_dir)
+            traffic = Traffic(pdfs, sample_measurements(url, pdfs[0]), args.repeat_pdfs)
+            report = ramp(args, url, traffic)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(10)
+
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    for endpoint, point in report["saturation"].items():
+        print(
+            f"{endpoint:12} " + (f"saturated at {point['concurrency']}: {point['reason']}" if point else "not saturated"),
+            file=sys.stderr,
+        )
+    if args.require_concurrency is not None and any(
+        point and point["concurrency"] <= args.require_concurrency for point in report["saturation"].values()
+    ):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,39 @@
 """
 Siding Buddy - FastAPI Backend
 """
+import asyncio
+import functools
+import hashlib
+import json
 import os
 import tempfile
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import (
+    FastAPI, File, UploadFile, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, Depends, Header,
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
-
-from hover_parser import parse_hover_pdf, HoverMeasurements
-from quote_calculator import calculate_quote, QuoteInput, QuoteResult, SIDING_PRODUCTS
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Optional, Union
+
+from hover_parser import HoverMeasurements, PARSE_ENGINES, FIELD_SOURCES
+from quote_calculator import calculate_quote, compile_price_table, QuoteInput, QuoteResult, PriceTable
+from live_quote import LiveQuoteSession
+from quote_store import get_store
+from tenants import resolve_price_table, merge_catalog, price_tables, UnknownTenantError, TenantAccessDenied
+from profiling import profile_request, profiles, settings as profiler_settings, admin_token_valid
+from measurement_store import measurement_store, measurement_token
+from quote_cache import quote_cache, quote_key
+from pdf_guard import (
+    PDFRejected, PARSE_WORKERS, check_size, check_pdf, guarded_parse, guarded_stream,
+    limits as parse_limits, parse_workers,
+)
+from audit_log import get_audit_log
+from pdf_archive import archive_upload, get_archive, reparse_job, reparse_on_start
+from search_index import get_search_index, close_search_index
+from thumbnails import store_pdf, cached_thumbnail, render_thumbnail, THUMBNAIL_FORMATS
+from warmup import warmup_enabled, run_warmup, mark_ready, is_ready, warmup_status
 
 app = FastAPI(
     title="Siding Buddy API",
@@ -24,53 +48,343 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Parse-Engine", "X-Parse-Fields", "X-Parse-Pages", "X-Measurements-Token", "X-PDF-Id", "X-Quote-Cache"],
 )
 
 
+# Parsing and page rendering are CPU-bound; they run on this bounded pool so
+# the event loop keeps serving other requests (parses are further isolated
+# in pdf_guard's worker processes)
+parse_pool = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="parse")
+
+
+async def _in_parse_pool(fn, *args):
+    """Run a blocking parse/render call on the parse pool"""
+    return await asyncio.get_running_loop().run_in_executor(parse_pool, functools.partial(fn, *args))
+
+
+def _check_engine(engine: str):
+    """Reject unknown parse engine names with a 400"""
+    if engine not in PARSE_ENGINES:
+        raise HTTPException(status_code=400, detail=f"engine must be one of: {', '.join(PARSE_ENGINES)}")
+
+
+def _check_fields(fields: Optional[str]) -> Optional[list]:
+    """Comma-separated measurement field names -> list (None for all); unknown names are a 400"""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in FIELD_SOURCES]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown measurement field(s): {', '.join(unknown)}" if unknown else "fields must name at least one field",
+        )
+    return names
+
+
+def get_price_table(
+    x_api_key: Optional[str] = Header(None),
+    x_tenant_id: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+) -> PriceTable:
+    """Tenant price table for the request (X-API-Key, then X-Tenant-ID for admins, else default)"""
+    try:
+        return resolve_price_table(x_api_key, x_tenant_id, admin_token_valid(x_admin_token))
+    except TenantAccessDenied:
+        raise HTTPException(status_code=401, detail="X-API-Key required to use a tenant's prices")
+    except UnknownTenantError:
+        if x_api_key:
+            raise HTTPException(status_code=401, detail="Unknown API key")
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {x_tenant_id}")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints need X-Admin-Token matching SIDING_BUDDY_ADMIN_TOKEN"""
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def quote_tenant(
+    prices: PriceTable = Depends(get_price_table),
+    x_api_key: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+) -> Optional[str]:
+    """Tenant whose saved quotes the caller may see (from X-API-Key), or None for admins (every tenant)"""
+    if admin_token_valid(x_admin_token):
+        return None
+    if not x_api_key:
+        raise HTTPException(status_code=401, detail="X-API-Key required to access saved quotes")
+    return prices.tenant
+
+
+def _wants_profile(x_profile: Optional[str], x_admin_token: Optional[str]) -> bool:
+    """X-Profile: 1 forces a kept profile for this request (admins only)"""
+    return x_profile == "1" and admin_token_valid(x_admin_token)
+
+
+def _stored_measurements(token: str) -> tuple[HoverMeasurements, Optional[str]]:
+    """(measurements, PDF SHA-256) for a measurements_token, 404 if it expired"""
+    entry = measurement_store.entry(token)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Measurements token expired or unknown, re-upload the PDF")
+    return entry
+
+
+def _with_measurements(input_data: QuoteInput) -> tuple[QuoteInput, Optional[str]]:
+    """
+    Fill in measurements from measurements_token when only the token was sent.
+
+    Returns:
+        (input with measurements, SHA-256 of the token's PDF or None)
+    """
+    if input_data.measurements is not None or not input_data.measurements_token:
+        return input_data, None
+    measurements, pdf_sha256 = _stored_measurements(input_data.measurements_token)
+    return input_data.model_copy(update={"measurements": measurements}), pdf_sha256
+
+
+def _audit(request: Union[Request, WebSocket], event: str, prices: Optional[PriceTable] = None, **fields):
+    """Queue an audit event for this request or WebSocket (see audit_log; no I/O here)"""
+    get_audit_log().record(
+        event,
+        tenant=prices.tenant if prices is not None else None,
+        client=request.client.host if request.client else None,
+        price_version=prices.version if prices is not None else None,
+        **fields,
+    )
+
+
+def _rejected(e: PDFRejected) -> HTTPException:
+    """Structured HTTP error for a PDF that failed a guard"""
+    return HTTPException(status_code=e.status_code, detail=e.as_detail())
+
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """
+    Read an uploaded PDF into memory, refusing oversized files first.
+
+    The multipart body has already been received and spooled to a temporary
+    file by the time this runs; the size check only keeps an oversized
+    upload from being read into memory and parsed.
+    """
+    try:
+        check_size(file.size)
+        content = await file.read()
+        check_size(len(content))
+    except PDFRejected as e:
+        raise _rejected(e)
+    return content
+
+
+def _parse_upload(
+    content: bytes, pdf_sha256: str, engine: str, endpoint: str, force_profile: bool, fields: Optional[list] = None,
+    tenant: Optional[str] = None,
+):
+    """
+    Check and parse uploaded PDF bytes (on the parse pool), storing the
+    result for measurements_token use and the PDF for page thumbnails.
+    The result is indexed for the uploading tenant's searches. A parse of
+    only some fields gets its own token and is not archived or indexed.
+
+    Returns:
+        (HoverMeasurements, ParseReport, measurements token)
+
+    Raises:
+        PDFRejected: failed a check or ran over a budget
+    """
+    check_pdf(content)
+    token = measurement_token(pdf_sha256, engine if fields is None else f"{engine}:{','.join(fields)}")
+    store_pdf(pdf_sha256, content)
+
+    # Save uploaded file temporarily
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
+            tmp.write(content)
+            tmp_path = tmp.name
+
+        # A profiled parse is sampled in the worker too (see pdf_guard)
+        with profile_request(endpoint, force_profile) as profile:
+            profile.annotate(pdf_sha256=pdf_sha256, pdf_bytes=len(content))
+            measurements, report = guarded_parse(tmp_path, engine, fields=fields)
+            profile.annotate(page_count=report.page_count, engine=report.engine)
+
+    finally:
+        # Clean up temp file
+        if 'tmp_path' in locals():
+            try:
+                os.unlink(tmp_path)
+            except:
+                pass
+
+    measurement_store.put(token, measurements, pdf_sha256)
+    if fields is None:
+        archive_upload(pdf_sha256, content, engine, measurements)
+        get_search_index().add(pdf_sha256, measurements, tenant=tenant)
+    return measurements, report, token
+
+
+@app.on_event("startup")
+async def warm_up():
+    """Run the opt-in warm-up in a worker thread so startup isn't blocked"""
+    if warmup_enabled():
+        app.state.warmup_task = asyncio.get_running_loop().create_task(run_in_threadpool(run_warmup))
+    else:
+        mark_ready()
+    get_audit_log()
+    search_index = await run_in_threadpool(get_search_index)
+    reparse_job.on_result = search_index.add
+    if reparse_on_start():
+        # Refresh archived results from older parser versions
+        reparse_job.start()
+
+
+@app.on_event("shutdown")
+async def flush_background_writers():
+    """Stop the re-parse job and write out buffered audit events and the search index"""
+    reparse_job.stop()
+    await run_in_threadpool(get_audit_log().close)
+    await run_in_threadpool(close_search_index)
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "siding-buddy-api"}
 
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness endpoint - 503 until warm-up has completed"""
+    if not is_ready():
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"status": "ready", **warmup_status()}
+
+
 @app.get("/api/products")
-async def get_products():
+async def get_products(prices: PriceTable = Depends(get_price_table)):
     """Get available siding products and their prices"""
     return {
-        "products": SIDING_PRODUCTS,
+        "products": prices.catalog()["siding_products"],
         "profiles": ["D-4", "D-5", "D-4.5 DL", "D-6", "S-7", "S-8", "T-3", "7\" B&B"],
         "waste_options": [14, 16, 18],
     }
 
 
 @app.post("/api/parse-pdf", response_model=HoverMeasurements)
-async def parse_pdf(file: UploadFile = File(...)):
+async def parse_pdf(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    engine: str = "full",
+    fields: Optional[str] = None,
+    prices: PriceTable = Depends(get_price_table),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+):
     """
     Parse a Hover PDF and extract measurements.
 
     Upload a Hover "Complete Measurements" PDF file and receive
     extracted measurements for use in quote calculation.
+
+    engine=fast reads only the PDF text layer (falling back to full when
+    required fields are missing). The engine used and the fields it filled
+    are returned in the X-Parse-Engine / X-Parse-Fields headers.
+
+    fields=property_id,siding_squares_10_waste extracts only those fields
+    (the rest are null): tables and text patterns nothing asked for are
+    skipped, and pages stop being read once the fields are found.
+    X-Parse-Pages is "pages read/page count".
+
+    X-Measurements-Token refers to the stored result; send it as
+    QuoteInput.measurements_token instead of the measurements object.
+    X-PDF-Id is the id for /api/pdfs/{pdf_id}/pages/{page}/thumbnail.
+
+    Uploads over the size/page/time budgets, or that aren't Hover reports,
+    get a structured error: {"detail": {"code", "message", ...}}.
     """
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="File must be a PDF")
+    _check_engine(engine)
+    field_names = _check_fields(fields)
+    content = await _read_upload(file)
 
-    # Save uploaded file temporarily
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        # Parse the PDF
-        measurements = parse_hover_pdf(tmp_path)
+        pdf_sha256 = hashlib.sha256(content).hexdigest()
+        measurements, report, token = await _in_parse_pool(
+            _parse_upload, content, pdf_sha256, engine, "parse-pdf", _wants_profile(x_profile, x_admin_token), field_names,
+            prices.tenant,
+        )
+        response.headers["X-Parse-Engine"] = report.engine
+        response.headers["X-Parse-Fields"] = ",".join(report.fields_filled)
+        response.headers["X-Parse-Pages"] = f"{report.pages_read}/{report.page_count}"
+        response.headers["X-Measurements-Token"] = token
+        response.headers["X-PDF-Id"] = pdf_sha256
+        _audit(
+            request, "parse", prices, pdf_sha256=pdf_sha256, engine=report.engine, pages=report.page_count,
+            fields=field_names, measurements_token=token, measurements=measurements,
+        )
 
         return measurements
 
+    except PDFRejected as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing PDF: {str(e)}")
 
+
+def _sse(event: str, data) -> str:
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _parse_events(content: bytes, engine: str, request: Request, prices: PriceTable):
+    """SSE messages for a streamed parse (runs in the threadpool, after check_pdf)"""
+    pdf_sha256 = hashlib.sha256(content).hexdigest()
+    token = measurement_token(pdf_sha256, engine)
+    store_pdf(pdf_sha256, content)
+    measurements = measurement_store.get(token)
+    if measurements is not None:
+        get_search_index().add(pdf_sha256, measurements, tenant=prices.tenant)
+        _audit(
+            request, "parse", prices, pdf_sha256=pdf_sha256, engine=engine, cached=True,
+            measurements_token=token, measurements=measurements,
+        )
+        # Already parsed: everything is known up front
+        yield _sse("complete", {
+            "measurements": measurements.model_dump(), "measurements_token": token, "pdf_id": pdf_sha256,
+        })
+        return
+
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
+            tmp.write(content)
+            tmp_path = tmp.name
+
+        for event, data in guarded_stream(tmp_path, engine):
+            if event == "complete":
+                measurement_store.put(token, data["measurements"], pdf_sha256)
+                archive_upload(pdf_sha256, content, engine, data["measurements"])
+                get_search_index().add(pdf_sha256, data["measurements"], tenant=prices.tenant)
+                _audit(
+                    request, "parse", prices, pdf_sha256=pdf_sha256, engine=data["report"].engine,
+                    pages=data["report"].page_count, measurements_token=token, measurements=data["measurements"],
+                )
+                data = {
+                    "measurements": data["measurements"].model_dump(),
+                    "report": data["report"].model_dump(),
+                    "measurements_token": token,
+                    "pdf_id": pdf_sha256,
+                }
+            yield _sse(event, data)
+
+    except PDFRejected as e:
+        yield _sse("error", {"detail": e.as_detail()})
+    except Exception as e:
+        yield _sse("error", {"detail": f"Error parsing PDF: {str(e)}"})
+
     finally:
-        # Clean up temp file
         if 'tmp_path' in locals():
             try:
                 os.unlink(tmp_path)
@@ -78,19 +392,428 @@ async def parse_pdf(file: UploadFile = File(...)):
                 pass
 
 
+@app.post("/api/parse-pdf/stream")
+async def parse_pdf_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    engine: str = "full",
+    prices: PriceTable = Depends(get_price_table),
+):
+    """
+    Parse a Hover PDF, streaming fields as each page is processed.
+
+    Server-Sent Events response:
+        event: fields    {"engine", "page", "page_count", "fields": {...}}
+                         new or revised HoverMeasurements values after each page
+        event: complete  {"measurements", "report", "measurements_token", "pdf_id"}
+        event: error     {"detail": {"code", "message", ...}} (see pdf_guard)
+
+    The address and property ID arrive with page 1, so the form can start
+    filling before the whole document is processed.
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="File must be a PDF")
+    _check_engine(engine)
+
+    content = await _read_upload(file)
+    try:
+        await _in_parse_pool(check_pdf, content)
+    except PDFRejected as e:
+        raise _rejected(e)
+    return StreamingResponse(
+        _parse_events(content, engine, request, prices),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/search")
+def search_parses(
+    q: str,
+    limit: int = 10,
+    prices: PriceTable = Depends(get_price_table),
+    x_api_key: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    Find earlier parses by property ID, address or customer name.
+
+    Matching is typo-tolerant ("waldon station" finds "319 Walden Station
+    Drive"). Each result has the pdf_id (for thumbnails and the archived
+    result), the indexed fields and a 0-1 score.
+
+    Needs an X-API-Key (searches that tenant's uploads) or the admin token
+    (searches every upload).
+    """
+    is_admin = admin_token_valid(x_admin_token)
+    if not (x_api_key or is_admin):
+        raise HTTPException(status_code=401, detail="X-API-Key required to search parses")
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q must not be empty")
+    tenant = None if is_admin else prices.tenant
+    return {"results": get_search_index().search(q, max(1, min(limit, 100)), tenant)}
+
+
+@app.get("/api/pdfs/{pdf_id}/pages/{page}/thumbnail")
+async def page_thumbnail(pdf_id: str, page: int, width: int = 320, format: str = "webp"):
+    """
+    Thumbnail of one page of an uploaded PDF (pdf_id from X-PDF-Id).
+
+    Rendered on first request at the given width and cached on disk, so
+    repeat views are a cache read. format is "webp" or "png".
+    """
+    try:
+        data = cached_thumbnail(pdf_id, page, width, format)
+        if data is None:
+            data = await _in_parse_pool(render_thumbnail, pdf_id, page, width, format)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="PDF not found, re-upload it")
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(
+        content=data,
+        media_type=THUMBNAIL_FORMATS[format][1],
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 @app.post("/api/calculate", response_model=QuoteResult)
-async def calculate(input_data: QuoteInput):
+async def calculate(request: Request, input_data: QuoteInput, prices: PriceTable = Depends(get_price_table)):
     """
     Calculate a siding quote from input data.
 
-    Provide measurements (from PDF or manual entry) along with
-    product selections to receive a complete quote breakdown.
+    Provide measurements (from PDF or manual entry, or a
+    measurements_token from /api/parse-pdf) along with product
+    selections to receive a complete quote breakdown.
+
+    Repeat inputs are answered from the quote cache (X-Quote-Cache: hit).
+    """
+    input_data, pdf_sha256 = _with_measurements(input_data)
+    key = quote_key(input_data, prices)
+    cached = quote_cache.get(key)
+    if cached is not None:
+        body, grand_total = cached
+    else:
+        try:
+            result = calculate_quote(input_data, prices)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error calculating quote: {str(e)}")
+        body, grand_total = result.model_dump_json().encode(), result.grand_total
+        quote_cache.put(key, body, grand_total)
+    _audit(request, "quote", prices, pdf_sha256=pdf_sha256, grand_total=grand_total, input=input_data)
+    return Response(
+        content=body, media_type="application/json",
+        headers={"X-Quote-Cache": "hit" if cached is not None else "miss"},
+    )
+
+
+class QuoteStatusUpdate(BaseModel):
+    """New sales status for a saved quote"""
+    status: str  # "open", "won" or "lost"
+
+
+@app.post("/api/quotes")
+def save_quote(request: Request, input_data: QuoteInput, prices: PriceTable = Depends(get_price_table)):
     """
+    Calculate and save a quote.
+
+    Saved quotes feed the sales analytics rollups.
+    """
+    input_data, pdf_sha256 = _with_measurements(input_data)
     try:
-        result = calculate_quote(input_data)
-        return result
+        result = calculate_quote(input_data, prices)
+        quote_id = get_store().save_quote(input_data, result, prices.tenant)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating quote: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error saving quote: {str(e)}")
+    _audit(
+        request, "save_quote", prices, pdf_sha256=pdf_sha256, grand_total=result.grand_total,
+        quote_id=quote_id, input=input_data,
+    )
+    return {"id": quote_id, "quote": result}
+
+
+@app.get("/api/quotes/{quote_id}")
+def get_quote(quote_id: int, tenant: Optional[str] = Depends(quote_tenant)):
+    """Get a saved quote (another tenant's quotes are not found)"""
+    saved = get_store().get_quote(quote_id)
+    if saved is None or (tenant is not None and saved["tenant"] != tenant):
+        raise HTTPException(status_code=404, detail="Quote not found")
+    return saved
+
+
+@app.put("/api/quotes/{quote_id}/status")
+def set_quote_status(quote_id: int, update: QuoteStatusUpdate, tenant: Optional[str] = Depends(quote_tenant)):
+    """Mark a saved quote open, won or lost (another tenant's quotes are not found)"""
+    try:
+        get_store().set_status(quote_id, update.status, tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Quote not found")
+    return {"id": quote_id, "status": update.status}
+
+
+class RepriceRequest(BaseModel):
+    """Price changes to preview against saved quotes"""
+    # Overrides in the catalogs/<tenant>.json format, on top of the tenant's
+    # current catalog; omit to re-price with the current catalog as is
+    catalog: Optional[dict] = None
+    statuses: list[str] = ["open"]
+    limit: int = 100
+
+
+@app.post("/api/quotes/reprice", dependencies=[Depends(require_admin)])
+def reprice_quotes(request: RepriceRequest, prices: PriceTable = Depends(get_price_table)):
+    """
+    New grand totals of the tenant's saved quotes under changed prices.
+
+    Uses each quote's stored quantity vector, so the whole book is re-priced
+    in one matrix product. Returns before/after sums and the quotes whose
+    totals change, largest change first.
+    """
+    if request.catalog:
+        try:
+            prices = compile_price_table(merge_catalog(prices.catalog(), request.catalog), prices.tenant)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid catalog: {str(e)}")
+    try:
+        return get_store().reprice(prices, tuple(request.statuses), request.limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/analytics")
+def get_analytics(
+    group_by: str = "month",
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None,
+    tenant: Optional[str] = None,
+    product: Optional[str] = None,
+    profile: Optional[str] = None,
+    color: Optional[str] = None,
+    prices: PriceTable = Depends(get_price_table),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    Sales dashboard aggregates from the pre-aggregated rollups.
+
+    group_by is a comma-separated list of tenant, month, product, profile,
+    color (empty for a single total row). Months are "YYYY-MM", inclusive.
+
+    Rows are limited to the caller's tenant (from X-API-Key); only admins
+    may pick another tenant or leave tenant unset for every branch.
+    """
+    if not admin_token_valid(x_admin_token):
+        if tenant is not None and tenant != prices.tenant:
+            raise HTTPException(status_code=403, detail="Analytics are limited to your own tenant")
+        tenant = prices.tenant
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    filters = {
+        name: value
+        for name, value in (("tenant", tenant), ("product", product), ("profile", profile), ("color", color))
+        if value is not None
+    }
+    try:
+        rows = get_store().analytics(dimensions, start_month, end_month, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"group_by": dimensions, "rows": rows}
+
+
+@app.websocket("/api/ws/quote")
+async def live_quote(websocket: WebSocket):
+    """
+    Live quote session over a WebSocket.
+
+    Client messages:
+        {"type": "open", "input": {...QuoteInput...}}  -> {"type": "quote", "quote": {...}}
+        {"type": "update", "changes": {field: value}} -> {"type": "update", "seq": n, ...}
+
+    A measurements_token in either message is replaced by its stored
+    measurements.
+
+    Updates re-price only the categories that read the changed fields and
+    return just the categories whose line items changed plus the totals.
+    Errors are reported as {"type": "error", "detail": ...} and leave the
+    session as it was. Every open and update is audited with its totals.
+    """
+    await websocket.accept()
+    session = None
+    pdf_sha256 = None
+    seq = 0
+
+    try:
+        prices = resolve_price_table(
+            websocket.headers.get("x-api-key"), websocket.headers.get("x-tenant-id"),
+            admin_token_valid(websocket.headers.get("x-admin-token")),
+        )
+    except (UnknownTenantError, TenantAccessDenied):
+        await websocket.close(code=4401, reason="Unknown tenant or API key")
+        return
+
+    try:
+        while True:
+            text = await websocket.receive_text()
+
+            try:
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    raise ValueError("Message must be JSON")
+                message_type = message.get("type") if isinstance(message, dict) else None
+                if message_type == "open":
+                    input_data = QuoteInput.model_validate(message.get("input") or {})
+                    try:
+                        input_data, pdf_sha256 = _with_measurements(input_data)
+                    except HTTPException as e:
+                        raise ValueError(e.detail)
+                    session = LiveQuoteSession(input_data, prices)
+                    seq = 0
+                    _audit(
+                        websocket, "live_quote", prices, pdf_sha256=pdf_sha256,
+                        grand_total=session.quote().grand_total, input=input_data,
+                    )
+                    await websocket.send_json({"type": "quote", "quote": session.quote().model_dump()})
+                elif message_type == "update":
+                    if session is None:
+                        raise ValueError("Send an 'open' message first")
+                    changes = message.get("changes") or {}
+                    if not isinstance(changes, dict):
+                        raise ValueError("changes must be an object of field: value")
+                    resolved, update_pdf_sha256 = changes, pdf_sha256
+                    if changes.get("measurements_token"):
+                        try:
+                            measurements, update_pdf_sha256 = _stored_measurements(changes["measurements_token"])
+                        except HTTPException as e:
+                            raise ValueError(e.detail)
+                        resolved = {**changes, "measurements": measurements}
+                    update = session.apply(resolved)
+                    pdf_sha256 = update_pdf_sha256
+                    seq += 1
+                    _audit(
+                        websocket, "live_quote_update", prices, pdf_sha256=pdf_sha256,
+                        grand_total=update["totals"]["grand_total"], seq=seq, changes=changes,
+                    )
+                    await websocket.send_json({"type": "update", "seq": seq, **update})
+                else:
+                    raise ValueError(f"Unknown message type: {message_type}")
+            except (ValueError, ValidationError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+
+    except WebSocketDisconnect:
+        pass
+
+
+class ProfilingUpdate(BaseModel):
+    """Admin switches for the request profiler"""
+    enabled: Optional[bool] = None
+    threshold_ms: Optional[float] = None
+    interval_ms: Optional[float] = None
+
+
+@app.get("/api/admin/profiling", dependencies=[Depends(require_admin)])
+async def get_profiling():
+    """Profiler settings and the profiles currently kept"""
+    return {"settings": profiler_settings.as_dict(), "profiles": profiles.list()}
+
+
+@app.put("/api/admin/profiling", dependencies=[Depends(require_admin)])
+async def update_profiling(update: ProfilingUpdate):
+    """Switch profiling on/off or change the latency threshold / interval"""
+    if update.enabled is not None:
+        profiler_settings.enabled = update.enabled
+    if update.threshold_ms is not None:
+        profiler_settings.threshold_ms = max(0.0, update.threshold_ms)
+    if update.interval_ms is not None:
+        profiler_settings.interval_ms = max(1.0, update.interval_ms)
+    return {"settings": profiler_settings.as_dict()}
+
+
+@app.get("/api/admin/parse-guard", dependencies=[Depends(require_admin)])
+async def get_parse_guard():
+    """PDF budgets and parse worker process counts"""
+    return {"limits": parse_limits.as_dict(), "workers": parse_workers.stats()}
+
+
+@app.get("/api/admin/quote-cache", dependencies=[Depends(require_admin)])
+async def get_quote_cache():
+    """Quote cache size and hit/miss counters"""
+    return quote_cache.stats()
+
+
+@app.post("/api/admin/catalogs/reload", dependencies=[Depends(require_admin)])
+async def reload_catalogs():
+    """Re-read every tenant catalog and API key (edited files are also picked up on their own)"""
+    price_tables.invalidate()
+    return {"reloaded": True}
+
+
+@app.get("/api/admin/audit", dependencies=[Depends(require_admin)])
+async def get_audit(
+    pdf_id: Optional[str] = None,
+    tenant: Optional[str] = None,
+    event: Optional[str] = None,
+    limit: int = 100,
+):
+    """
+    Audit log counters and the most recent events (newest first).
+
+    Filter by pdf_id (X-PDF-Id), tenant or event type ("parse", "quote",
+    "save_quote", "quick_quote", "live_quote", "live_quote_update"). Events
+    still buffered aren't listed yet.
+    """
+    audit_log = get_audit_log()
+    return {
+        "stats": audit_log.stats(),
+        "events": await run_in_threadpool(
+            audit_log.events, pdf_sha256=pdf_id, tenant=tenant, event=event, limit=max(1, min(limit, 1000)),
+        ),
+    }
+
+
+@app.get("/api/admin/archive", dependencies=[Depends(require_admin)])
+async def get_archive_status():
+    """PDF archive size, results from older parser versions and the re-parse job"""
+    return {"archive": await run_in_threadpool(get_archive().stats), "reparse": reparse_job.status()}
+
+
+@app.post("/api/admin/archive/reparse", dependencies=[Depends(require_admin)])
+async def start_reparse():
+    """Start re-parsing archived PDFs whose results predate the current parser"""
+    started = reparse_job.start()
+    return {"started": started, "reparse": reparse_job.status()}
+
+
+@app.get("/api/admin/archive/{pdf_id}", dependencies=[Depends(require_admin)])
+async def get_archived_pdf(pdf_id: str):
+    """Archive entry for one PDF (pdf_id from X-PDF-Id) with its latest result"""
+    entry = await run_in_threadpool(get_archive().entry, pdf_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="PDF not archived")
+    return entry
+
+
+@app.get("/api/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: int, format: str = "speedscope"):
+    """Download a kept profile as speedscope JSON or collapsed stacks"""
+    record = profiles.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(
+            record.collapsed(),
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.txt"'},
+        )
+    if format != "speedscope":
+        raise HTTPException(status_code=400, detail="format must be speedscope or collapsed")
+    return Response(
+        content=json.dumps(record.speedscope()),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'},
+    )
 
 
 class QuickQuoteRequest(BaseModel):
@@ -107,27 +830,46 @@ class QuickQuoteRequest(BaseModel):
 
 @app.post("/api/quick-quote")
 async def quick_quote(
-    file: UploadFile = File(...),
+    request: Request,
+    file: Optional[UploadFile] = File(None),
+    measurements_token: Optional[str] = None,
     siding_product: str = "carvedwood_044",
     waste_percent: int = 14,
+    engine: str = "full",
+    prices: PriceTable = Depends(get_price_table),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
 ):
     """
     Upload PDF and get an instant quote with defaults.
 
     This is a simplified endpoint that parses the PDF and
-    calculates a basic quote in one step.
+    calculates a basic quote in one step. A PDF that was already parsed
+    (or a measurements_token instead of the file) skips the parse.
     """
-    if not file.filename.lower().endswith('.pdf'):
+    _check_engine(engine)
+    pdf_id = None
+    if file is None:
+        if not measurements_token:
+            raise HTTPException(status_code=400, detail="Upload a PDF or pass measurements_token")
+        measurements, pdf_id = _stored_measurements(measurements_token)
+    elif not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="File must be a PDF")
 
+    content = await _read_upload(file) if file is not None else None
     try:
-        # Save and parse PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        measurements = parse_hover_pdf(tmp_path)
+        if file is not None:
+            pdf_id = hashlib.sha256(content).hexdigest()
+            measurements_token = measurement_token(pdf_id, engine)
+            measurements = measurement_store.get(measurements_token)
+            if measurements is None:
+                measurements, _, measurements_token = await _in_parse_pool(
+                    _parse_upload, content, pdf_id, engine, "quick-quote", _wants_profile(x_profile, x_admin_token), None,
+                    prices.tenant,
+                )
+            else:
+                store_pdf(pdf_id, content)
+                get_search_index().add(pdf_id, measurements, tenant=prices.tenant)
 
         # Build quote input
         quote_input = QuoteInput(
@@ -139,23 +881,24 @@ async def quick_quote(
         )
 
         # Calculate
-        result = calculate_quote(quote_input)
+        result = calculate_quote(quote_input, prices)
+        _audit(
+            request, "quick_quote", prices, pdf_sha256=pdf_id, grand_total=result.grand_total,
+            measurements_token=measurements_token, input=quote_input,
+        )
 
         return {
             "measurements": measurements,
+            "measurements_token": measurements_token,
+            "pdf_id": pdf_id,
             "quote": result,
         }
 
+    except PDFRejected as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-    finally:
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,104 @@
+"""
+Measurement Store - Short tokens for parsed Hover results
+
+Parse endpoints keep each result here and hand back a short token. Clients
+send `measurements_token` in QuoteInput instead of re-posting the whole
+HoverMeasurements object on every recalculation, and a quick quote for a
+PDF that was already parsed reuses the stored result instead of parsing
+again.
+
+Tokens are derived from the PDF's SHA-256 and the parse engine, so the same
+upload always maps to the same token. The PDF's SHA-256 is kept with the
+result so quotes made from a token can be audited against their PDF. Entries expire after
+SIDING_BUDDY_MEASUREMENT_TTL seconds (default 1 hour) and the store holds
+at most SIDING_BUDDY_MEASUREMENT_MAX entries (default 5000, oldest dropped).
+
+With SIDING_BUDDY_SHARED_CACHE=1 results live in the shared cache instead
+(see shared_cache.py), so a token handed out by one worker process works
+in every worker; its size budget replaces the entry limit.
+"""
+import base64
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from hover_parser import HoverMeasurements
+from shared_cache import get_shared_cache, shared_cache_enabled
+
+MEASUREMENT_TTL_SECONDS = float(os.getenv("SIDING_BUDDY_MEASUREMENT_TTL", "3600"))
+MEASUREMENT_MAX_ENTRIES = int(os.getenv("SIDING_BUDDY_MEASUREMENT_MAX", "5000"))
+
+
+def measurement_token(pdf_sha256: str, engine: str) -> str:
+    """Short, URL-safe token for a PDF hash + parse engine"""
+    digest = hashlib.sha256(f"{engine}:{pdf_sha256}".encode()).digest()
+    return base64.urlsafe_b64encode(digest[:16]).decode().rstrip("=")
+
+
+class MeasurementStore:
+    """In-memory TTL + size-bounded store of parsed measurements"""
+
+    def __init__(self, ttl_seconds: float = MEASUREMENT_TTL_SECONDS, max_entries: int = MEASUREMENT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, HoverMeasurements, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, token: str, measurements: HoverMeasurements, pdf_sha256: Optional[str] = None):
+        """Store (or refresh) a parsed result, and the PDF it came from, under its token"""
+        now = time.monotonic()
+        with self._lock:
+            self._entries[token] = (now + self.ttl_seconds, measurements, pdf_sha256)
+            self._entries.move_to_end(token)
+            # Entries are kept in insertion order with one TTL, so expired
+            # ones are always at the front
+            while self._entries and (
+                len(self._entries) > self.max_entries or next(iter(self._entries.values()))[0] < now
+            ):
+                self._entries.popitem(last=False)
+
+    def get(self, token: str) -> Optional[HoverMeasurements]:
+        """Stored measurements, or None if unknown or expired"""
+        entry = self.entry(token)
+        return entry[0] if entry is not None else None
+
+    def entry(self, token: str) -> Optional[tuple[HoverMeasurements, Optional[str]]]:
+        """(measurements, PDF SHA-256), or None if unknown or expired"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, measurements, pdf_sha256 = entry
+            if expires_at < time.monotonic():
+                del self._entries[token]
+                return None
+            return measurements, pdf_sha256
+
+
+class SharedMeasurementStore:
+    """MeasurementStore interface over the cross-worker shared cache"""
+
+    def __init__(self, ttl_seconds: float = MEASUREMENT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    def put(self, token: str, measurements: HoverMeasurements, pdf_sha256: Optional[str] = None):
+        # PDF hash (may be empty), newline, then the measurements JSON
+        value = f"{pdf_sha256 or ''}\n{measurements.model_dump_json()}".encode()
+        get_shared_cache().put(f"measurements:{token}", value, self.ttl_seconds)
+
+    def get(self, token: str) -> Optional[HoverMeasurements]:
+        entry = self.entry(token)
+        return entry[0] if entry is not None else None
+
+    def entry(self, token: str) -> Optional[tuple[HoverMeasurements, Optional[str]]]:
+        data = get_shared_cache().get(f"measurements:{token}")
+        if data is None:
+            return None
+        pdf_sha256, measurements_json = data.split(b"\n", 1)
+        return HoverMeasurements.model_validate_json(measurements_json), pdf_sha256.decode() or None
+
+
+measurement_store = SharedMeasurementStore() if shared_cache_enabled() else MeasurementStore()
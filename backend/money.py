@@ -0,0 +1,103 @@
+"""
+Money - Integer-cents arithmetic for quote pricing
+
+All quote math is done in whole cents (ints) so line totals are exact and
+category sums never need re-rounding. Floats only appear at the edges:
+catalog prices / quantities coming in, and dollar amounts going out.
+"""
+from decimal import Decimal
+
+
+def _decimal_parts(value: float) -> tuple[int, int]:
+    """
+    Split a number into (numerator, scale) so value == numerator / 10**scale.
+
+    Uses the shortest repr of the float, which is what users typed in and
+    what the PDF parser produced (e.g. 22.75 -> (2275, 2)).
+    """
+    if isinstance(value, int):
+        return value, 0
+    if value.is_integer():
+        return int(value), 0
+
+    text = repr(value)
+    if 'e' in text or 'E' in text:
+        # Slow path: scientific notation (tiny/huge values), let Decimal handle it
+        sign, digits, exponent = Decimal(text).as_tuple()
+        numerator = int(''.join(map(str, digits))) * (-1 if sign else 1)
+        if exponent >= 0:
+            return numerator * 10 ** exponent, 0
+        return numerator, -exponent
+
+    whole, _, frac = text.partition('.')
+    numerator = int(whole + frac)
+    return numerator, len(frac)
+
+
+def _div_half_even(numerator: int, denominator: int) -> int:
+    """Integer division rounding ties to even (same rule as Python's round())"""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = remainder * 2
+    if twice > denominator or (twice == denominator and quotient % 2 == 1):
+        quotient += 1
+    return quotient
+
+
+def to_cents(amount: float) -> int:
+    """Convert a dollar amount like 525 or 12.5 to integer cents"""
+    if isinstance(amount, int):
+        return amount * 100
+    cents = round(amount * 100)
+    if cents / 100 == amount:
+        return cents
+    numerator, scale = _decimal_parts(amount)
+    if scale <= 2:
+        return numerator * 10 ** (2 - scale)
+    return _div_half_even(numerator, 10 ** (scale - 2))
+
+
+def line_total_cents(quantity: float, unit_price_cents: int) -> int:
+    """
+    Exact line total in cents for quantity x unit price.
+
+    Integer quantities (counts, whole squares) never leave int math. Fractional
+    quantities are scaled by their decimal places and rounded half-even to the
+    cent, which matches round(quantity * price, 2) for any quantity with up to
+    two decimal places against whole-dollar catalog prices.
+    """
+    if isinstance(quantity, int):
+        return quantity * unit_price_cents
+
+    # Fast path: quantities with at most two decimals (Hover squares, LF)
+    hundredths = round(quantity * 100)
+    if hundredths / 100 == quantity:
+        numerator = hundredths * unit_price_cents
+        if numerator % 100 == 0:
+            return numerator // 100
+        return _div_half_even(numerator, 100)
+
+    numerator, scale = _decimal_parts(quantity)
+    if scale == 0:
+        return numerator * unit_price_cents
+    return _div_half_even(numerator * unit_price_cents, 10 ** scale)
+
+
+def from_cents(cents: int) -> float:
+    """Convert integer cents back to a float dollar amount for API output"""
+    return cents / 100
+
+
+def split_cents(total_cents: int) -> tuple[int, int]:
+    """
+    Split a total into (deposit, balance) halves.
+
+    Even totals split exactly. For odd totals the extra cent lands on the same
+    side the original float math (round(grand_total / 2, 2)) put it, so
+    previously issued quotes reproduce to the cent. The balance is whatever
+    remains, so the two always add back up to the total exactly.
+    """
+    half, odd = divmod(total_cents, 2)
+    if not odd:
+        return half, half
+    deposit = round(round(total_cents / 200, 2) * 100)
+    return deposit, total_cents - deposit
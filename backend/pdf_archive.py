@@ -0,0 +1,355 @@
+"""
+PDF Archive - Every parsed upload, kept by content hash, with its result
+
+Uploaded PDFs are stored once per SHA-256 (the same id as X-PDF-Id), gzip
+compressed, alongside the measurements they parsed to and the
+PARSER_VERSION that produced them. Unlike the render cache nothing is ever
+evicted.
+
+When the parser is upgraded (PARSER_VERSION bumped), a background job walks
+the archive and re-parses every PDF whose stored result came from an older
+version, so historical results pick up new fields and fixes without anyone
+re-uploading. The job shares the parse workers with live uploads, so it is
+throttled: it runs at most SIDING_BUDDY_REPARSE_CONCURRENCY parses at once,
+starts at most SIDING_BUDDY_REPARSE_RATE per second, and only starts one
+while another worker is free for interactive parses. A re-parse that ran out
+of time or found every worker busy is left stale and retried on the next
+run; only real parse failures are recorded against the PDF.
+
+Archiving happens on a background thread after the parse has returned.
+
+Settings (environment):
+    SIDING_BUDDY_ARCHIVE_DIR            archive directory (backend/data/pdf_archive)
+    SIDING_BUDDY_ARCHIVE                "0" to stop archiving uploads
+    SIDING_BUDDY_REPARSE_ON_START       "0" to not start the re-parse job at startup
+    SIDING_BUDDY_REPARSE_CONCURRENCY    parallel re-parses (PARSE_WORKERS - 1, at least 1)
+    SIDING_BUDDY_REPARSE_RATE           most re-parses started per second (2)
+"""
+import gzip
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional
+
+from hover_parser import HoverMeasurements, PARSER_VERSION
+from pdf_guard import PARSE_WORKERS, PDFRejected, guarded_parse, limits, parse_workers
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), "data", "pdf_archive")
+REPARSE_CONCURRENCY = int(os.getenv("SIDING_BUDDY_REPARSE_CONCURRENCY", str(max(1, PARSE_WORKERS - 1))))
+REPARSE_RATE = float(os.getenv("SIDING_BUDDY_REPARSE_RATE", "2"))
+
+# Rejections that depend on load rather than on the PDF
+TRANSIENT_REJECTIONS = {"page_timeout", "parse_timeout", "parse_busy"}
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived_pdfs (
+    sha256 TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    stored_bytes INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    uploads INTEGER NOT NULL DEFAULT 1,
+    engine TEXT,
+    parser_version INTEGER,
+    measurements_json TEXT,
+    parsed_at TEXT,
+    parse_error TEXT
+)
+"""
+
+
+def archive_enabled() -> bool:
+    return os.getenv("SIDING_BUDDY_ARCHIVE", "1").lower() not in ("0", "false", "no")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class PDFArchive:
+    """Content-addressed, compressed PDF store with an SQLite index of results"""
+
+    def __init__(self, directory: str = DEFAULT_ARCHIVE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(ARCHIVE_SCHEMA)
+
+    def path(self, sha256: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, sha256[:2], f"{sha256}.pdf.gz")
+
+    def put(self, sha256: str, content: bytes) -> bool:
+        """
+        Archive a PDF (no-op apart from the upload count if already stored).
+
+        Returns:
+            True if the PDF was new
+        """
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE archived_pdfs SET last_seen = ?, uploads = uploads + 1 WHERE sha256 = ?", (_now(), sha256)
+            ).rowcount
+        if updated:
+            return False
+
+        path = self.path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = gzip.compress(content, compresslevel=6, mtime=0)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        now = _now()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO archived_pdfs (sha256, bytes, stored_bytes, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (sha256, len(content), len(data), now, now),
+            )
+        return True
+
+    def get(self, sha256: str) -> bytes:
+        """
+        Original PDF bytes.
+
+        Raises:
+            KeyError: not archived
+        """
+        try:
+            with open(self.path(sha256), "rb") as f:
+                return gzip.decompress(f.read())
+        except FileNotFoundError:
+            raise KeyError(sha256)
+
+    def record_result(self, sha256: str, engine: str, measurements: HoverMeasurements, parser_version: int = PARSER_VERSION):
+        """Store the result of parsing an archived PDF"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE archived_pdfs SET engine = ?, parser_version = ?, measurements_json = ?, parsed_at = ?,"
+                " parse_error = NULL WHERE sha256 = ?",
+                (engine, parser_version, measurements.model_dump_json(), _now(), sha256),
+            )
+
+    def record_error(self, sha256: str, error: str, parser_version: int = PARSER_VERSION):
+        """Mark a PDF this parser version can't parse, so it isn't retried until the next upgrade"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE archived_pdfs SET parser_version = ?, parse_error = ?, parsed_at = ? WHERE sha256 = ?",
+                (parser_version, error, _now(), sha256),
+            )
+
+    def entry(self, sha256: str) -> Optional[dict]:
+        """Index entry with the stored measurements, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, bytes, stored_bytes, first_seen, last_seen, uploads, engine, parser_version,"
+                " measurements_json, parsed_at, parse_error FROM archived_pdfs WHERE sha256 = ?",
+                (sha256,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "pdf_id": row[0], "bytes": row[1], "stored_bytes": row[2], "first_seen": row[3],
+            "last_seen": row[4], "uploads": row[5], "engine": row[6], "parser_version": row[7],
+            "measurements": HoverMeasurements.model_validate_json(row[8]) if row[8] else None,
+            "parsed_at": row[9], "parse_error": row[10],
+        }
+
+    def results(self) -> Iterator[tuple[str, HoverMeasurements, str]]:
+        """(sha256, measurements, parsed_at) for every PDF with a stored result"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sha256, measurements_json, parsed_at FROM archived_pdfs WHERE measurements_json IS NOT NULL"
+            ).fetchall()
+        for sha256, measurements_json, parsed_at in rows:
+            yield sha256, HoverMeasurements.model_validate_json(measurements_json), parsed_at
+
+    def stale(self, limit: int = 1000) -> list[tuple[str, str]]:
+        """(sha256, engine) of PDFs with no result from the current parser, most recently seen first"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT sha256, COALESCE(engine, 'full') FROM archived_pdfs"
+                " WHERE parser_version IS NULL OR parser_version < ? ORDER BY last_seen DESC LIMIT ?",
+                (PARSER_VERSION, limit),
+            ).fetchall()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size, stored, stale = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0), COALESCE(SUM(stored_bytes), 0),"
+                " COALESCE(SUM(parser_version IS NULL OR parser_version < ?), 0) FROM archived_pdfs",
+                (PARSER_VERSION,),
+            ).fetchone()
+        return {
+            "pdfs": count, "bytes": size, "stored_bytes": stored, "stale": stale,
+            "parser_version": PARSER_VERSION,
+        }
+
+
+_archive: Optional[PDFArchive] = None
+_archive_lock = threading.Lock()
+
+# Uploads are archived off the request path, one at a time
+_archive_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive")
+
+
+def get_archive() -> PDFArchive:
+    """Process-wide archive, opened on first use"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = PDFArchive(os.getenv("SIDING_BUDDY_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR))
+    return _archive
+
+
+def _archive_upload(sha256: str, content: bytes, engine: str, measurements: HoverMeasurements):
+    archive = get_archive()
+    archive.put(sha256, content)
+    archive.record_result(sha256, engine, measurements)
+
+
+def archive_upload(sha256: str, content: bytes, engine: str, measurements: HoverMeasurements):
+    """Queue a parsed upload and its result for archiving (returns immediately)"""
+    if archive_enabled():
+        _archive_writer.submit(_archive_upload, sha256, content, engine, measurements)
+
+
+# ============================================================================
+# BACKGROUND RE-PARSE
+# ============================================================================
+
+class ReparseJob:
+    """Re-parses archived PDFs whose results predate PARSER_VERSION"""
+
+    def __init__(self, concurrency: int = REPARSE_CONCURRENCY, rate: float = REPARSE_RATE):
+        self.concurrency = concurrency
+        self.rate = rate
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.reparsed = 0
+        self.failed = 0
+        self.deferred = 0
+        self._deferred: set = set()   # transient failures, skipped for the rest of this run
+        # Called with (sha256, measurements) after each successful re-parse
+        self.on_result: Optional[Callable[[str, HoverMeasurements], None]] = None
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start the job unless it is already running; returns True if started"""
+        with self._lock:
+            if self.running():
+                return False
+            self._stop.clear()
+            self.started_at, self.finished_at = _now(), None
+            self.reparsed = self.failed = self.deferred = 0
+            self._deferred = set()
+            self._thread = threading.Thread(target=self._run, name="pdf-reparse", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+
+    def _reparse_one(self, sha256: str, engine: str):
+        archive = get_archive()
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+                tmp.write(archive.get(sha256))
+                tmp_path = tmp.name
+            measurements, _ = guarded_parse(tmp_path, engine)
+            archive.record_result(sha256, engine, measurements)
+            if self.on_result is not None:
+                self.on_result(sha256, measurements)
+            with self._lock:
+                self.reparsed += 1
+        except PDFRejected as e:
+            if e.code not in TRANSIENT_REJECTIONS:
+                self._record_error(archive, sha256, e)
+                return
+            with self._lock:
+                self._deferred.add(sha256)
+                self.deferred += 1
+        except Exception as e:
+            # Parser errors and PDFs missing from disk
+            self._record_error(archive, sha256, e)
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _record_error(self, archive: "PDFArchive", sha256: str, e: Exception):
+        archive.record_error(sha256, f"{type(e).__name__}: {e}")
+        with self._lock:
+            self.failed += 1
+
+    def _wait_for_capacity(self):
+        # Leave a parse worker free for live uploads (workers start on first use)
+        while limits.isolated and parse_workers.size > 1:
+            stats = parse_workers.stats()
+            if not stats["started"] or stats["idle"] > 1:
+                return
+            if self._stop.wait(0.2):
+                return
+
+    def _run(self):
+        interval = 1 / self.rate if self.rate > 0 else 0
+        slots = threading.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="reparse") as pool:
+            while not self._stop.is_set():
+                with self._lock:
+                    deferred = set(self._deferred)
+                batch = [row for row in get_archive().stale(limit=100 + len(deferred)) if row[0] not in deferred]
+                if not batch:
+                    break
+                for sha256, engine in batch:
+                    slots.acquire()
+                    self._wait_for_capacity()
+                    if self._stop.is_set():
+                        slots.release()
+                        break
+                    future = pool.submit(self._reparse_one, sha256, engine)
+                    future.add_done_callback(lambda _: slots.release())
+                    if self._stop.wait(interval):
+                        break
+                # Let this batch finish before asking for the next, so
+                # in-flight PDFs aren't handed out twice
+                for _ in range(self.concurrency):
+                    slots.acquire()
+                for _ in range(self.concurrency):
+                    slots.release()
+        self.finished_at = _now()
+
+    def status(self) -> dict:
+        return {
+            "running": self.running(),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "reparsed": self.reparsed,
+            "failed": self.failed,
+            "deferred": self.deferred,
+            "concurrency": self.concurrency,
+            "rate_per_second": self.rate,
+        }
+
+
+reparse_job = ReparseJob()
+
+
+def reparse_on_start() -> bool:
+    return archive_enabled() and os.getenv("SIDING_BUDDY_REPARSE_ON_START", "1").lower() not in ("0", "false", "no")
@@ -0,0 +1,372 @@
+"""
+PDF Guard - Budgets for untrusted uploads
+
+Every upload is checked before it is parsed:
+    - size in bytes and page count, from pdfium without any layout work
+    - page 1 looks like a Hover "Complete Measurements" report
+
+The parse itself runs in a pool of worker processes. Workers report back
+after every page; a worker that exceeds the per-page or total time budget is
+killed and replaced, so a pathological PDF costs at most one budget of one
+worker instead of tying up parse capacity. A request being profiled has the
+worker sample itself too, and the worker's stacks join the request's
+profile. When every worker stays busy past the queue budget the request is
+turned away (parse_busy, 503) instead of waiting indefinitely.
+
+Failures are raised as PDFRejected with a stable code for clients:
+    too_large, not_a_pdf, too_many_pages, not_hover_report,
+    page_timeout, parse_timeout, parse_failed, parse_busy
+
+Settings (environment):
+    SIDING_BUDDY_MAX_PDF_MB           largest accepted upload (25)
+    SIDING_BUDDY_MAX_PDF_PAGES        most pages accepted (50)
+    SIDING_BUDDY_PAGE_TIME_BUDGET_S   seconds allowed per page (15)
+    SIDING_BUDDY_PARSE_TIME_BUDGET_S  seconds allowed per document (60)
+    SIDING_BUDDY_PARSE_QUEUE_S        seconds to wait for a free worker (30)
+    SIDING_BUDDY_PARSE_WORKERS        worker processes (min(4, CPUs))
+    SIDING_BUDDY_PARSE_ISOLATION      "0" to parse in-process (budgets are
+                                      then only checked between pages)
+"""
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+import pypdfium2 as pdfium
+
+from hover_parser import PDFIUM_LOCK, HoverMeasurements, ParseReport, stream_hover_pdf
+from profiling import SamplingProfiler, current_profile
+
+PARSE_WORKERS = int(os.getenv("SIDING_BUDDY_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Page 1 of a Hover report carries the report title and the property id
+HOVER_REPORT_RE = re.compile(r'Complete\s*Measurements|PROPERTY\s*ID', re.IGNORECASE)
+
+
+class ParseLimits:
+    """Runtime-adjustable upload and parse budgets"""
+
+    def __init__(self):
+        self.max_bytes = int(float(os.getenv("SIDING_BUDDY_MAX_PDF_MB", "25")) * 1024 * 1024)
+        self.max_pages = int(os.getenv("SIDING_BUDDY_MAX_PDF_PAGES", "50"))
+        self.page_seconds = float(os.getenv("SIDING_BUDDY_PAGE_TIME_BUDGET_S", "15"))
+        self.total_seconds = float(os.getenv("SIDING_BUDDY_PARSE_TIME_BUDGET_S", "60"))
+        self.queue_seconds = float(os.getenv("SIDING_BUDDY_PARSE_QUEUE_S", "30"))
+        self.isolated = os.getenv("SIDING_BUDDY_PARSE_ISOLATION", "1").lower() not in ("0", "false", "no")
+
+    def as_dict(self) -> dict:
+        return {
+            "max_bytes": self.max_bytes,
+            "max_pages": self.max_pages,
+            "page_seconds": self.page_seconds,
+            "total_seconds": self.total_seconds,
+            "queue_seconds": self.queue_seconds,
+            "isolated": self.isolated,
+        }
+
+
+limits = ParseLimits()
+
+
+class PDFRejected(Exception):
+    """An upload that failed a check or ran over a budget"""
+
+    STATUS_CODES = {
+        "too_large": 413,
+        "not_a_pdf": 400,
+        "too_many_pages": 422,
+        "not_hover_report": 422,
+        "page_timeout": 422,
+        "parse_timeout": 422,
+        "parse_failed": 500,
+        "parse_busy": 503,
+    }
+
+    def __init__(self, code: str, message: str, **info):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.info = info
+
+    @property
+    def status_code(self) -> int:
+        return self.STATUS_CODES.get(self.code, 400)
+
+    def as_detail(self) -> dict:
+        """Structured error body for API responses"""
+        return {"code": self.code, "message": self.message, **self.info}
+
+
+# ============================================================================
+# PREFLIGHT
+# ============================================================================
+
+def check_size(size: Optional[int]):
+    """Reject an upload over the byte budget (size may be unknown)"""
+    if size is not None and size > limits.max_bytes:
+        raise PDFRejected(
+            "too_large", f"PDF is {size:,} bytes; the limit is {limits.max_bytes:,}",
+            bytes=size, max_bytes=limits.max_bytes,
+        )
+
+
+def check_pdf(content: bytes) -> int:
+    """
+    Cheap checks before parsing: size, page count and a Hover title page.
+
+    Returns:
+        Page count
+
+    Raises:
+        PDFRejected: too_large, not_a_pdf, too_many_pages or not_hover_report
+    """
+    check_size(len(content))
+    with PDFIUM_LOCK:
+        try:
+            pdf = pdfium.PdfDocument(content)
+        except Exception as e:
+            raise PDFRejected("not_a_pdf", f"Not a readable PDF: {e}")
+        try:
+            page_count = len(pdf)
+            if page_count > limits.max_pages:
+                raise PDFRejected(
+                    "too_many_pages", f"PDF has {page_count} pages; the limit is {limits.max_pages}",
+                    pages=page_count, max_pages=limits.max_pages,
+                )
+            if page_count == 0:
+                raise PDFRejected("not_hover_report", "PDF has no pages", pages=0)
+
+            page = pdf[0]
+            textpage = page.get_textpage()
+            first_page_text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+        finally:
+            pdf.close()
+
+    if not HOVER_REPORT_RE.search(first_page_text):
+        raise PDFRejected(
+            "not_hover_report",
+            "This doesn't look like a Hover Complete Measurements report",
+            pages=page_count,
+        )
+    return page_count
+
+
+# ============================================================================
+# WORKER PROCESSES
+# ============================================================================
+
+def _worker_main(conn):
+    """
+    Worker process loop: parse one (path, engine, fields, profile interval)
+    job at a time, streaming events. A profiled job sends ("profile", stacks)
+    just before its result.
+    """
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        path, engine, fields, profile_interval_ms = job
+        profiler = SamplingProfiler(threading.get_ident(), profile_interval_ms) if profile_interval_ms else None
+        if profiler is not None:
+            profiler.start()
+        try:
+            for event, data in stream_hover_pdf(path, engine, fields):
+                if event == "complete" and profiler is not None:
+                    profiler.stop()
+                    conn.send(("profile", profiler.stacks))
+                    profiler = None
+                conn.send((event, data))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            if profiler is not None:
+                profiler.stop()
+
+
+class ParseWorker:
+    """One parse worker process and its pipe"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), name="pdf-parse-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class ParseWorkerPool:
+    """Fixed set of worker processes; a worker that blows its budget is replaced"""
+
+    def __init__(self, size: int = PARSE_WORKERS):
+        self.size = size
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[ParseWorker]" = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+        self.killed = 0
+
+    def _start(self):
+        with self._lock:
+            if not self._started:
+                for _ in range(self.size):
+                    self._idle.put(ParseWorker(self._context))
+                self._started = True
+
+    def _checkout(self) -> ParseWorker:
+        """
+        An idle worker, waiting up to limits.queue_seconds for one.
+
+        Raises:
+            PDFRejected: parse_busy
+        """
+        self._start()
+        try:
+            worker = self._idle.get(timeout=limits.queue_seconds)
+        except queue.Empty:
+            raise PDFRejected(
+                "parse_busy", f"Every parse worker stayed busy for {limits.queue_seconds:g}s; try again shortly",
+                queue_seconds=limits.queue_seconds,
+            )
+        if not worker.alive():
+            worker = ParseWorker(self._context)
+        return worker
+
+    def _replace(self, worker: ParseWorker):
+        worker.kill()
+        self.killed += 1
+        self._idle.put(ParseWorker(self._context))
+
+    def stream(self, pdf_path: str, engine: str, fields: Optional[list] = None) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        stream_hover_pdf in a worker process, under the time budgets.
+
+        Raises:
+            PDFRejected: page_timeout, parse_timeout, parse_failed or parse_busy
+        """
+        profile = current_profile()
+        worker = self._checkout()
+        healthy = False
+        try:
+            worker.conn.send((pdf_path, engine, fields, profile.interval_ms if profile is not None else None))
+            deadline = time.monotonic() + limits.total_seconds
+            pages_done = 0
+            while True:
+                remaining = deadline - time.monotonic()
+                if not worker.conn.poll(max(0, min(limits.page_seconds, remaining))):
+                    if remaining <= limits.page_seconds:
+                        raise PDFRejected(
+                            "parse_timeout", f"PDF took longer than {limits.total_seconds:g}s to parse",
+                            pages_parsed=pages_done, total_seconds=limits.total_seconds,
+                        )
+                    raise PDFRejected(
+                        "page_timeout", f"Page {pages_done + 1} took longer than {limits.page_seconds:g}s to parse",
+                        page=pages_done + 1, page_seconds=limits.page_seconds,
+                    )
+                try:
+                    event, data = worker.conn.recv()
+                except EOFError:
+                    raise PDFRejected("parse_failed", "Parse worker exited unexpectedly", pages_parsed=pages_done)
+
+                if event == "profile":
+                    profile.add_stacks(data)
+                    continue
+                if event == "error":
+                    healthy = True
+                    raise PDFRejected("parse_failed", f"Error parsing PDF: {data}", pages_parsed=pages_done)
+                if event == "complete":
+                    healthy = True
+                    yield event, data
+                    return
+                pages_done += 1
+                yield event, data
+        finally:
+            # Anything but a finished job (timeout, crash, or the caller
+            # abandoning the stream) leaves the worker mid-parse
+            if healthy:
+                self._idle.put(worker)
+            else:
+                self._replace(worker)
+
+    def warm_up(self, pdf_path: str):
+        """Start every worker and run one parse in each (imports, first layout pass)"""
+        self._start()
+        workers = [self._checkout() for _ in range(self.size)]
+        try:
+            for worker in workers:
+                worker.conn.send((pdf_path, "full", None, None))
+            for worker in workers:
+                while worker.conn.recv()[0] not in ("complete", "error"):
+                    pass
+        finally:
+            for worker in workers:
+                self._idle.put(worker)
+
+    def stats(self) -> dict:
+        return {"workers": self.size, "started": self._started, "idle": self._idle.qsize(), "killed": self.killed}
+
+
+parse_workers = ParseWorkerPool()
+
+
+def _stream_in_process(pdf_path: str, engine: str, fields: Optional[list] = None) -> Iterator[tuple[str, dict[str, Any]]]:
+    """stream_hover_pdf in this process; budgets are checked between pages"""
+    start = time.monotonic()
+    page_start = start
+    pages_done = 0
+    for event, data in stream_hover_pdf(pdf_path, engine, fields):
+        now = time.monotonic()
+        if event == "fields":
+            pages_done += 1
+            if now - page_start > limits.page_seconds:
+                raise PDFRejected(
+                    "page_timeout", f"Page {pages_done} took longer than {limits.page_seconds:g}s to parse",
+                    page=pages_done, page_seconds=limits.page_seconds,
+                )
+        if now - start > limits.total_seconds:
+            raise PDFRejected(
+                "parse_timeout", f"PDF took longer than {limits.total_seconds:g}s to parse",
+                pages_parsed=pages_done, total_seconds=limits.total_seconds,
+            )
+        yield event, data
+        page_start = time.monotonic()
+
+
+def guarded_stream(
+    pdf_path: str, engine: str = "full", isolated: Optional[bool] = None, fields: Optional[list] = None
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    Parse events (see stream_hover_pdf) under the time budgets.
+
+    Args:
+        fields: Only parse these measurement fields (default: all)
+        isolated: Parse in a worker process (default: limits.isolated).
+                  In-process parses can't be interrupted.
+    """
+    if limits.isolated if isolated is None else isolated:
+        return parse_workers.stream(pdf_path, engine, fields)
+    return _stream_in_process(pdf_path, engine, fields)
+
+
+def guarded_parse(
+    pdf_path: str, engine: str = "full", isolated: Optional[bool] = None, fields: Optional[list] = None
+) -> tuple[HoverMeasurements, ParseReport]:
+    """parse_hover_pdf_report under the time budgets (raises PDFRejected)"""
+    for event, data in guarded_stream(pdf_path, engine, isolated, fields):
+        if event == "complete":
+            return data["measurements"], data["report"]
+    raise PDFRejected("parse_failed", "Parse finished without a result")
@@ -0,0 +1,229 @@
+"""
+Profiling - On-demand sampling profiler for slow requests
+
+A background thread samples the request thread's Python stack every few
+milliseconds (sys._current_frames), so the request itself runs unmodified
+and the cost is one stack walk per interval. Work handed to a parse worker
+process is sampled there and its stacks are added to the request's profile
+(see current_profile). Profiles are kept in a bounded
+ring buffer when the request asked for one (X-Profile header) or when
+profiling is switched on and the request ran over the latency threshold.
+They can be downloaded as collapsed stacks (flamegraph.pl / speedscope
+import) or speedscope JSON.
+
+Settings (environment):
+    SIDING_BUDDY_ADMIN_TOKEN          required for the admin endpoints and X-Profile
+    SIDING_BUDDY_PROFILING            "1" to start with profiling switched on
+    SIDING_BUDDY_PROFILE_THRESHOLD_MS keep profiles of requests slower than this (5000)
+    SIDING_BUDDY_PROFILE_INTERVAL_MS  sampling interval (5)
+    SIDING_BUDDY_PROFILE_BUFFER       number of profiles kept (20)
+"""
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class ProfilerSettings:
+    """Runtime-adjustable profiling switches"""
+
+    def __init__(self):
+        self.enabled = os.getenv("SIDING_BUDDY_PROFILING", "").lower() in ("1", "true", "yes")
+        self.threshold_ms = float(os.getenv("SIDING_BUDDY_PROFILE_THRESHOLD_MS", "5000"))
+        self.interval_ms = float(os.getenv("SIDING_BUDDY_PROFILE_INTERVAL_MS", "5"))
+        self.buffer_size = int(os.getenv("SIDING_BUDDY_PROFILE_BUFFER", "20"))
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "interval_ms": self.interval_ms,
+            "buffer_size": self.buffer_size,
+        }
+
+
+settings = ProfilerSettings()
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack on a background thread"""
+
+    def __init__(self, thread_id: int, interval_ms: float):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            names.reverse()
+            self.stacks[";".join(names)] += 1
+
+
+class ProfileRecord:
+    """A kept profile plus what was being processed"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, endpoint: str, stacks: Counter, duration_ms: float, interval_ms: float, info: dict):
+        self.id = next(self._ids)
+        self.endpoint = endpoint
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.stacks = stacks
+        self.duration_ms = round(duration_ms, 1)
+        self.interval_ms = interval_ms
+        self.info = info
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "endpoint": self.endpoint,
+            "created_at": self.created_at,
+            "duration_ms": self.duration_ms,
+            "samples": sum(self.stacks.values()),
+            **self.info,
+        }
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one "frame;frame;frame count" line per stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self) -> dict:
+        """speedscope.app "sampled" profile"""
+        frames, frame_index = [], {}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            indexes = []
+            for name in stack.split(";"):
+                if name not in frame_index:
+                    frame_index[name] = len(frames)
+                    frames.append({"name": name})
+                indexes.append(frame_index[name])
+            samples.append(indexes)
+            weights.append(count * self.interval_ms)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.endpoint} #{self.id}",
+            "exporter": "siding-buddy",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.endpoint,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+class ProfileBuffer:
+    """Bounded ring buffer of kept profiles"""
+
+    def __init__(self, size: int):
+        self._records = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, record: ProfileRecord):
+        with self._lock:
+            self._records.append(record)
+
+    def list(self) -> list:
+        with self._lock:
+            return [record.summary() for record in reversed(self._records)]
+
+    def get(self, profile_id: int) -> Optional[ProfileRecord]:
+        with self._lock:
+            for record in self._records:
+                if record.id == profile_id:
+                    return record
+        return None
+
+
+profiles = ProfileBuffer(settings.buffer_size)
+
+
+class RequestProfile:
+    """Handle yielded by profile_request for attaching request details"""
+
+    def __init__(self, interval_ms: Optional[float] = None):
+        self.info = {}
+        self.interval_ms = interval_ms
+        self.stacks: Counter = Counter()
+
+    def annotate(self, **info):
+        self.info.update(info)
+
+    def add_stacks(self, stacks: Counter):
+        """Samples taken elsewhere on this request's behalf (a parse worker)"""
+        self.stacks.update(stacks)
+
+
+_active = threading.local()
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """The profile sampling this thread, or None when it isn't profiled"""
+    return getattr(_active, "profile", None)
+
+
+@contextmanager
+def profile_request(endpoint: str, force: bool = False):
+    """
+    Profile the calling thread for the duration of the block.
+
+    Nothing is sampled unless force is set or profiling is switched on. A
+    forced profile is always kept; otherwise it is kept only when the block
+    took at least settings.threshold_ms.
+    """
+    if not (force or settings.enabled):
+        yield RequestProfile()
+        return
+
+    interval_ms = settings.interval_ms
+    handle = RequestProfile(interval_ms)
+    profiler = SamplingProfiler(threading.get_ident(), interval_ms)
+    previous = current_profile()
+    _active.profile = handle
+    start = time.perf_counter()
+    profiler.start()
+    try:
+        yield handle
+    finally:
+        profiler.stop()
+        _active.profile = previous
+        duration_ms = (time.perf_counter() - start) * 1000
+        if force or duration_ms >= settings.threshold_ms:
+            profiles.add(ProfileRecord(endpoint, profiler.stacks + handle.stacks, duration_ms, interval_ms, handle.info))
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """True when an admin token is configured and matches"""
+    expected = os.getenv("SIDING_BUDDY_ADMIN_TOKEN")
+    return bool(expected) and bool(token) and hmac.compare_digest(token, expected)
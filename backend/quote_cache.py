@@ -0,0 +1,124 @@
+"""
+Quote Cache - Serialized /api/calculate responses for repeat inputs
+
+The UI and integrations re-submit identical quotes (re-renders, retries,
+PDF regeneration). Each response is kept as its JSON bytes under a hash of
+the normalized input (the validated QuoteInput with defaults filled in and
+measurements resolved from measurements_token) and the price table version.
+A repeat is answered with the stored bytes: no calculate_quote and no
+response serialization.
+
+Price table versions are hashes of the catalog, so a price change gives
+every input a new key and stale entries are never served; they age out of
+the LRU. Entries are bounded by total size, least recently used dropped
+first.
+
+With SIDING_BUDDY_SHARED_CACHE=1 responses live in the shared cache instead
+(see shared_cache.py), so every worker process answers a repeat computed by
+any of them, within the shared cache's size budget.
+
+Settings (environment):
+    SIDING_BUDDY_QUOTE_CACHE_MB   size budget in megabytes, 0 to turn off (32)
+"""
+import hashlib
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from quote_calculator import QuoteInput, PriceTable
+from shared_cache import get_shared_cache, shared_cache_enabled
+
+QUOTE_CACHE_MB = float(os.getenv("SIDING_BUDDY_QUOTE_CACHE_MB", "32"))
+
+
+def quote_key(input_data: QuoteInput, prices: PriceTable) -> str:
+    """Canonical hash of a (measurement-resolved) input and the price table version"""
+    # Validation has coerced every value and filled the defaults, and fields
+    # are dumped in declaration order, so equal inputs give equal JSON
+    canonical = input_data.model_dump_json(exclude={"measurements_token"})
+    return hashlib.blake2b(f"{prices.version}:{canonical}".encode(), digest_size=16).hexdigest()
+
+
+class QuoteCache:
+    """Size-bounded LRU of serialized quote responses"""
+
+    def __init__(self, max_bytes: int = int(QUOTE_CACHE_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[tuple[bytes, float]]:
+        """(response body, grand total) for a cached quote, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, body: bytes, grand_total: float):
+        """Store a response body, evicting the least recently used over budget"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[key] = (body, grand_total)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+class SharedQuoteCache:
+    """QuoteCache interface over the cross-worker shared cache"""
+
+    # Grand total, then the response body
+    _TOTAL = struct.Struct("<d")
+
+    def get(self, key: str) -> Optional[tuple[bytes, float]]:
+        data = get_shared_cache().get(f"quote:{key}")
+        if data is None:
+            return None
+        return data[self._TOTAL.size:], self._TOTAL.unpack_from(data)[0]
+
+    def put(self, key: str, body: bytes, grand_total: float):
+        get_shared_cache().put(f"quote:{key}", self._TOTAL.pack(grand_total) + body)
+
+    def clear(self):
+        get_shared_cache().clear("quote")
+
+    def stats(self) -> dict:
+        return {"backend": "shared", **get_shared_cache().stats("quote")}
+
+
+quote_cache = SharedQuoteCache() if shared_cache_enabled() else QuoteCache()
@@ -1,9 +1,14 @@
 """
 Siding Quote Calculator - Pricing logic for siding estimates
 """
-from typing import Optional, Dict, Any
-from pydantic import BaseModel
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, NamedTuple
+from pydantic import BaseModel, Field
 from hover_parser import HoverMeasurements
+from money import to_cents, line_total_cents, from_cents, split_cents
 
 
 # ============================================================================
@@ -79,6 +84,109 @@ OTHER = {
 }
 
 
+# ============================================================================
+# COMPILED PRICE TABLES
+# ============================================================================
+# A catalog (the dicts above, or a tenant's copy of them) is compiled once
+# into an immutable PriceTable: every price is stored alongside its integer
+# cents, derived prices (gutter rehang) are pre-summed, and lookups during
+# calculate_quote are plain dict hits with no merging or conversion.
+
+CATALOG_SECTIONS = {
+    "soffit_fascia": SOFFIT_FASCIA,
+    "corners": CORNERS,
+    "labor": LABOR,
+    "wraps": WRAPS,
+    "accessories": ACCESSORIES,
+    "gutters": GUTTERS,
+    "other": OTHER,
+}
+
+
+class Price(NamedTuple):
+    """A unit price in dollars (as shown on line items) and in cents"""
+    price: float
+    cents: int
+    # Catalog item ("section.key") the price came from; "" for ad-hoc prices
+    item: str = ""
+
+
+DEFAULT_SIDING_PRICE = Price(525, to_cents(525))
+
+
+@dataclass(frozen=True)
+class PriceTable:
+    """Immutable, pre-converted prices for one catalog"""
+    tenant: str
+    version: str
+    siding_names: Mapping[str, str]
+    siding_prices: Mapping[str, Price]
+    soffit_fascia: Mapping[str, Price]
+    corners: Mapping[str, Price]
+    labor: Mapping[str, Price]
+    wraps: Mapping[str, Price]
+    accessories: Mapping[str, Price]
+    gutters: Mapping[str, Price]
+    other: Mapping[str, Price]
+
+    def catalog(self) -> dict:
+        """Plain-dict view of the catalog (for /api/products and exports)"""
+        catalog = {
+            "siding_products": {
+                key: {"name": self.siding_names[key], "price": price.price}
+                for key, price in self.siding_prices.items()
+            },
+        }
+        for section in CATALOG_SECTIONS:
+            catalog[section] = {key: price.price for key, price in getattr(self, section).items()}
+        catalog["gutters"].pop("rehang", None)
+        return catalog
+
+
+def default_catalog() -> dict:
+    """Deep copy of the built-in catalog, in the shape compile_price_table takes"""
+    catalog = {"siding_products": {key: dict(product) for key, product in SIDING_PRODUCTS.items()}}
+    for section, prices in CATALOG_SECTIONS.items():
+        catalog[section] = dict(prices)
+    return catalog
+
+
+def compile_price_table(catalog: Dict[str, Any], tenant: str = "default") -> PriceTable:
+    """
+    Compile a catalog into an immutable PriceTable.
+
+    Args:
+        catalog: {"siding_products": {key: {"name", "price"}}, "labor": {key: price}, ...}
+                 with every section of the built-in catalog present
+        tenant: Tenant the table belongs to
+
+    Returns:
+        PriceTable whose version is a hash of the catalog's prices
+    """
+    def compile_section(section: str, prices: dict) -> Mapping[str, Price]:
+        return MappingProxyType({
+            key: Price(price, to_cents(price), f"{section}.{key}") for key, price in prices.items()
+        })
+
+    sections = {section: dict(catalog[section]) for section in CATALOG_SECTIONS}
+    gutters = sections["gutters"]
+    gutters["rehang"] = gutters["take_down"] + gutters["put_back_up"]
+
+    products = catalog["siding_products"]
+    version = hashlib.sha256(json.dumps(catalog, sort_keys=True).encode()).hexdigest()[:16]
+
+    return PriceTable(
+        tenant=tenant,
+        version=version,
+        siding_names=MappingProxyType({key: product["name"] for key, product in products.items()}),
+        siding_prices=compile_section("siding_products", {key: product["price"] for key, product in products.items()}),
+        **{section: compile_section(section, prices) for section, prices in sections.items()},
+    )
+
+
+DEFAULT_PRICE_TABLE = compile_price_table(default_catalog())
+
+
 # ============================================================================
 # DATA MODELS
 # ============================================================================
@@ -87,6 +195,8 @@ class QuoteInput(BaseModel):
     """Input for quote calculation"""
     # Extracted from PDF
     measurements: Optional[HoverMeasurements] = None
+    # Or a token from /api/parse-pdf referring to a stored parse result
+    measurements_token: Optional[str] = None
 
     # Siding selection
     siding_product: str = "carvedwood_044"
@@ -157,6 +267,8 @@ class LineItem(BaseModel):
     unit: str
     unit_price: float
     total: float
+    # Catalog item priced on this line (not serialized; see repricing.py)
+    item: Optional[str] = Field(default=None, exclude=True)
 
 
 class QuoteResult(BaseModel):
@@ -189,35 +301,38 @@ class QuoteResult(BaseModel):
     balance_50: float = 0
 
 
-def calculate_quote(input_data: QuoteInput) -> QuoteResult:
-    """
-    Calculate a complete siding quote from input data.
-
-    Args:
-        input_data: QuoteInput with all measurements and selections
-
-    Returns:
-        QuoteResult with all line items and totals
-    """
-    result = QuoteResult(
-        siding_product_name=SIDING_PRODUCTS.get(input_data.siding_product, {}).get("name", "Unknown"),
-        siding_profile=input_data.siding_profile,
-        siding_color=input_data.siding_color,
-        g8_color=input_data.g8_color,
-    )
-
-    # Get property info from measurements if available
-    if input_data.measurements:
-        result.property_address = input_data.measurements.property_address
-        result.property_id = input_data.measurements.property_id
+def _add_line(
+    line_items: list,
+    category: str,
+    description: str,
+    quantity: float,
+    unit: str,
+    unit_price: Price,
+) -> int:
+    """Append a priced line item and return its total in cents"""
+    total_cents = line_total_cents(quantity, unit_price.cents)
+    line_items.append(LineItem(
+        category=category,
+        description=description,
+        quantity=quantity,
+        unit=unit,
+        unit_price=unit_price.price,
+        total=from_cents(total_cents),
+        item=unit_price.item or None,
+    ))
+    return total_cents
 
-    line_items = []
 
-    # ========================================================================
-    # SIDING PACKAGE
-    # ========================================================================
-    siding_total = 0
+# ============================================================================
+# CATEGORY PACKAGES
+# ============================================================================
+# Each package builder prices one customer-facing category and returns its
+# line items plus the category total in cents. CATEGORY_FIELDS records which
+# QuoteInput fields each builder reads, so a change to one field only needs
+# the affected categories re-priced (see live_quote.py).
 
+def resolve_squares(input_data: QuoteInput) -> float:
+    """Siding squares to price: the override, else waste-adjusted PDF squares"""
     # Get siding squares (from input or calculate from PDF)
     squares = input_data.siding_squares
     if squares is None and input_data.measurements:
@@ -226,60 +341,38 @@ def calculate_quote(input_data: QuoteInput) -> QuoteResult:
             squares = input_data.measurements.siding_squares_10_waste
         else:
             squares = input_data.measurements.siding_squares_18_waste
-    squares = squares or 0
+    return squares or 0
+
+
+def _siding_package(input_data: QuoteInput, prices: PriceTable) -> tuple[list, int]:
+    """Siding material, insulation, tear-off, corners and dormers"""
+    line_items = []
+    siding_cents = 0
+
+    squares = resolve_squares(input_data)
 
     # Siding material
-    siding_price = SIDING_PRODUCTS.get(input_data.siding_product, {}).get("price", 525)
+    siding_price = prices.siding_prices.get(input_data.siding_product)
+    if siding_price is None:
+        siding_price = DEFAULT_SIDING_PRICE._replace(item=f"siding_products.{input_data.siding_product}")
     if squares > 0:
-        siding_line = LineItem(
-            category="Siding",
-            description=SIDING_PRODUCTS.get(input_data.siding_product, {}).get("name", "Siding"),
-            quantity=squares,
-            unit="sq",
-            unit_price=siding_price,
-            total=round(squares * siding_price, 2)
+        siding_cents += _add_line(
+            line_items, "Siding",
+            prices.siding_names.get(input_data.siding_product, "Siding"),
+            squares, "sq", siding_price,
         )
-        line_items.append(siding_line)
-        siding_total += siding_line.total
 
     # Fan fold insulation
     if input_data.include_fan_fold and squares > 0:
-        fan_fold_line = LineItem(
-            category="Siding",
-            description="Fan Fold Insulation",
-            quantity=squares,
-            unit="sq",
-            unit_price=LABOR["fan_fold"],
-            total=round(squares * LABOR["fan_fold"], 2)
-        )
-        line_items.append(fan_fold_line)
-        siding_total += fan_fold_line.total
+        siding_cents += _add_line(line_items, "Siding", "Fan Fold Insulation", squares, "sq", prices.labor["fan_fold"])
 
     # Remove and dispose
     if input_data.include_remove_dispose and squares > 0:
-        remove_line = LineItem(
-            category="Siding",
-            description="Remove/Dispose Old Siding",
-            quantity=squares,
-            unit="sq",
-            unit_price=LABOR["remove_dispose"],
-            total=round(squares * LABOR["remove_dispose"], 2)
-        )
-        line_items.append(remove_line)
-        siding_total += remove_line.total
+        siding_cents += _add_line(line_items, "Siding", "Remove/Dispose Old Siding", squares, "sq", prices.labor["remove_dispose"])
 
     # Fullback insulation
     if input_data.include_fullback and squares > 0:
-        fullback_line = LineItem(
-            category="Siding",
-            description="Fullback Insulation",
-            quantity=squares,
-            unit="sq",
-            unit_price=LABOR["fullback_insulation"],
-            total=round(squares * LABOR["fullback_insulation"], 2)
-        )
-        line_items.append(fullback_line)
-        siding_total += fullback_line.total
+        siding_cents += _add_line(line_items, "Siding", "Fullback Insulation", squares, "sq", prices.labor["fullback_insulation"])
 
     # Corners
     inside_count = input_data.inside_corners
@@ -291,405 +384,246 @@ def calculate_quote(input_data: QuoteInput) -> QuoteResult:
         outside_count = input_data.measurements.outside_corners_count or 0
 
     if inside_count > 0:
-        inside_line = LineItem(
-            category="Siding",
-            description="Inside Corners",
-            quantity=inside_count,
-            unit="ea",
-            unit_price=CORNERS["inside"],
-            total=round(inside_count * CORNERS["inside"], 2)
-        )
-        line_items.append(inside_line)
-        siding_total += inside_line.total
+        siding_cents += _add_line(line_items, "Siding", "Inside Corners", inside_count, "ea", prices.corners["inside"])
 
     if outside_count > 0:
-        outside_line = LineItem(
-            category="Siding",
-            description="Outside Corners",
-            quantity=outside_count,
-            unit="ea",
-            unit_price=CORNERS["outside"],
-            total=round(outside_count * CORNERS["outside"], 2)
-        )
-        line_items.append(outside_line)
-        siding_total += outside_line.total
+        siding_cents += _add_line(line_items, "Siding", "Outside Corners", outside_count, "ea", prices.corners["outside"])
 
     # Dormers
     if input_data.dormers_count > 0:
-        dormers_line = LineItem(
-            category="Siding",
-            description="Dormers/Flashing",
-            quantity=input_data.dormers_count,
-            unit="ea",
-            unit_price=LABOR["dormers_flashing"],
-            total=round(input_data.dormers_count * LABOR["dormers_flashing"], 2)
-        )
-        line_items.append(dormers_line)
-        siding_total += dormers_line.total
+        siding_cents += _add_line(line_items, "Siding", "Dormers/Flashing", input_data.dormers_count, "ea", prices.labor["dormers_flashing"])
+
+    return line_items, siding_cents
 
-    result.siding_package_total = siding_total
 
-    # ========================================================================
-    # SOFFIT & FASCIA PACKAGE
-    # ========================================================================
-    soffit_total = 0
+def _soffit_fascia_package(input_data: QuoteInput, prices: PriceTable) -> tuple[list, int]:
+    """Soffit, fascia/frieze, porch beam and ceiling, bird boxes"""
+    line_items = []
+    soffit_cents = 0
 
     # Soffit
     soffit_lf = input_data.soffit_lf
     if soffit_lf > 0:
-        soffit_price = SOFFIT_FASCIA["soffit_over_16"] if input_data.soffit_width_over_16 else SOFFIT_FASCIA["soffit_under_16"]
-        soffit_line = LineItem(
-            category="Soffit/Fascia",
-            description=f"Soffit ({'over' if input_data.soffit_width_over_16 else 'under'} 16\")",
-            quantity=soffit_lf,
-            unit="LF",
-            unit_price=soffit_price,
-            total=round(soffit_lf * soffit_price, 2)
+        soffit_price = prices.soffit_fascia["soffit_over_16"] if input_data.soffit_width_over_16 else prices.soffit_fascia["soffit_under_16"]
+        soffit_cents += _add_line(
+            line_items, "Soffit/Fascia",
+            f"Soffit ({'over' if input_data.soffit_width_over_16 else 'under'} 16\")",
+            soffit_lf, "LF", soffit_price,
         )
-        line_items.append(soffit_line)
-        soffit_total += soffit_line.total
 
     # Fascia/Frieze
     if input_data.fascia_frieze_lf > 0:
-        fascia_line = LineItem(
-            category="Soffit/Fascia",
-            description="Fascia/Frieze",
-            quantity=input_data.fascia_frieze_lf,
-            unit="LF",
-            unit_price=SOFFIT_FASCIA["fascia_frieze"],
-            total=round(input_data.fascia_frieze_lf * SOFFIT_FASCIA["fascia_frieze"], 2)
-        )
-        line_items.append(fascia_line)
-        soffit_total += fascia_line.total
+        soffit_cents += _add_line(line_items, "Soffit/Fascia", "Fascia/Frieze", input_data.fascia_frieze_lf, "LF", prices.soffit_fascia["fascia_frieze"])
 
     # Porch beam
     if input_data.porch_beam_lf > 0:
-        beam_line = LineItem(
-            category="Soffit/Fascia",
-            description="Porch Beam",
-            quantity=input_data.porch_beam_lf,
-            unit="LF",
-            unit_price=SOFFIT_FASCIA["porch_beam"],
-            total=round(input_data.porch_beam_lf * SOFFIT_FASCIA["porch_beam"], 2)
-        )
-        line_items.append(beam_line)
-        soffit_total += beam_line.total
+        soffit_cents += _add_line(line_items, "Soffit/Fascia", "Porch Beam", input_data.porch_beam_lf, "LF", prices.soffit_fascia["porch_beam"])
 
     # Porch ceiling
     if input_data.porch_ceiling_count > 0:
-        ceiling_line = LineItem(
-            category="Soffit/Fascia",
-            description="Porch Ceiling",
-            quantity=input_data.porch_ceiling_count,
-            unit="ea",
-            unit_price=SOFFIT_FASCIA["porch_ceiling"],
-            total=round(input_data.porch_ceiling_count * SOFFIT_FASCIA["porch_ceiling"], 2)
-        )
-        line_items.append(ceiling_line)
-        soffit_total += ceiling_line.total
+        soffit_cents += _add_line(line_items, "Soffit/Fascia", "Porch Ceiling", input_data.porch_ceiling_count, "ea", prices.soffit_fascia["porch_ceiling"])
 
     # Bird boxes
     if input_data.bird_box_count > 0:
-        bird_line = LineItem(
-            category="Soffit/Fascia",
-            description="Bird Box",
-            quantity=input_data.bird_box_count,
-            unit="ea",
-            unit_price=SOFFIT_FASCIA["bird_box"],
-            total=round(input_data.bird_box_count * SOFFIT_FASCIA["bird_box"], 2)
-        )
-        line_items.append(bird_line)
-        soffit_total += bird_line.total
+        soffit_cents += _add_line(line_items, "Soffit/Fascia", "Bird Box", input_data.bird_box_count, "ea", prices.soffit_fascia["bird_box"])
 
     # Extra bend/crown
     if input_data.extra_bend_lf > 0:
-        bend_line = LineItem(
-            category="Soffit/Fascia",
-            description="Extra Bend/Crown",
-            quantity=input_data.extra_bend_lf,
-            unit="LF",
-            unit_price=SOFFIT_FASCIA["extra_bend_crown"],
-            total=round(input_data.extra_bend_lf * SOFFIT_FASCIA["extra_bend_crown"], 2)
-        )
-        line_items.append(bend_line)
-        soffit_total += bend_line.total
+        soffit_cents += _add_line(line_items, "Soffit/Fascia", "Extra Bend/Crown", input_data.extra_bend_lf, "LF", prices.soffit_fascia["extra_bend_crown"])
 
     # Remove soffit
     if input_data.remove_soffit_lf > 0:
-        remove_soffit_line = LineItem(
-            category="Soffit/Fascia",
-            description="Remove Soffit/Fascia",
-            quantity=input_data.remove_soffit_lf,
-            unit="LF",
-            unit_price=SOFFIT_FASCIA["remove_soffit"],
-            total=round(input_data.remove_soffit_lf * SOFFIT_FASCIA["remove_soffit"], 2)
-        )
-        line_items.append(remove_soffit_line)
-        soffit_total += remove_soffit_line.total
+        soffit_cents += _add_line(line_items, "Soffit/Fascia", "Remove Soffit/Fascia", input_data.remove_soffit_lf, "LF", prices.soffit_fascia["remove_soffit"])
 
-    result.soffit_fascia_package_total = soffit_total
+    return line_items, soffit_cents
 
-    # ========================================================================
-    # GUTTERS
-    # ========================================================================
-    gutters_total = 0
+
+def _gutters_package(input_data: QuoteInput, prices: PriceTable) -> tuple[list, int]:
+    """New gutters and remove/rehang"""
+    line_items = []
+    gutters_cents = 0
 
     # New gutters
     if input_data.new_gutter_lf > 0:
-        new_gutter_line = LineItem(
-            category="Gutters",
-            description="New Gutters",
-            quantity=input_data.new_gutter_lf,
-            unit="LF",
-            unit_price=GUTTERS["new_gutters"],
-            total=round(input_data.new_gutter_lf * GUTTERS["new_gutters"], 2)
-        )
-        line_items.append(new_gutter_line)
-        gutters_total += new_gutter_line.total
+        gutters_cents += _add_line(line_items, "Gutters", "New Gutters", input_data.new_gutter_lf, "LF", prices.gutters["new_gutters"])
 
     # Rehang gutters (take down + put back)
     if input_data.rehang_gutter_lf > 0:
-        rehang_price = GUTTERS["take_down"] + GUTTERS["put_back_up"]
-        rehang_line = LineItem(
-            category="Gutters",
-            description="Remove/Rehang Gutters",
-            quantity=input_data.rehang_gutter_lf,
-            unit="LF",
-            unit_price=rehang_price,
-            total=round(input_data.rehang_gutter_lf * rehang_price, 2)
-        )
-        line_items.append(rehang_line)
-        gutters_total += rehang_line.total
+        gutters_cents += _add_line(line_items, "Gutters", "Remove/Rehang Gutters", input_data.rehang_gutter_lf, "LF", prices.gutters["rehang"])
 
-    result.gutters_total = gutters_total
+    return line_items, gutters_cents
 
-    # ========================================================================
-    # WRAPS
-    # ========================================================================
-    wraps_total = 0
+
+def _wraps_package(input_data: QuoteInput, prices: PriceTable) -> tuple[list, int]:
+    """Window, door, transom and garage door wraps"""
+    line_items = []
+    wraps_cents = 0
     wrap_suffix = "metal" if input_data.wraps_are_metal else "wood"
+    wrap_label = "Metal" if input_data.wraps_are_metal else "Wood"
 
     if input_data.window_wrap_count > 0:
-        window_price = WRAPS[f"window_{wrap_suffix}"]
-        window_wrap_line = LineItem(
-            category="Wraps",
-            description=f"Window Wrap ({'Metal' if input_data.wraps_are_metal else 'Wood'})",
-            quantity=input_data.window_wrap_count,
-            unit="ea",
-            unit_price=window_price,
-            total=round(input_data.window_wrap_count * window_price, 2)
-        )
-        line_items.append(window_wrap_line)
-        wraps_total += window_wrap_line.total
+        wraps_cents += _add_line(line_items, "Wraps", f"Window Wrap ({wrap_label})", input_data.window_wrap_count, "ea", prices.wraps[f"window_{wrap_suffix}"])
 
     if input_data.door_wrap_count > 0:
-        door_price = WRAPS[f"door_{wrap_suffix}"]
-        door_wrap_line = LineItem(
-            category="Wraps",
-            description=f"Door Wrap ({'Metal' if input_data.wraps_are_metal else 'Wood'})",
-            quantity=input_data.door_wrap_count,
-            unit="ea",
-            unit_price=door_price,
-            total=round(input_data.door_wrap_count * door_price, 2)
-        )
-        line_items.append(door_wrap_line)
-        wraps_total += door_wrap_line.total
+        wraps_cents += _add_line(line_items, "Wraps", f"Door Wrap ({wrap_label})", input_data.door_wrap_count, "ea", prices.wraps[f"door_{wrap_suffix}"])
 
     if input_data.transom_wrap_count > 0:
-        transom_price = WRAPS[f"transom_{wrap_suffix}"]
-        transom_wrap_line = LineItem(
-            category="Wraps",
-            description=f"Transom Wrap ({'Metal' if input_data.wraps_are_metal else 'Wood'})",
-            quantity=input_data.transom_wrap_count,
-            unit="ea",
-            unit_price=transom_price,
-            total=round(input_data.transom_wrap_count * transom_price, 2)
-        )
-        line_items.append(transom_wrap_line)
-        wraps_total += transom_wrap_line.total
+        wraps_cents += _add_line(line_items, "Wraps", f"Transom Wrap ({wrap_label})", input_data.transom_wrap_count, "ea", prices.wraps[f"transom_{wrap_suffix}"])
 
     if input_data.garage_door_wrap_count > 0:
-        garage_wrap_line = LineItem(
-            category="Wraps",
-            description="Garage Door Wrap",
-            quantity=input_data.garage_door_wrap_count,
-            unit="ea",
-            unit_price=WRAPS["garage_door"],
-            total=round(input_data.garage_door_wrap_count * WRAPS["garage_door"], 2)
-        )
-        line_items.append(garage_wrap_line)
-        wraps_total += garage_wrap_line.total
+        wraps_cents += _add_line(line_items, "Wraps", "Garage Door Wrap", input_data.garage_door_wrap_count, "ea", prices.wraps["garage_door"])
 
-    result.wraps_total = wraps_total
+    return line_items, wraps_cents
 
-    # ========================================================================
-    # OTHER (Accessories + Misc)
-    # ========================================================================
-    other_total = 0
+
+def _other_package(input_data: QuoteInput, prices: PriceTable) -> tuple[list, int]:
+    """Accessories, misc repairs, cleanup and extra labor"""
+    line_items = []
+    other_cents = 0
 
     # Accessories
     if input_data.vent_count > 0:
-        vent_line = LineItem(
-            category="Accessories",
-            description="Vent",
-            quantity=input_data.vent_count,
-            unit="ea",
-            unit_price=ACCESSORIES["vent"],
-            total=round(input_data.vent_count * ACCESSORIES["vent"], 2)
-        )
-        line_items.append(vent_line)
-        other_total += vent_line.total
+        other_cents += _add_line(line_items, "Accessories", "Vent", input_data.vent_count, "ea", prices.accessories["vent"])
 
     if input_data.light_panel_count > 0:
-        light_line = LineItem(
-            category="Accessories",
-            description="Light Panel",
-            quantity=input_data.light_panel_count,
-            unit="ea",
-            unit_price=ACCESSORIES["light_panel"],
-            total=round(input_data.light_panel_count * ACCESSORIES["light_panel"], 2)
-        )
-        line_items.append(light_line)
-        other_total += light_line.total
+        other_cents += _add_line(line_items, "Accessories", "Light Panel", input_data.light_panel_count, "ea", prices.accessories["light_panel"])
 
     if input_data.receptacle_count > 0:
-        receptacle_line = LineItem(
-            category="Accessories",
-            description="Receptacle",
-            quantity=input_data.receptacle_count,
-            unit="ea",
-            unit_price=ACCESSORIES["receptacle"],
-            total=round(input_data.receptacle_count * ACCESSORIES["receptacle"], 2)
-        )
-        line_items.append(receptacle_line)
-        other_total += receptacle_line.total
+        other_cents += _add_line(line_items, "Accessories", "Receptacle", input_data.receptacle_count, "ea", prices.accessories["receptacle"])
 
     if input_data.faucet_count > 0:
-        faucet_line = LineItem(
-            category="Accessories",
-            description="Faucet/Bib",
-            quantity=input_data.faucet_count,
-            unit="ea",
-            unit_price=ACCESSORIES["faucet_bib"],
-            total=round(input_data.faucet_count * ACCESSORIES["faucet_bib"], 2)
-        )
-        line_items.append(faucet_line)
-        other_total += faucet_line.total
+        other_cents += _add_line(line_items, "Accessories", "Faucet/Bib", input_data.faucet_count, "ea", prices.accessories["faucet_bib"])
 
     if input_data.dryer_vent_count > 0:
-        dryer_line = LineItem(
-            category="Accessories",
-            description="Dryer Vent",
-            quantity=input_data.dryer_vent_count,
-            unit="ea",
-            unit_price=ACCESSORIES["dryer_vent"],
-            total=round(input_data.dryer_vent_count * ACCESSORIES["dryer_vent"], 2)
-        )
-        line_items.append(dryer_line)
-        other_total += dryer_line.total
+        other_cents += _add_line(line_items, "Accessories", "Dryer Vent", input_data.dryer_vent_count, "ea", prices.accessories["dryer_vent"])
 
     if input_data.shutter_pairs > 0:
-        shutter_line = LineItem(
-            category="Accessories",
-            description="Shutters",
-            quantity=input_data.shutter_pairs,
-            unit="pair",
-            unit_price=ACCESSORIES["shutters"],
-            total=round(input_data.shutter_pairs * ACCESSORIES["shutters"], 2)
-        )
-        line_items.append(shutter_line)
-        other_total += shutter_line.total
+        other_cents += _add_line(line_items, "Accessories", "Shutters", input_data.shutter_pairs, "pair", prices.accessories["shutters"])
 
     # Misc
     if input_data.rotten_wood_lf > 0:
-        rotten_line = LineItem(
-            category="Other",
-            description="Rotten Wood Repair",
-            quantity=input_data.rotten_wood_lf,
-            unit="LF",
-            unit_price=OTHER["rotten_wood"],
-            total=round(input_data.rotten_wood_lf * OTHER["rotten_wood"], 2)
-        )
-        line_items.append(rotten_line)
-        other_total += rotten_line.total
+        other_cents += _add_line(line_items, "Other", "Rotten Wood Repair", input_data.rotten_wood_lf, "LF", prices.other["rotten_wood"])
 
     if input_data.osb_sheets > 0:
-        osb_line = LineItem(
-            category="Other",
-            description="OSB Sheeting",
-            quantity=input_data.osb_sheets,
-            unit="sheet",
-            unit_price=OTHER["osb_sheet"],
-            total=round(input_data.osb_sheets * OTHER["osb_sheet"], 2)
-        )
-        line_items.append(osb_line)
-        other_total += osb_line.total
+        other_cents += _add_line(line_items, "Other", "OSB Sheeting", input_data.osb_sheets, "sheet", prices.other["osb_sheet"])
 
     if input_data.house_wrap_rolls > 0:
-        wrap_roll_line = LineItem(
-            category="Other",
-            description="House Wrap",
-            quantity=input_data.house_wrap_rolls,
-            unit="roll",
-            unit_price=OTHER["house_wrap"],
-            total=round(input_data.house_wrap_rolls * OTHER["house_wrap"], 2)
-        )
-        line_items.append(wrap_roll_line)
-        other_total += wrap_roll_line.total
+        other_cents += _add_line(line_items, "Other", "House Wrap", input_data.house_wrap_rolls, "roll", prices.other["house_wrap"])
 
     if input_data.fur_out_count > 0:
-        fur_line = LineItem(
-            category="Other",
-            description="Fur Out",
-            quantity=input_data.fur_out_count,
-            unit="ea",
-            unit_price=OTHER["fur_out"],
-            total=round(input_data.fur_out_count * OTHER["fur_out"], 2)
-        )
-        line_items.append(fur_line)
-        other_total += fur_line.total
+        other_cents += _add_line(line_items, "Other", "Fur Out", input_data.fur_out_count, "ea", prices.other["fur_out"])
 
     # Cleanup
-    cleanup_price = OTHER["cleanup_full"] if input_data.cleanup_type == "full" else OTHER["cleanup_standard"]
-    cleanup_line = LineItem(
-        category="Other",
-        description=f"Cleanup ({'Full' if input_data.cleanup_type == 'full' else 'Standard'})",
-        quantity=1,
-        unit="ea",
-        unit_price=cleanup_price,
-        total=cleanup_price
+    cleanup_price = prices.other["cleanup_full"] if input_data.cleanup_type == "full" else prices.other["cleanup_standard"]
+    other_cents += _add_line(
+        line_items, "Other",
+        f"Cleanup ({'Full' if input_data.cleanup_type == 'full' else 'Standard'})",
+        1, "ea", cleanup_price,
     )
-    line_items.append(cleanup_line)
-    other_total += cleanup_line.total
 
     # Extra labor
     if input_data.extra_labor > 0:
-        extra_line = LineItem(
-            category="Other",
-            description="Additional Labor/Fuel",
-            quantity=1,
-            unit="$",
-            unit_price=input_data.extra_labor,
-            total=input_data.extra_labor
-        )
-        line_items.append(extra_line)
-        other_total += extra_line.total
+        extra_price = Price(input_data.extra_labor, to_cents(input_data.extra_labor))
+        other_cents += _add_line(line_items, "Other", "Additional Labor/Fuel", 1, "$", extra_price)
 
-    result.other_total = other_total
+    return line_items, other_cents
 
-    # ========================================================================
-    # TOTALS
-    # ========================================================================
-    result.line_items = line_items
-    result.grand_total = round(
-        result.siding_package_total +
-        result.soffit_fascia_package_total +
-        result.gutters_total +
-        result.wraps_total +
-        result.other_total,
-        2
+
+# Category name -> (builder, QuoteResult total field), in line item order
+CATEGORY_PACKAGES = {
+    "siding": (_siding_package, "siding_package_total"),
+    "soffit_fascia": (_soffit_fascia_package, "soffit_fascia_package_total"),
+    "gutters": (_gutters_package, "gutters_total"),
+    "wraps": (_wraps_package, "wraps_total"),
+    "other": (_other_package, "other_total"),
+}
+
+# QuoteInput fields read by each category builder
+CATEGORY_FIELDS = {
+    "siding": {
+        "measurements", "siding_product", "waste_percent", "siding_squares",
+        "inside_corners", "outside_corners", "include_fan_fold",
+        "include_remove_dispose", "include_fullback", "dormers_count",
+    },
+    "soffit_fascia": {
+        "soffit_lf", "soffit_width_over_16", "fascia_frieze_lf", "porch_beam_lf",
+        "porch_ceiling_count", "bird_box_count", "extra_bend_lf", "remove_soffit_lf",
+    },
+    "gutters": {"new_gutter_lf", "rehang_gutter_lf"},
+    "wraps": {
+        "wraps_are_metal", "window_wrap_count", "door_wrap_count",
+        "transom_wrap_count", "garage_door_wrap_count",
+    },
+    "other": {
+        "vent_count", "light_panel_count", "receptacle_count", "faucet_count",
+        "dryer_vent_count", "shutter_pairs", "rotten_wood_lf", "osb_sheets",
+        "house_wrap_rolls", "fur_out_count", "cleanup_type", "extra_labor",
+    },
+}
+
+
+def price_category(category: str, input_data: QuoteInput, prices: Optional[PriceTable] = None) -> tuple[list, int]:
+    """Price a single category: (line items, total in cents)"""
+    builder, _ = CATEGORY_PACKAGES[category]
+    return builder(input_data, prices or DEFAULT_PRICE_TABLE)
+
+
+def assemble_quote(input_data: QuoteInput, packages: dict, prices: Optional[PriceTable] = None) -> QuoteResult:
+    """
+    Build a QuoteResult from already-priced category packages.
+
+    Args:
+        input_data: QuoteInput the packages were priced from
+        packages: Category name -> (line items, total in cents)
+        prices: Price table the packages were priced with (default catalog if None)
+
+    Returns:
+        QuoteResult with all line items and totals
+    """
+    prices = prices or DEFAULT_PRICE_TABLE
+    result = QuoteResult(
+        siding_product_name=prices.siding_names.get(input_data.siding_product, "Unknown"),
+        siding_profile=input_data.siding_profile,
+        siding_color=input_data.siding_color,
+        g8_color=input_data.g8_color,
     )
-    result.deposit_50 = round(result.grand_total / 2, 2)
-    result.balance_50 = round(result.grand_total - result.deposit_50, 2)
+
+    # Get property info from measurements if available
+    if input_data.measurements:
+        result.property_address = input_data.measurements.property_address
+        result.property_id = input_data.measurements.property_id
+
+    line_items = []
+    grand_cents = 0
+    for category, (_, total_field) in CATEGORY_PACKAGES.items():
+        category_lines, category_cents = packages[category]
+        line_items.extend(category_lines)
+        setattr(result, total_field, from_cents(category_cents))
+        grand_cents += category_cents
+
+    result.line_items = line_items
+    deposit_cents, balance_cents = split_cents(grand_cents)
+    result.grand_total = from_cents(grand_cents)
+    result.deposit_50 = from_cents(deposit_cents)
+    result.balance_50 = from_cents(balance_cents)
 
     return result
+
+
+def calculate_quote(input_data: QuoteInput, prices: Optional[PriceTable] = None) -> QuoteResult:
+    """
+    Calculate a complete siding quote from input data.
+
+    All arithmetic runs in integer cents (see money.py); dollar floats are
+    only produced when filling in the result.
+
+    Args:
+        input_data: QuoteInput with all measurements and selections
+        prices: Compiled price table (a tenant's catalog); default catalog if None
+
+    Returns:
+        QuoteResult with all line items and totals
+    """
+    prices = prices or DEFAULT_PRICE_TABLE
+    packages = {category: builder(input_data, prices) for category, (builder, _) in CATEGORY_PACKAGES.items()}
+    return assemble_quote(input_data, packages, prices)
@@ -0,0 +1,212 @@
+"""
+Quote Store - Saved quotes in an embedded SQLite database
+
+Each saved quote keeps its input and result JSON plus the columns the
+analytics rollups are keyed on. Saving a quote updates the rollups in the
+same transaction (see analytics.py) and stores its quantity vector for bulk
+re-pricing (see repricing.py).
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from analytics import (
+    create_rollup_table, add_quote_to_rollup, move_quote_status, query_rollups, QUOTE_STATUSES,
+)
+from money import to_cents
+from quote_calculator import QuoteInput, QuoteResult, PriceTable, DEFAULT_PRICE_TABLE, calculate_quote, resolve_squares
+from repricing import QuantityBook, quantity_vector
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "data", "siding_buddy.db")
+
+QUOTES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    tenant TEXT NOT NULL,
+    month TEXT NOT NULL,
+    siding_product TEXT NOT NULL,
+    siding_profile TEXT NOT NULL,
+    siding_color TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open',
+    squares REAL NOT NULL,
+    grand_cents INTEGER NOT NULL,
+    input_json TEXT NOT NULL,
+    result_json TEXT NOT NULL,
+    quantities_json TEXT
+)
+"""
+
+
+class QuoteStore:
+    """SQLite-backed store of saved quotes and their sales rollups"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self._book: Optional[QuantityBook] = None
+        with self._lock, self._conn:
+            self._conn.execute(QUOTES_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(quotes)")}
+            if "quantities_json" not in columns:
+                # Databases created before quantity vectors; filled in on first reprice
+                self._conn.execute("ALTER TABLE quotes ADD COLUMN quantities_json TEXT")
+            create_rollup_table(self._conn)
+
+    def save_quote(
+        self,
+        input_data: QuoteInput,
+        result: QuoteResult,
+        tenant: str = "default",
+        created_at: Optional[datetime] = None,
+    ) -> int:
+        """
+        Save a priced quote and fold it into the rollups.
+
+        Returns:
+            The new quote id
+        """
+        created_at = created_at or datetime.now(timezone.utc)
+        key = (
+            tenant, created_at.strftime("%Y-%m"),
+            input_data.siding_product, input_data.siding_profile, input_data.siding_color,
+        )
+        squares = resolve_squares(input_data)
+        cents = {
+            "siding": to_cents(result.siding_package_total),
+            "soffit_fascia": to_cents(result.soffit_fascia_package_total),
+            "gutters": to_cents(result.gutters_total),
+            "wraps": to_cents(result.wraps_total),
+            "grand": to_cents(result.grand_total),
+        }
+        input_json = input_data.model_dump_json()
+        vector = quantity_vector(result)
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO quotes (
+                    created_at, tenant, month, siding_product, siding_profile, siding_color,
+                    squares, grand_cents, input_json, result_json, quantities_json
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (created_at.isoformat(), *key, squares, cents["grand"],
+                 input_json, result.model_dump_json(), json.dumps(vector, separators=(",", ":"))),
+            )
+            add_quote_to_rollup(self._conn, key, squares, cents)
+            if self._book is not None:
+                self._book.add(cursor.lastrowid, tenant, "open", cents["grand"], vector, input_json)
+            return cursor.lastrowid
+
+    def set_status(self, quote_id: int, status: str, tenant: Optional[str] = None):
+        """
+        Mark a quote open, won or lost.
+
+        Args:
+            tenant: Only change the quote if it belongs to this tenant
+                    (default: any tenant)
+
+        Raises:
+            ValueError: unknown status
+            KeyError: no such quote (for this tenant)
+        """
+        if status not in QUOTE_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(QUOTE_STATUSES)}")
+
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT tenant, month, siding_product, siding_profile, siding_color, grand_cents, status "
+                "FROM quotes WHERE id = ?",
+                (quote_id,),
+            ).fetchone()
+            if row is None or (tenant is not None and row[0] != tenant):
+                raise KeyError(quote_id)
+            key, grand_cents, old_status = row[:5], row[5], row[6]
+            self._conn.execute("UPDATE quotes SET status = ? WHERE id = ?", (status, quote_id))
+            move_quote_status(self._conn, key, grand_cents, old_status, status)
+            if self._book is not None:
+                self._book.set_status(quote_id, status)
+
+    def get_quote(self, quote_id: int) -> Optional[dict]:
+        """Saved quote with its input, result and status, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, created_at, tenant, status, input_json, result_json FROM quotes WHERE id = ?",
+                (quote_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "created_at": row[1],
+            "tenant": row[2],
+            "status": row[3],
+            "input": json.loads(row[4]),
+            "quote": json.loads(row[5]),
+        }
+
+    def analytics(self, group_by: list, start_month: Optional[str] = None,
+                  end_month: Optional[str] = None, filters: Optional[dict] = None) -> list:
+        """Dashboard aggregates from the rollup table (see analytics.query_rollups)"""
+        with self._lock:
+            return query_rollups(self._conn, group_by, start_month, end_month, filters)
+
+    def reprice(self, prices: PriceTable, statuses: tuple = ("open",), limit: int = 100) -> dict:
+        """
+        Re-price the tenant's saved quotes against a price table.
+
+        The quantity book is loaded from the database on first use and kept
+        in step with later saves and status changes.
+
+        Raises:
+            ValueError: unknown status
+        """
+        unknown = [status for status in statuses if status not in QUOTE_STATUSES]
+        if unknown:
+            raise ValueError(f"status must be one of: {', '.join(QUOTE_STATUSES)}")
+
+        with self._lock:
+            if self._book is None:
+                self._book = self._load_book()
+            return self._book.reprice(prices, tuple(statuses), limit)
+
+    def _load_book(self) -> QuantityBook:
+        """Build the quantity book from every saved quote (caller holds the lock)"""
+        book = QuantityBook()
+        backfill = []
+        rows = self._conn.execute(
+            "SELECT id, tenant, status, grand_cents, input_json, quantities_json FROM quotes ORDER BY id"
+        )
+        for quote_id, tenant, status, grand_cents, input_json, quantities_json in rows:
+            if quantities_json:
+                vector = json.loads(quantities_json)
+            else:
+                # Saved before quantity vectors: quantities don't depend on prices
+                result = calculate_quote(QuoteInput.model_validate_json(input_json), DEFAULT_PRICE_TABLE)
+                vector = quantity_vector(result)
+                backfill.append((json.dumps(vector, separators=(",", ":")), quote_id))
+            book.add(quote_id, tenant, status, grand_cents, vector, input_json)
+        if backfill:
+            with self._conn:
+                self._conn.executemany("UPDATE quotes SET quantities_json = ? WHERE id = ?", backfill)
+        return book
+
+
+_store: Optional[QuoteStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> QuoteStore:
+    """Process-wide store, opened on first use at SIDING_BUDDY_DB (or data/siding_buddy.db)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = QuoteStore(os.getenv("SIDING_BUDDY_DB", DEFAULT_DB_PATH))
+    return _store
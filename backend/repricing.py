@@ -0,0 +1,186 @@
+"""
+Repricing - Saved quotes as quantity vectors for bulk re-pricing
+
+When a quote is saved its priced lines are reduced to a sparse quantity
+vector: catalog item ("labor.fan_fold", "siding_products.quest_046", ...) ->
+quantity in 1/300ths, plus the cents of lines that don't come from the
+catalog (extra labor). Re-pricing the whole book against a new PriceTable is
+then one integer array product over a (quotes x items) matrix instead of a
+calculate_quote per quote.
+
+1/300ths represent both two-decimal quantities (LF, quarter squares) and the
+thirds Hover reports squares in, exactly. Each line is rounded half-even to
+the cent before the row sum, as money.line_total_cents does, so totals match
+calculate_quote to the cent. Quotes with any other quantity (a 3-decimal
+override) are kept as "inexact" and re-priced with calculate_quote from
+their saved input.
+"""
+import numpy as np
+
+from money import to_cents, from_cents
+from quote_calculator import (
+    QuoteInput, QuoteResult, PriceTable, DEFAULT_SIDING_PRICE, calculate_quote,
+)
+
+# Quantities are stored as integer multiples of 1 / QUANTITY_SCALE
+QUANTITY_SCALE = 300
+
+
+def quantity_vector(result: QuoteResult) -> dict:
+    """
+    Reduce a priced quote to its quantity vector.
+
+    Returns:
+        {"q": {item: quantity in 1/300ths}, "fixed": cents} or
+        {"inexact": True} when a catalog quantity isn't a whole number of 1/300ths
+    """
+    quantities, fixed_cents = {}, 0
+    for line in result.line_items:
+        if line.item is None:
+            fixed_cents += to_cents(line.total)
+            continue
+        scaled = round(line.quantity * QUANTITY_SCALE)
+        if scaled / QUANTITY_SCALE != line.quantity or line.item in quantities:
+            return {"inexact": True}
+        quantities[line.item] = scaled
+    return {"q": quantities, "fixed": fixed_cents}
+
+
+def price_vector(items: list, prices: PriceTable) -> np.ndarray:
+    """Unit prices in cents for the given catalog items, in order"""
+    cents = np.empty(len(items), dtype=np.int64)
+    for column, item in enumerate(items):
+        section, key = item.split(".", 1)
+        if section == "siding_products":
+            # Same fallback as the siding package for products not in the catalog
+            cents[column] = prices.siding_prices.get(key, DEFAULT_SIDING_PRICE).cents
+        else:
+            cents[column] = getattr(prices, section)[key].cents
+    return cents
+
+
+class QuantityBook:
+    """In-memory matrix of saved quotes' quantity vectors"""
+
+    def __init__(self):
+        self.items: dict = {}            # catalog item -> column
+        self.rows: dict = {}             # quote id -> row
+        self.ids: list = []
+        self.tenants: list = []
+        self.statuses: list = []
+        self.grand_cents: list = []
+        self.fixed_cents: list = []
+        self._cells: tuple = ([], [], [])  # row, column, scaled quantity
+        self.inexact: dict = {}          # quote id -> (tenant, status, grand_cents, input_json)
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.inexact)
+
+    def add(self, quote_id: int, tenant: str, status: str, grand_cents: int, vector: dict, input_json: str):
+        """Add one saved quote (vector from quantity_vector)"""
+        if vector.get("inexact"):
+            self.inexact[quote_id] = (tenant, status, grand_cents, input_json)
+            return
+        row = len(self.ids)
+        self.rows[quote_id] = row
+        self.ids.append(quote_id)
+        self.tenants.append(tenant)
+        self.statuses.append(status)
+        self.grand_cents.append(grand_cents)
+        self.fixed_cents.append(vector["fixed"])
+        rows, columns, values = self._cells
+        for item, scaled in vector["q"].items():
+            rows.append(row)
+            columns.append(self.items.setdefault(item, len(self.items)))
+            values.append(scaled)
+        self._arrays = None
+
+    def set_status(self, quote_id: int, status: str):
+        if quote_id in self.inexact:
+            tenant, _, grand_cents, input_json = self.inexact[quote_id]
+            self.inexact[quote_id] = (tenant, status, grand_cents, input_json)
+        elif quote_id in self.rows:
+            row = self.rows[quote_id]
+            self.statuses[row] = status
+            if self._arrays is not None:
+                self._arrays["statuses"][row] = status
+
+    def arrays(self) -> dict:
+        """Dense numpy views of the book (rebuilt after adds / status changes)"""
+        if self._arrays is None:
+            rows, columns, values = self._cells
+            matrix = np.zeros((len(self.ids), len(self.items)), dtype=np.int64)
+            matrix[rows, columns] = values
+            self._arrays = {
+                "matrix": matrix,
+                "ids": np.array(self.ids, dtype=np.int64),
+                "tenants": np.array(self.tenants, dtype=object),
+                "statuses": np.array(self.statuses, dtype=object),
+                "grand_cents": np.array(self.grand_cents, dtype=np.int64),
+                "fixed_cents": np.array(self.fixed_cents, dtype=np.int64),
+            }
+        return self._arrays
+
+    def reprice(self, prices: PriceTable, statuses: tuple = ("open",), limit: int = 100) -> dict:
+        """
+        Grand totals of the tenant's quotes under a new price table.
+
+        Args:
+            prices: Price table to re-price with (its tenant selects the quotes)
+            statuses: Quote statuses to include
+            limit: Number of changed quotes to list, largest change first
+
+        Returns:
+            Report with before/after sums, the number of changed quotes and
+            the largest changes
+        """
+        arrays = self.arrays()
+        mask = (arrays["tenants"] == prices.tenant) & np.isin(arrays["statuses"], list(statuses))
+        quantities = arrays["matrix"][mask]
+        unit_cents = price_vector(list(self.items), prices)
+
+        # Line totals rounded half-even to the cent, as in money.line_total_cents
+        whole, remainder = np.divmod(quantities * unit_cents, QUANTITY_SCALE)
+        half = QUANTITY_SCALE // 2
+        whole += (remainder > half) | ((remainder == half) & (whole % 2 == 1))
+        new_cents = whole.sum(axis=1) + arrays["fixed_cents"][mask]
+
+        ids = arrays["ids"][mask]
+        old_cents = arrays["grand_cents"][mask]
+
+        # The few quotes with other quantities go through the calculator
+        extra = [
+            (quote_id, grand_cents, to_cents(calculate_quote(QuoteInput.model_validate_json(input_json), prices).grand_total))
+            for quote_id, (tenant, status, grand_cents, input_json) in self.inexact.items()
+            if tenant == prices.tenant and status in statuses
+        ]
+        if extra:
+            extra_ids, extra_old, extra_new = zip(*extra)
+            ids = np.concatenate([ids, np.array(extra_ids, dtype=np.int64)])
+            old_cents = np.concatenate([old_cents, np.array(extra_old, dtype=np.int64)])
+            new_cents = np.concatenate([new_cents, np.array(extra_new, dtype=np.int64)])
+
+        delta = new_cents - old_cents
+        changed = np.flatnonzero(delta)
+        largest = changed[np.argsort(-np.abs(delta[changed]), kind="stable")[:limit]]
+
+        return {
+            "tenant": prices.tenant,
+            "price_version": prices.version,
+            "statuses": list(statuses),
+            "quote_count": int(len(ids)),
+            "changed_count": int(len(changed)),
+            "total_before": from_cents(int(old_cents.sum())),
+            "total_after": from_cents(int(new_cents.sum())),
+            "total_delta": from_cents(int(delta.sum())),
+            "changes": [
+                {
+                    "id": int(ids[i]),
+                    "grand_total_before": from_cents(int(old_cents[i])),
+                    "grand_total_after": from_cents(int(new_cents[i])),
+                    "delta": from_cents(int(delta[i])),
+                }
+                for i in largest
+            ],
+        }
@@ -0,0 +1,297 @@
+"""
+Search Index - Find earlier parses by address, customer name or property ID
+
+Every parsed report is indexed under its PDF id (SHA-256, X-PDF-Id) by:
+    - exact property_id
+    - normalized address tokens ("Drive" -> "dr", punctuation dropped), so
+      "walden station dr" finds "319 Walden Station Drive, Macon, GA"
+    - character trigrams of the address and customer name, so misspelled
+      or partial queries ("waldon staton") still match
+
+Each document lists the tenants that uploaded the PDF, and a tenant's
+search only returns its own documents. Documents rebuilt from the archive
+(which doesn't record tenants) are only visible to unscoped admin searches
+until the PDF is uploaded again.
+
+The index lives in memory and is updated as parses arrive. It is
+snapshotted to disk when changed (every SIDING_BUDDY_SEARCH_SNAPSHOT_S
+seconds and at shutdown) and reloaded at startup; with no snapshot it is
+built from the PDF archive's stored results.
+
+Settings (environment):
+    SIDING_BUDDY_SEARCH_SNAPSHOT       snapshot path (backend/data/search_index.json)
+    SIDING_BUDDY_SEARCH_SNAPSHOT_S     seconds between snapshots while changed (30)
+"""
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from hover_parser import HoverMeasurements
+from pdf_archive import get_archive
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "data", "search_index.json")
+SNAPSHOT_SECONDS = float(os.getenv("SIDING_BUDDY_SEARCH_SNAPSHOT_S", "30"))
+
+# Share of a query's words, or of its trigrams, a document must contain to match
+MIN_TOKEN_MATCH = 0.5
+MIN_TRIGRAM_MATCH = 0.5
+
+# Words and trigrams in more than this share of documents are ignored in queries
+COMMON_KEY_SHARE = 0.5
+
+# USPS-style street suffix and direction abbreviations
+ADDRESS_ABBREVIATIONS = {
+    "drive": "dr", "street": "st", "road": "rd", "avenue": "ave", "lane": "ln", "way": "way",
+    "court": "ct", "circle": "cir", "boulevard": "blvd", "place": "pl", "parkway": "pkwy",
+    "highway": "hwy", "terrace": "ter", "trail": "trl", "point": "pt", "square": "sq",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_tokens(text: str) -> list[str]:
+    """Lowercase words with street suffixes and directions abbreviated"""
+    return [ADDRESS_ABBREVIATIONS.get(word, word) for word in _WORD_RE.findall(text.lower())]
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of each normalized word (padded so short words count)"""
+    grams = set()
+    for word in normalize_tokens(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _matches(postings: list, min_share: float, document_count: int) -> dict:
+    """
+    Documents in at least min_share of the posting sets -> share matched.
+
+    Keys in most documents (the state, "dr") don't tell documents apart and
+    are left out unless the query has nothing else. A match is in at least
+    `needed` of the remaining sets, so it must be in one of the smallest
+    len - needed + 1: only those are scanned for candidates, and the larger
+    sets are only intersected with them.
+    """
+    postings = sorted(postings, key=len)
+    common = [posting for posting in postings if len(posting) > COMMON_KEY_SHARE * document_count]
+    if len(common) < sum(1 for posting in postings if posting):
+        postings = [posting for posting in postings if len(posting) <= COMMON_KEY_SHARE * document_count]
+    if not postings:
+        return {}
+    needed = max(1, math.ceil(min_share * len(postings)))
+    probe = len(postings) - needed + 1
+    counts = Counter()
+    for posting in postings[:probe]:
+        counts.update(posting)
+    candidates = set(counts)
+    for posting in postings[probe:]:
+        counts.update(candidates & posting)
+    return {pdf_id: shared / len(postings) for pdf_id, shared in counts.items() if shared >= needed}
+
+
+class SearchIndex:
+    """In-memory property search over parsed reports"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.docs: dict = {}                          # pdf_id -> document
+        self._by_property_id: dict = defaultdict(set)
+        self._by_token: dict = defaultdict(set)
+        self._by_trigram: dict = defaultdict(set)
+        self.changed = False
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _keys(self, doc: dict) -> tuple:
+        text = " ".join(filter(None, (doc.get("property_address"), doc.get("customer_name"))))
+        return doc.get("property_id"), set(normalize_tokens(text)), trigrams(text)
+
+    def _remove(self, pdf_id: str):
+        doc = self.docs.pop(pdf_id, None)
+        if doc is None:
+            return
+        property_id, tokens, grams = self._keys(doc)
+        for postings, keys in ((self._by_property_id, [property_id] if property_id else []),
+                               (self._by_token, tokens), (self._by_trigram, grams)):
+            for key in keys:
+                postings[key].discard(pdf_id)
+                if not postings[key]:
+                    del postings[key]
+
+    def _insert(self, doc: dict):
+        pdf_id = doc["pdf_id"]
+        self.docs[pdf_id] = doc
+        property_id, tokens, grams = self._keys(doc)
+        if property_id:
+            self._by_property_id[property_id].add(pdf_id)
+        for token in tokens:
+            self._by_token[token].add(pdf_id)
+        for gram in grams:
+            self._by_trigram[gram].add(pdf_id)
+
+    def add(
+        self, pdf_id: str, measurements: HoverMeasurements, parsed_at: Optional[str] = None, tenant: Optional[str] = None
+    ):
+        """Index (or re-index) one parsed report, uploaded by tenant (kept across re-indexing)"""
+        doc = {
+            "pdf_id": pdf_id,
+            "property_id": measurements.property_id,
+            "property_address": " ".join(measurements.property_address.split()) if measurements.property_address else None,
+            "customer_name": measurements.customer_name,
+            "siding_squares_10_waste": measurements.siding_squares_10_waste,
+            "parsed_at": parsed_at or datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        if not (doc["property_id"] or doc["property_address"] or doc["customer_name"]):
+            return
+        with self._lock:
+            tenants = set(self.docs.get(pdf_id, {}).get("tenants", ()))
+            if tenant is not None:
+                tenants.add(tenant)
+            doc["tenants"] = sorted(tenants)
+            self._remove(pdf_id)
+            self._insert(doc)
+            self.changed = True
+
+    def _for_tenant(self, scores: dict, tenant: Optional[str]) -> dict:
+        """Scores of the tenant's documents only (all of them without a tenant)"""
+        if tenant is None:
+            return scores
+        return {pdf_id: score for pdf_id, score in scores.items() if tenant in self.docs[pdf_id].get("tenants", ())}
+
+    def search(self, query: str, limit: int = 10, tenant: Optional[str] = None) -> list[dict]:
+        """
+        Best matches for a free-text query, highest score first.
+
+        With a tenant only that tenant's uploads are searched (and results
+        don't list other tenants); without one every document is.
+
+        A query equal to a property ID scores 1.0; otherwise the score is the
+        better of the share of query words and the share of query trigrams
+        found in the document's address and name (at least half of either).
+        Fuzzy (trigram) matching is skipped when enough documents contain
+        every query word.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        tokens = set(normalize_tokens(query))
+        grams = trigrams(query)
+
+        with self._lock:
+            count = len(self.docs)
+            scores = _matches([self._by_token.get(token, set()) for token in tokens], MIN_TOKEN_MATCH, count)
+            for pdf_id in self._by_property_id.get(query, ()):
+                scores[pdf_id] = 1.0
+            # Filter before counting exact matches: other tenants' matches
+            # must not make this tenant's search skip fuzzy matching
+            scores = self._for_tenant(scores, tenant)
+            if sum(score == 1.0 for score in scores.values()) < limit:
+                fuzzy = _matches([self._by_trigram.get(gram, set()) for gram in grams], MIN_TRIGRAM_MATCH, count)
+                for pdf_id, share in self._for_tenant(fuzzy, tenant).items():
+                    scores[pdf_id] = max(scores.get(pdf_id, 0), share)
+
+            # Ties go to the most recent parse
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], self.docs[item[0]]["parsed_at"] or ""))
+            results = [{**self.docs[pdf_id], "score": round(score, 3)} for pdf_id, score in best]
+        if tenant is not None:
+            for result in results:
+                del result["tenants"]
+        return results
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Write the indexed documents to path atomically"""
+        with self._lock:
+            docs = list(self.docs.values())
+            self.changed = False
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"docs": docs}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Replace the index with a snapshot; False if there is none"""
+        try:
+            with open(path) as f:
+                docs = json.load(f)["docs"]
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self._clear()
+            for doc in docs:
+                self._insert(doc)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self.docs),
+                "tokens": len(self._by_token),
+                "trigrams": len(self._by_trigram),
+                "unsaved_changes": self.changed,
+            }
+
+
+def _build_from_archive(index: SearchIndex):
+    """Index every result stored in the PDF archive"""
+    for pdf_id, measurements, parsed_at in get_archive().results():
+        index.add(pdf_id, measurements, parsed_at)
+
+
+_search_index: Optional[SearchIndex] = None
+_search_index_lock = threading.Lock()
+_snapshot_stop = threading.Event()
+
+
+def snapshot_path() -> str:
+    return os.getenv("SIDING_BUDDY_SEARCH_SNAPSHOT", DEFAULT_SNAPSHOT_PATH)
+
+
+def get_search_index() -> SearchIndex:
+    """Process-wide index, loaded from its snapshot (or the archive) on first use"""
+    global _search_index
+    if _search_index is not None:
+        return _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            index = SearchIndex()
+            if not index.load(snapshot_path()):
+                _build_from_archive(index)
+            _search_index = index
+            threading.Thread(target=_snapshot_loop, name="search-snapshot", daemon=True).start()
+    return _search_index
+
+
+def _snapshot_loop():
+    while not _snapshot_stop.wait(SNAPSHOT_SECONDS):
+        save_snapshot()
+
+
+def save_snapshot():
+    """Snapshot the index if it changed since the last snapshot"""
+    if _search_index is not None and _search_index.changed:
+        _search_index.save(snapshot_path())
+
+
+def close_search_index():
+    """Stop periodic snapshots and write a final one"""
+    _snapshot_stop.set()
+    save_snapshot()
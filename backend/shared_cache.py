@@ -0,0 +1,284 @@
+"""
+Shared Cache - One memory-mapped cache for every worker process on a host
+
+With several uvicorn/gunicorn workers, per-process caches each warm up on
+their own and hold their own copy of every entry. This cache is a single
+file (in /dev/shm by default) mapped by every worker, so a result cached by
+one worker is a hit in all of them and memory stays flat as workers are
+added. The measurement store and the quote cache use it when
+SIDING_BUDDY_SHARED_CACHE=1.
+
+Layout: a header, an index of fixed-size slots (open addressing, a few
+probes per key) and a data ring. Entries are appended to the ring, so the
+oldest entries are overwritten first and the total size never grows.
+
+Reads take no lock. A reader copies the entry out of the ring and checks
+the copy (key, position, length, code stamp and CRC-32 of the value), so an
+entry that a writer overwrote or was still writing reads as a miss, never
+as the wrong value. Writes are serialized across processes with flock and across a
+process's threads with a lock (flock alone doesn't serialize threads that
+share the file).
+
+Keys are "namespace:key" ("quote:...", "measurements:..."). Each slot
+records its namespace, so one namespace can be cleared without touching
+the others, and hit/miss counts are kept per namespace.
+
+Every entry records a hash of the source of the backend that wrote it, and
+a worker only reads entries written by the same code, so a deploy never
+serves results from the old parser or calculator - not even during a
+rolling restart, while old and new workers share the file. The header
+records the stamp too; a worker that finds a cache stamped by different
+code clears it, so old entries don't hold the ring after a deploy.
+
+Settings (environment):
+    SIDING_BUDDY_SHARED_CACHE       "1" to share the caches between workers
+    SIDING_BUDDY_SHARED_CACHE_PATH  cache file (/dev/shm/siding-buddy-cache)
+    SIDING_BUDDY_SHARED_CACHE_MB    data size in megabytes (64)
+"""
+import fcntl
+import glob
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Optional
+
+SHARED_CACHE_MB = float(os.getenv("SIDING_BUDDY_SHARED_CACHE_MB", "64"))
+
+MAGIC = b"SBCACHE3"
+PROBES = 8
+HEADER_BYTES = 4096
+# magic, code stamp, data bytes, slot count, write cursor, writes, index evictions
+HEADER = struct.Struct("<8s16sQQQQQ")
+# key hash, absolute ring position, value length, namespace hash
+SLOT = struct.Struct("<16sQII")
+# key hash, absolute ring position, value length, value CRC-32, expires (epoch s, 0 = never),
+# code stamp of the writer
+ENTRY = struct.Struct("<16sQIId16s")
+EMPTY_KEY = bytes(16)
+
+# Average entry size the index is sized for (quotes ~1.2 KB, measurements ~0.8 KB)
+BYTES_PER_SLOT = 512
+
+
+def shared_cache_enabled() -> bool:
+    return os.getenv("SIDING_BUDDY_SHARED_CACHE", "").lower() in ("1", "true", "yes")
+
+
+def default_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "siding-buddy-cache")
+
+
+def code_stamp() -> bytes:
+    """Hash of the backend's Python source (cached results depend on it)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def _key_hash(key: str) -> bytes:
+    key_hash = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    return key_hash if key_hash != EMPTY_KEY else b"\x01" + key_hash[1:]
+
+
+def _namespace(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _namespace_hash(namespace: str) -> int:
+    return zlib.crc32(namespace.encode())
+
+
+class SharedCache:
+    """Size-bounded key -> bytes cache in a file mapped by every worker"""
+
+    def __init__(self, path: str, data_bytes: int, stamp: bytes = EMPTY_KEY):
+        self.path = path
+        self.data_bytes = data_bytes
+        self.stamp = stamp
+        self.slot_count = max(1024, data_bytes // BYTES_PER_SLOT)
+        self._index_offset = HEADER_BYTES
+        self._data_offset = HEADER_BYTES + self.slot_count * SLOT.size
+        self._counts: dict = {}   # namespace -> [hits, misses], this process only
+        self._pid = os.getpid()
+        self._thread_lock = threading.Lock()
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = self._data_offset + data_bytes
+        with self._locked():
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+            self._mm = mmap.mmap(self._fd, size)
+            magic, file_stamp, file_data_bytes, file_slots, *_ = HEADER.unpack_from(self._mm, 0)
+            if (magic, file_stamp, file_data_bytes, file_slots) != (MAGIC, stamp, data_bytes, self.slot_count):
+                self._reset(stamp)
+
+    def _locked(self):
+        return _FileLock(self._fd, self._thread_lock)
+
+    def _reset(self, stamp: bytes):
+        """Empty the index and ring (caller holds the lock)"""
+        self._mm[self._index_offset:self._data_offset] = bytes(self._data_offset - self._index_offset)
+        HEADER.pack_into(self._mm, 0, MAGIC, stamp, self.data_bytes, self.slot_count, 0, 0, 0)
+
+    def _cursor(self) -> int:
+        return HEADER.unpack_from(self._mm, 0)[4]
+
+    def _slots(self, key_hash: bytes):
+        first = int.from_bytes(key_hash[:8], "little") % self.slot_count
+        for probe in range(PROBES):
+            yield self._index_offset + ((first + probe) % self.slot_count) * SLOT.size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached value, or None if unknown, expired or overwritten"""
+        key_hash = _key_hash(key)
+        counts = self._counts.setdefault(_namespace(key), [0, 0])
+        for slot_offset in self._slots(key_hash):
+            slot_key, position, length, _ = SLOT.unpack_from(self._mm, slot_offset)
+            if slot_key != key_hash:
+                continue
+            value = self._read(key_hash, position, length)
+            if value is not None:
+                counts[0] += 1
+                return value
+            break
+        counts[1] += 1
+        return None
+
+    def _read(self, key_hash: bytes, position: int, length: int) -> Optional[bytes]:
+        if position < self._cursor() - self.data_bytes or ENTRY.size + length > self.data_bytes:
+            return None
+        start = self._data_offset + position % self.data_bytes
+        raw = self._mm[start:start + ENTRY.size + length]
+        if len(raw) != ENTRY.size + length:
+            return None
+        entry_key, entry_position, entry_length, crc, expires, entry_stamp = ENTRY.unpack_from(raw, 0)
+        value = raw[ENTRY.size:]
+        if (entry_key, entry_position, entry_length, entry_stamp) != (key_hash, position, length, self.stamp):
+            return None
+        if zlib.crc32(value) != crc:
+            return None
+        if expires and expires < time.time():
+            return None
+        return value
+
+    def put(self, key: str, value: bytes, ttl_seconds: Optional[float] = None):
+        """Store a value (values larger than a quarter of the ring are skipped)"""
+        needed = ENTRY.size + len(value)
+        if needed > self.data_bytes // 4:
+            return
+        key_hash = _key_hash(key)
+        namespace_hash = _namespace_hash(_namespace(key))
+        expires = time.time() + ttl_seconds if ttl_seconds else 0.0
+        with self._locked():
+            magic, stamp, data_bytes, slots, cursor, writes, evictions = HEADER.unpack_from(self._mm, 0)
+            # Entries are contiguous: skip the ring's tail if this one doesn't fit
+            offset = cursor % self.data_bytes
+            if offset + needed > self.data_bytes:
+                cursor += self.data_bytes - offset
+                offset = 0
+            start = self._data_offset + offset
+            self._mm[start:start + needed] = ENTRY.pack(key_hash, cursor, len(value), zlib.crc32(value), expires, self.stamp) + value
+            live_from = cursor + needed - self.data_bytes
+
+            # Same key, else a free or overwritten slot, else the oldest entry's slot
+            chosen, oldest = None, None
+            for slot_offset in self._slots(key_hash):
+                slot_key, position, _, _ = SLOT.unpack_from(self._mm, slot_offset)
+                if slot_key in (key_hash, EMPTY_KEY) or position < live_from:
+                    chosen = slot_offset
+                    break
+                if oldest is None or position < oldest[1]:
+                    oldest = (slot_offset, position)
+            if chosen is None:
+                chosen = oldest[0]
+                evictions += 1
+            SLOT.pack_into(self._mm, chosen, key_hash, cursor, len(value), namespace_hash)
+            HEADER.pack_into(self._mm, 0, magic, stamp, data_bytes, slots, cursor + needed, writes + 1, evictions)
+
+    def clear(self, namespace: Optional[str] = None):
+        """Drop every entry, or only the entries of one namespace"""
+        with self._locked():
+            if namespace is None:
+                self._reset(HEADER.unpack_from(self._mm, 0)[1])
+                return
+            # Unindexed entries are unreachable; the ring space is reused in turn
+            namespace_hash = _namespace_hash(namespace)
+            empty = bytes(SLOT.size)
+            for slot in range(self.slot_count):
+                slot_offset = self._index_offset + slot * SLOT.size
+                slot_key, _, _, slot_namespace = SLOT.unpack_from(self._mm, slot_offset)
+                if slot_key != EMPTY_KEY and slot_namespace == namespace_hash:
+                    self._mm[slot_offset:slot_offset + SLOT.size] = empty
+
+    def stats(self, namespace: Optional[str] = None) -> dict:
+        """
+        Shared sizes and write counts; hits and misses are this worker's,
+        for one namespace or all of them.
+        """
+        _, _, _, _, cursor, writes, evictions = HEADER.unpack_from(self._mm, 0)
+        counts = [self._counts.get(namespace, [0, 0])] if namespace is not None else list(self._counts.values())
+        hits, misses = sum(count[0] for count in counts), sum(count[1] for count in counts)
+        lookups = hits + misses
+        return {
+            "path": self.path,
+            "data_bytes": self.data_bytes,
+            "slots": self.slot_count,
+            "bytes_written": cursor,
+            "writes": writes,
+            "index_evictions": evictions,
+            "worker_pid": os.getpid(),
+            "worker_hits": hits,
+            "worker_misses": misses,
+            "worker_hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+class _FileLock:
+    """Thread lock, then exclusive flock on an open file, as a context manager"""
+
+    def __init__(self, fd: int, thread_lock: threading.Lock):
+        self.fd = fd
+        self.thread_lock = thread_lock
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            self.thread_lock.release()
+
+
+_shared_cache: Optional[SharedCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> SharedCache:
+    """This process's mapping of the shared cache (re-opened after a fork)"""
+    global _shared_cache
+    if _shared_cache is not None and _shared_cache._pid == os.getpid():
+        return _shared_cache
+    with _shared_cache_lock:
+        # flock is per open file, so a forked worker needs its own
+        if _shared_cache is None or _shared_cache._pid != os.getpid():
+            _shared_cache = SharedCache(
+                os.getenv("SIDING_BUDDY_SHARED_CACHE_PATH", default_path()),
+                int(SHARED_CACHE_MB * 1024 * 1024),
+                code_stamp(),
+            )
+    return _shared_cache
@@ -0,0 +1,182 @@
+"""
+Tenants - Per-branch pricing catalogs
+
+Each dealer branch (tenant) can have its own price sheet as a JSON file in
+the catalog directory (SIDING_BUDDY_CATALOG_DIR, default backend/catalogs):
+
+    catalogs/macon.json
+    {
+        "name": "Macon Branch",
+        "api_keys": ["..."],
+        "siding_products": {"quest_046": {"price": 610}},
+        "labor": {"fan_fold": 55}
+    }
+
+Sections are overrides on top of the built-in catalog. A tenant's catalog is
+merged and compiled into an immutable PriceTable the first time it is used
+and kept in a small in-memory LRU, so requests only do a dict lookup and a
+stat of the file; an edited file (newer mtime) is recompiled on next use.
+API keys are read once; POST /api/admin/catalogs/reload re-reads them
+(for added or revoked keys) along with every catalog.
+Requests pick their tenant with an X-API-Key (mapped to its tenant); with
+none they get the built-in "default" catalog. X-Tenant-ID alone is not a
+credential: it selects a tenant only for requests with the admin token.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from quote_calculator import (
+    PriceTable, CATALOG_SECTIONS, DEFAULT_PRICE_TABLE, compile_price_table, default_catalog,
+)
+
+DEFAULT_TENANT = "default"
+DEFAULT_CATALOG_DIR = os.path.join(os.path.dirname(__file__), "catalogs")
+PRICE_TABLE_CACHE_SIZE = int(os.getenv("SIDING_BUDDY_PRICE_TABLE_CACHE", "32"))
+
+
+class UnknownTenantError(KeyError):
+    """No catalog exists for the requested tenant or API key"""
+
+
+class TenantAccessDenied(PermissionError):
+    """A tenant was named without a credential that grants it"""
+
+
+def catalog_dir() -> str:
+    """Directory holding <tenant>.json catalog files"""
+    return os.getenv("SIDING_BUDDY_CATALOG_DIR", DEFAULT_CATALOG_DIR)
+
+
+def _catalog_path(tenant: str) -> str:
+    # Tenant ids are file stems; refuse anything that could escape the directory
+    if not tenant or os.path.basename(tenant) != tenant or tenant.startswith("."):
+        raise UnknownTenantError(tenant)
+    return os.path.join(catalog_dir(), f"{tenant}.json")
+
+
+def merge_catalog(catalog: dict, overrides: dict) -> dict:
+    """Apply catalog-file style overrides to a catalog dict (in place) and return it"""
+    for key, product in (overrides.get("siding_products") or {}).items():
+        catalog["siding_products"].setdefault(key, {"name": key, "price": 0}).update(product)
+    for section in CATALOG_SECTIONS:
+        catalog[section].update(overrides.get(section) or {})
+    return catalog
+
+
+def load_tenant_catalog(tenant: str) -> dict:
+    """
+    Merge a tenant's overrides onto the built-in catalog.
+
+    Raises:
+        UnknownTenantError: no catalog file for the tenant
+    """
+    path = _catalog_path(tenant)
+    if not os.path.exists(path):
+        raise UnknownTenantError(tenant)
+    with open(path) as f:
+        overrides = json.load(f)
+
+    return merge_catalog(default_catalog(), overrides)
+
+
+class PriceTableCache:
+    """Thread-safe LRU of compiled per-tenant price tables"""
+
+    def __init__(self, max_size: int = PRICE_TABLE_CACHE_SIZE):
+        self.max_size = max_size
+        self._tables: "OrderedDict[str, tuple[int, PriceTable]]" = OrderedDict()   # tenant -> (file mtime, table)
+        self._api_keys: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def get(self, tenant: str) -> PriceTable:
+        """Compiled price table for a tenant (compiled on first use and after its file changes)"""
+        if tenant == DEFAULT_TENANT:
+            return DEFAULT_PRICE_TABLE
+        try:
+            mtime = os.stat(_catalog_path(tenant)).st_mtime_ns
+        except FileNotFoundError:
+            self.invalidate(tenant)
+            raise UnknownTenantError(tenant)
+
+        with self._lock:
+            entry = self._tables.get(tenant)
+            if entry is not None and entry[0] == mtime:
+                self._tables.move_to_end(tenant)
+                return entry[1]
+
+        table = compile_price_table(load_tenant_catalog(tenant), tenant)
+
+        with self._lock:
+            self._tables[tenant] = (mtime, table)
+            self._tables.move_to_end(tenant)
+            while len(self._tables) > self.max_size:
+                self._tables.popitem(last=False)
+        return table
+
+    def tenant_for_api_key(self, api_key: str) -> str:
+        """
+        Tenant that owns an API key.
+
+        Raises:
+            UnknownTenantError: key not listed in any catalog
+        """
+        with self._lock:
+            if self._api_keys is None:
+                self._api_keys = _scan_api_keys()
+            tenant = self._api_keys.get(api_key)
+        if tenant is None:
+            raise UnknownTenantError("api key")
+        return tenant
+
+    def invalidate(self, tenant: Optional[str] = None):
+        """Drop compiled tables (one tenant or all) after a catalog edit"""
+        with self._lock:
+            if tenant is None:
+                self._tables.clear()
+                self._api_keys = None
+            else:
+                self._tables.pop(tenant, None)
+
+
+def _scan_api_keys() -> dict:
+    """API key -> tenant, from every catalog file's "api_keys" list"""
+    api_keys = {}
+    directory = catalog_dir()
+    if not os.path.isdir(directory):
+        return api_keys
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(directory, filename)) as f:
+            for key in json.load(f).get("api_keys") or []:
+                api_keys[key] = filename[:-len(".json")]
+    return api_keys
+
+
+price_tables = PriceTableCache()
+
+
+def resolve_price_table(
+    api_key: Optional[str] = None, tenant_id: Optional[str] = None, is_admin: bool = False
+) -> PriceTable:
+    """
+    Price table for a request, by API key first, then tenant id, else default.
+
+    Args:
+        is_admin: The request carries the admin token; only admins may pick
+                  a tenant by id
+
+    Raises:
+        UnknownTenantError: unknown API key or tenant
+        TenantAccessDenied: a non-default tenant id without the admin token
+    """
+    if api_key:
+        return price_tables.get(price_tables.tenant_for_api_key(api_key))
+    if tenant_id and tenant_id != DEFAULT_TENANT:
+        if not is_admin:
+            raise TenantAccessDenied(tenant_id)
+        return price_tables.get(tenant_id)
+    return DEFAULT_PRICE_TABLE
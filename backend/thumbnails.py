@@ -0,0 +1,211 @@
+"""
+Thumbnails - Page renders of uploaded Hover PDFs with an on-disk cache
+
+Parse endpoints keep a copy of each uploaded PDF under its SHA-256. Page
+thumbnails are rendered lazily on first request, straight at the requested
+width (pdfium renders at the target scale, so there is no full-size bitmap to
+shrink), and saved next to the PDFs keyed by hash + page + width + format.
+Repeat views are a file read.
+
+PDFs and renders share one size budget; when it is exceeded the least
+recently used files are deleted first. An evicted PDF is read back from the
+PDF archive (see pdf_archive) and cached again; only a PDF in neither gets a
+404, and the client re-uploads.
+
+Settings (environment):
+    SIDING_BUDDY_RENDER_CACHE_DIR  cache directory (backend/data/render_cache)
+    SIDING_BUDDY_RENDER_CACHE_MB   size budget in megabytes (500)
+"""
+import io
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import pypdfium2 as pdfium
+
+from hover_parser import PDFIUM_LOCK
+from pdf_archive import get_archive
+
+DEFAULT_RENDER_CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", "render_cache")
+RENDER_CACHE_MB = float(os.getenv("SIDING_BUDDY_RENDER_CACHE_MB", "500"))
+
+THUMBNAIL_FORMATS = {"webp": ("WEBP", "image/webp"), "png": ("PNG", "image/png")}
+MIN_THUMBNAIL_WIDTH = 64
+MAX_THUMBNAIL_WIDTH = 2048
+
+_PDF_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class RenderCache:
+    """Size-bounded LRU of cached files in one directory"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+
+        os.makedirs(directory, exist_ok=True)
+        # Rebuild the LRU order from modification times (touched on every hit)
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.startswith(".") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total += size
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Cached file contents, or None on a miss"""
+        with self._lock:
+            if name not in self._files:
+                return None
+            self._files.move_to_end(name)
+        try:
+            with open(self.path(name), "rb") as f:
+                data = f.read()
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._files.pop(name, 0)
+            return None
+        return data
+
+    def contains(self, name: str) -> bool:
+        with self._lock:
+            return name in self._files
+
+    def put(self, name: str, data: bytes):
+        """Write a file atomically and evict least recently used files over budget"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path(name))
+
+        evicted = []
+        with self._lock:
+            self._total += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old_name, size = self._files.popitem(last=False)
+                self._total -= size
+                evicted.append(old_name)
+        for old_name in evicted:
+            try:
+                os.unlink(self.path(old_name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"files": len(self._files), "bytes": self._total, "max_bytes": self.max_bytes}
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """Process-wide render cache, opened on first use"""
+    global _render_cache
+    with _render_cache_lock:
+        if _render_cache is None:
+            _render_cache = RenderCache(
+                os.getenv("SIDING_BUDDY_RENDER_CACHE_DIR", DEFAULT_RENDER_CACHE_DIR),
+                int(RENDER_CACHE_MB * 1024 * 1024),
+            )
+    return _render_cache
+
+
+def _pdf_name(pdf_id: str) -> str:
+    if not _PDF_ID_RE.match(pdf_id):
+        raise KeyError(pdf_id)
+    return f"{pdf_id}.pdf"
+
+
+def store_pdf(pdf_id: str, content: bytes):
+    """Keep an uploaded PDF (pdf_id is its SHA-256 hex digest) for later renders"""
+    name = _pdf_name(pdf_id)
+    cache = get_render_cache()
+    if not cache.contains(name):
+        cache.put(name, content)
+
+
+def _render_name(pdf_id: str, page: int, width: int, fmt: str) -> str:
+    if fmt not in THUMBNAIL_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(THUMBNAIL_FORMATS)}")
+    if not MIN_THUMBNAIL_WIDTH <= width <= MAX_THUMBNAIL_WIDTH:
+        raise ValueError(f"Width must be between {MIN_THUMBNAIL_WIDTH} and {MAX_THUMBNAIL_WIDTH}")
+    _pdf_name(pdf_id)
+    return f"{pdf_id}-p{page}-w{width}.{fmt}"
+
+
+def cached_thumbnail(pdf_id: str, page: int, width: int, fmt: str = "webp") -> Optional[bytes]:
+    """Thumbnail if it has already been rendered, else None (cheap, no rendering)"""
+    return get_render_cache().get(_render_name(pdf_id, page, width, fmt))
+
+
+def render_thumbnail(pdf_id: str, page: int, width: int, fmt: str = "webp") -> bytes:
+    """
+    Thumbnail of one page of a stored PDF, rendered on first use.
+
+    Args:
+        pdf_id: SHA-256 of the uploaded PDF
+        page: 1-based page number
+        width: Thumbnail width in pixels (height keeps the page's aspect ratio)
+        fmt: "webp" or "png"
+
+    Returns:
+        Encoded image bytes
+
+    Raises:
+        KeyError: unknown PDF (neither cached nor archived)
+        IndexError: page out of range
+        ValueError: bad width or format
+    """
+    render_name = _render_name(pdf_id, page, width, fmt)
+    pdf_name = _pdf_name(pdf_id)
+    cache = get_render_cache()
+    cached = cache.get(render_name)
+    if cached is not None:
+        return cached
+
+    pdf_bytes = cache.get(pdf_name)
+    if pdf_bytes is None:
+        # Evicted from the cache: the archive keeps every parsed upload
+        pdf_bytes = get_archive().get(pdf_id)
+        cache.put(pdf_name, pdf_bytes)
+    # Only the render holds the pdfium lock; encoding runs unlocked
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        try:
+            if not 1 <= page <= len(pdf):
+                raise IndexError(f"Page {page} out of range (1-{len(pdf)})")
+            pdf_page = pdf[page - 1]
+            bitmap = pdf_page.render(scale=width / pdf_page.get_width())
+            image = bitmap.to_pil().copy()
+            bitmap.close()
+            pdf_page.close()
+        finally:
+            pdf.close()
+
+    pil_format, _ = THUMBNAIL_FORMATS[fmt]
+    buffer = io.BytesIO()
+    if pil_format == "WEBP":
+        image.save(buffer, format=pil_format, quality=80, method=4)
+    else:
+        image.save(buffer, format=pil_format, optimize=True)
+    data = buffer.getvalue()
+
+    cache.put(render_name, data)
+    return data
@@ -0,0 +1,89 @@
+"""
+Warm-up - Exercise the cold code paths before an instance takes traffic
+
+The first upload after a deploy pays for importing the pdfminer stack, the
+first pdfplumber layout/table pass, starting the parse worker processes and
+building pydantic validators. Running one parse of a bundled sample PDF and
+one quote at startup moves that cost off the first real request.
+
+Enabled with SIDING_BUDDY_WARMUP=1. When disabled the instance is ready
+immediately.
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+SAMPLE_PDF_PATH = os.path.join(os.path.dirname(__file__), "samples", "sample_hover.pdf")
+
+_ready = threading.Event()
+_timings: dict = {}
+_error: Optional[str] = None
+
+
+def warmup_enabled() -> bool:
+    """Warm-up is opt-in via the SIDING_BUDDY_WARMUP environment variable"""
+    return os.getenv("SIDING_BUDDY_WARMUP", "").lower() in ("1", "true", "yes")
+
+
+def run_warmup() -> dict:
+    """
+    Import the PDF stack, parse the sample PDF and price one quote.
+
+    Returns:
+        Dict of step name -> seconds taken
+    """
+    global _error
+
+    try:
+        start = time.perf_counter()
+        import pdfplumber  # noqa: F401
+        import pdfminer.high_level  # noqa: F401
+        import pdfminer.layout  # noqa: F401
+        import hover_parser  # noqa: F401  (compiles the parser patterns)
+        _timings["imports"] = round(time.perf_counter() - start, 4)
+
+        start = time.perf_counter()
+        measurements = hover_parser.parse_hover_pdf(SAMPLE_PDF_PATH)
+        _timings["parse_pdf"] = round(time.perf_counter() - start, 4)
+
+        start = time.perf_counter()
+        from quote_calculator import calculate_quote, QuoteInput, QuoteResult
+        quote_input = QuoteInput.model_validate({"measurements": measurements.model_dump()})
+        result = calculate_quote(quote_input)
+        QuoteResult.model_validate_json(result.model_dump_json())
+        _timings["calculate_quote"] = round(time.perf_counter() - start, 4)
+
+        # Spawn the isolated parse workers and run the sample through each
+        from pdf_guard import limits, parse_workers
+        if limits.isolated:
+            start = time.perf_counter()
+            parse_workers.warm_up(SAMPLE_PDF_PATH)
+            _timings["parse_workers"] = round(time.perf_counter() - start, 4)
+    except Exception as e:
+        # A failed warm-up only means a slower first request; don't keep the
+        # instance out of rotation over it
+        _error = str(e)
+
+    _ready.set()
+    return dict(_timings)
+
+
+def mark_ready():
+    """Mark the instance ready without warming up"""
+    _ready.set()
+
+
+def is_ready() -> bool:
+    """True once warm-up has finished (or was skipped)"""
+    return _ready.is_set()
+
+
+def warmup_status() -> dict:
+    """Readiness details for the /api/ready endpoint"""
+    return {
+        "ready": is_ready(),
+        "warmup": warmup_enabled(),
+        "timings": dict(_timings),
+        "error": _error,
+    }
@@ -644,14 +644,15 @@ export default function SidingQuoteBuilder() {
       const formData = new FormData();
       formData.append('file', file);
 
-      const response = await fetch(`${API_BASE}/api/parse-pdf`, {
+      const response = await fetch(`${API_BASE}/api/parse-pdf?engine=fast`, {
         method: 'POST',
         body: formData,
       });
 
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({}));
-        throw new Error(errorData.detail || 'Failed to parse PDF');
+        // Rejected uploads (too large, not a Hover report, ...) carry {code, message}
+        throw new Error(errorData.detail?.message || errorData.detail || 'Failed to parse PDF');
       }
 
       const measurements = await response.json();